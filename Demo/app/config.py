@@ -12,6 +12,13 @@ class Settings(BaseSettings):
     )
     
     mongodb_url: str = Field(..., description="MongoDB connection URL")
+    mongodb_max_pool_size: int = Field(200, description="Maximum MongoDB connections in the client pool")
+    mongodb_min_pool_size: int = Field(20, description="MongoDB connections kept open in the client pool")
+    mongodb_max_idle_time_ms: int = Field(60000, description="Milliseconds an idle pooled MongoDB connection is kept before closing")
+    mongodb_compressors: str = Field("zstd,zlib", description="Comma-separated MongoDB wire compressors in preference order; the server picks the first it supports")
+    mongodb_zlib_compression_level: int = Field(6, description="zlib level (-1 to 9) used when zlib is the negotiated MongoDB compressor")
+    max_concurrent_task_processing: int = Field(2, description="Maximum number of ended tasks processed at the same time; further runs wait for a slot")
+    task_claim_ttl_seconds: int = Field(21600, description="Seconds after which an unfinished task processing claim (e.g. from a crashed run) may be taken over")
 
     # Claude configuration for evaluation
     claude_api_key: str = Field(..., description="Claude API key")
@@ -25,6 +32,18 @@ class Settings(BaseSettings):
     gemini_max_tokens: int = Field(65536, description="Gemini max output tokens (model cap for gemini-3.5-flash)")
     gemini_thinking_level: Optional[str] = Field(None, description="Optional Gemini thinking level (low/medium/high); only used for thinking models (e.g. gemini-3.5-flash)")
     gemini_temperature: Optional[float] = Field(None, description="Optional Gemini temperature; ignored for thinking models (e.g. gemini-3.5-flash)")
+    llm_cache_ttl_seconds: int = Field(86400, description="TTL of cached LLM responses in seconds")
+    llm_cache_max_entries: int = Field(256, description="Maximum number of cached LLM responses")
+    gemini_rps: float = Field(5.0, description="Maximum Gemini requests per second (client-side token bucket)")
+    gemini_burst: int = Field(10, description="Maximum burst of Gemini requests above the steady rate")
+    gemini_max_retries: int = Field(5, description="Retries of a Gemini call on rate-limit (429) errors")
+    gemini_initial_concurrency: int = Field(4, description="Starting concurrent Gemini calls; adapts between 1 and GEMINI_MAX_CONCURRENCY")
+    gemini_max_concurrency: int = Field(8, description="Maximum concurrent Gemini deduplication calls")
+    gemini_dedup_groups_per_call: int = Field(4, description="Number of small finding groups packed into one Gemini deduplication call")
+    dedup_max_bucket_size: int = Field(50, description="Maximum findings per Gemini deduplication prompt; larger sets are deduplicated map-reduce style")
+    dedup_prefilter_threshold: Optional[float] = Field(None, description="Optional shingle Jaccard threshold (e.g. 0.2); findings below it against every other finding skip Gemini deduplication (disabled if unset)")
+    gemini_batch_mode: bool = Field(False, description="Use Gemini Batch Mode for non-interactive deduplication (cheaper, higher latency)")
+    gemini_batch_poll_interval: float = Field(30.0, description="Seconds between Gemini batch job status polls")
 
     debug: bool = Field(False, description="Debug mode flag")
     log_level: str = Field("INFO", description="Logging level")
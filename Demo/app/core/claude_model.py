@@ -1,11 +1,11 @@
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from app.models.finding_db import FindingDB
 from app.config import config
 from langchain_anthropic import ChatAnthropic
 from pydantic import BaseModel, Field
 from app.types import TaskCache
-from app.core.prompt_utils import build_context_section
+from app.core.prompt_utils import build_context_section, fill_prompt_template, serialize_findings
 
 
 logger = logging.getLogger(__name__)
@@ -135,40 +135,30 @@ async def evaluate_findings_structured(
         Structured evaluation result with guaranteed format
     """
     
-    if related_findings:
-        prompt = _get_related_findings_prompt(findings_batch, task_cache)
-    else:
-        prompt = _get_individual_findings_prompt(findings_batch, task_cache)
+    prompt = _build_evaluation_prompt(
+        findings_batch, task_cache, "related" if related_findings else "individual"
+    )
 
     return await model_with_structured_output.ainvoke(prompt)
 
-def _get_related_findings_prompt(findings_batch: List[FindingDB], task_cache: TaskCache) -> str:
-    """Generate prompt for evaluating related/duplicate findings as a group."""
-    
-    # Build context section
-    context_section = build_context_section(task_cache)
-    
-    return f"""
-You are a smart contract security expert tasked with evaluating a batch of RELATED findings that refer to the same underlying vulnerability.
+# Shared evaluation prompt; style-specific sections come from _PROMPT_STYLES.
+# Placeholders are filled in a single pass (JSON braces need no escaping).
+_EVALUATION_PROMPT_TEMPLATE = """
+You are a smart contract security expert tasked with evaluating a batch of {batch_description}.
 
 ## BATCH CONTEXT
-This batch contains multiple findings that are duplicates or variations of the same underlying security issue. They should be evaluated collectively as they represent different reports of the same vulnerability.
+{batch_context}
 
 ## EVALUATION APPROACH
-Since these findings are related:
-1. **Unified Assessment**: All findings should receive the same validity and severity rating
-2. **Collective Analysis**: Use information from all findings to make the most comprehensive assessment
-3. **Cross-Reference**: Look for complementary details across findings to build complete picture
-4. **Consistency**: Apply the same evaluation criteria to all findings in the batch
-5. **Context-Aware**: Use the smart contract context above to validate technical accuracy and assess real-world impact
+{evaluation_approach}
 
 ## EVALUATION CRITERIA
 
 **Validity Assessment:**
-- Analyze the core vulnerability described across all findings
+- Analyze the core vulnerability described {scope}
 - Determine if this represents a legitimate security issue or false positive
 - Consider the technical accuracy and potential impact of the underlying issue
-- **Use the smart contract context to validate claims and assess if the vulnerability actually exists in the provided code**
+- **Use the smart contract context to validate claims and assess if {vulnerability_subject} actually exists in the provided code**
 
 **Severity Assessment:**
 - **High**: High or critical impact on contract functionality, user funds, or security with feasible exploitation
@@ -179,126 +169,115 @@ Since these findings are related:
 ## ANALYSIS GUIDELINES
 
 **Technical Assessment:**
-- Evaluate the technical accuracy across all finding descriptions **against the actual smart contract code provided**
+- Evaluate the technical accuracy {scope_descriptions} **against the actual smart contract code provided**
 - Assess feasibility and impact of exploitation in this smart contract context
 - Consider mathematical correctness, logical soundness, and syntactic accuracy
 - Determine exploitation difficulty and prerequisites
-- **Cross-reference finding claims with the actual contract implementation**
+- **Cross-reference {claims_subject} with the actual contract implementation**
 
 **Contextual Assessment:**
 - Consider the smart contract's intended purpose and design **based on the provided context**
-- Assess if the issue contradicts intended functionality, is a false positive, or represents actual vulnerability which is applicable in this context
+- Assess if the {issue_subject} contradicts intended functionality, is a false positive, or represents actual vulnerability which is applicable in this context
 - Example: Pause functions disabling withdrawals is typically intentional design, not a bug
-- **Use the documentation and Q&A responses to understand intended behavior**
+- **Use the documentation and Q&A responses to understand intended behavior{behavior_scope}**
 
 ## RETURN FORMAT
 Return a JSON object with the following structure:
 ```json
-{{
+{
     "results": [
-        {{
+        {
             "finding_id": "Finding ID",
             "is_valid": true/false,
-            "severity": "High/Medium/Low/Info", 
-            "comment": "Explanation focusing on the shared vulnerability"
-        }}
+            "severity": "High/Medium/Low/Info",
+            "comment": "{comment_hint}"
+        }
     ]
-}}
+}
 ```
 
 ## SMART CONTRACT CONTEXT
 {context_section}
 
 ## FINDINGS TO ANALYZE
-{[finding.dump() for finding in findings_batch]}
+{findings_json}
 
 ## EVALUATION INSTRUCTIONS
-1. **Identify Core Issue**: Determine the underlying vulnerability these findings share
-2. **Validate Against Context**: Check if the vulnerability actually exists in the provided smart contract code
-3. **Unified Evaluation**: Apply same validity and severity to all findings
-4. **Comprehensive Comments**: Explain the shared vulnerability and why all findings receive the same rating
-5. **Use Exact IDs**: Include evaluation for each finding using its exact ID
+{evaluation_instructions}
 
-Provide one evaluation per finding, but ensure all evaluations are consistent since they refer to the same underlying issue. Base your analysis on the actual smart contract context provided.
+{closing}
 """
 
-def _get_individual_findings_prompt(findings_batch: List[FindingDB], task_cache: TaskCache) -> str:
-    """Generate prompt for evaluating individual unrelated findings separately."""
-    
-    # Build context section
-    context_section = build_context_section(task_cache)
-    
-    return f"""
-You are a smart contract security expert tasked with evaluating a batch of INDIVIDUAL findings that describe different vulnerabilities within the same protocol or smart contract.
-
-## BATCH CONTEXT
-This batch contains unrelated findings that must be evaluated independently. Each finding represents a potentially different type of vulnerability or issue and should be assessed on its own merits.
-
-## EVALUATION APPROACH
-Since these findings are unrelated:
+_PROMPT_STYLES: Dict[str, Dict[str, str]] = {
+    # Duplicates / variations of one vulnerability, evaluated as a group
+    "related": {
+        "batch_description": "RELATED findings that refer to the same underlying vulnerability",
+        "batch_context": "This batch contains multiple findings that are duplicates or variations of the same underlying security issue. They should be evaluated collectively as they represent different reports of the same vulnerability.",
+        "evaluation_approach": """Since these findings are related:
+1. **Unified Assessment**: All findings should receive the same validity and severity rating
+2. **Collective Analysis**: Use information from all findings to make the most comprehensive assessment
+3. **Cross-Reference**: Look for complementary details across findings to build complete picture
+4. **Consistency**: Apply the same evaluation criteria to all findings in the batch
+5. **Context-Aware**: Use the smart contract context above to validate technical accuracy and assess real-world impact""",
+        "scope": "across all findings",
+        "vulnerability_subject": "the vulnerability",
+        "scope_descriptions": "across all finding descriptions",
+        "claims_subject": "finding claims",
+        "issue_subject": "issue",
+        "behavior_scope": "",
+        "comment_hint": "Explanation focusing on the shared vulnerability",
+        "evaluation_instructions": """1. **Identify Core Issue**: Determine the underlying vulnerability these findings share
+2. **Validate Against Context**: Check if the vulnerability actually exists in the provided smart contract code
+3. **Unified Evaluation**: Apply same validity and severity to all findings
+4. **Comprehensive Comments**: Explain the shared vulnerability and why all findings receive the same rating
+5. **Use Exact IDs**: Include evaluation for each finding using its exact ID""",
+        "closing": "Provide one evaluation per finding, but ensure all evaluations are consistent since they refer to the same underlying issue. Base your analysis on the actual smart contract context provided.",
+    },
+    # Unrelated findings, each evaluated on its own merits
+    "individual": {
+        "batch_description": "INDIVIDUAL findings that describe different vulnerabilities within the same protocol or smart contract",
+        "batch_context": "This batch contains unrelated findings that must be evaluated independently. Each finding represents a potentially different type of vulnerability or issue and should be assessed on its own merits.",
+        "evaluation_approach": """Since these findings are unrelated:
 1. **Independent Assessment**: Evaluate each finding separately without influence from others
 2. **Individual Context**: Consider each finding within its specific context and scope
 3. **Separate Ratings**: Each finding may have different validity and severity ratings
 4. **Focused Analysis**: Analyze each finding's specific claims and evidence
-5. **Context-Aware**: Use the smart contract context above to validate each finding's technical accuracy
-
-## EVALUATION CRITERIA
-
-**Validity Assessment:**
-- Analyze the core vulnerability described in each finding
-- Determine if this represents a legitimate security issue or false positive
-- Consider the technical accuracy and potential impact of the underlying issue
-- **Use the smart contract context to validate claims and assess if each vulnerability actually exists in the provided code**
-
-**Severity Assessment:**
-- **High**: High or critical impact on contract functionality, user funds, or security with feasible exploitation
-- **Medium**: Moderate impact with some prerequisites or limited scope of exploitation  
-- **Low**: Minor issues with minimal impact
-- **Info**: Informational findings with no impact
-
-## ANALYSIS GUIDELINES
-
-**Technical Assessment:**
-- Evaluate the technical accuracy for each finding description **against the actual smart contract code provided**
-- Assess feasibility and impact of exploitation in the smart contract context
-- Consider mathematical correctness, logical soundness, and syntactic accuracy
-- Determine exploitation difficulty and prerequisites
-- **Cross-reference each finding's claims with the actual contract implementation**
-
-**Contextual Assessment:**
-- Consider the smart contract's intended purpose and design **based on the provided context**
-- Assess if the finding contradicts intended functionality, is a false positive, or represents actual vulnerability which is applicable in this context
-- Example: Pause functions disabling withdrawals is typically intentional design, not a bug
-- **Use the documentation and Q&A responses to understand intended behavior for each specific finding**
-
-## RETURN FORMAT
-Return a JSON object with the following structure:
-```json
-{{
-    "results": [
-        {{
-            "finding_id": "Finding ID",
-            "is_valid": true/false,
-            "severity": "High/Medium/Low/Info",
-            "comment": "Individual explanation specific to this finding"
-        }}
-    ]
-}}
-```
-
-## SMART CONTRACT CONTEXT
-{context_section}
-
-## FINDINGS TO ANALYZE
-{[finding.dump() for finding in findings_batch]}
-
-## EVALUATION INSTRUCTIONS
-1. **Separate Analysis**: Evaluate each finding independently without cross-influence
+5. **Context-Aware**: Use the smart contract context above to validate each finding's technical accuracy""",
+        "scope": "in each finding",
+        "vulnerability_subject": "each vulnerability",
+        "scope_descriptions": "for each finding description",
+        "claims_subject": "each finding's claims",
+        "issue_subject": "finding",
+        "behavior_scope": " for each specific finding",
+        "comment_hint": "Individual explanation specific to this finding",
+        "evaluation_instructions": """1. **Separate Analysis**: Evaluate each finding independently without cross-influence
 2. **Validate Against Context**: Check if each vulnerability actually exists in the provided smart contract code
 3. **Individual Merit**: Base validity and severity solely on each finding's specific claims and the actual code context
 4. **Targeted Comments**: Provide 2-3 sentences explaining the evaluation for each specific finding
 5. **Use Exact IDs**: Include one evaluation per finding using its exact ID
-6. **Varied Results**: It's expected and appropriate for findings to have different validity and severity ratings
+6. **Varied Results**: It's expected and appropriate for findings to have different validity and severity ratings""",
+        "closing": "Analyze each finding on its individual merits and provide separate, independent evaluations based on the actual smart contract context provided.",
+    },
+}
 
-Analyze each finding on its individual merits and provide separate, independent evaluations based on the actual smart contract context provided.
-"""
+def _build_evaluation_prompt(
+    findings_batch: List[FindingDB],
+    task_cache: TaskCache,
+    prompt_style: Literal["related", "individual"]
+) -> str:
+    """
+    Build the evaluation prompt for a batch of findings.
+    
+    Args:
+        findings_batch: List of findings to evaluate
+        task_cache: Task context containing smart contract files and documentation
+        prompt_style: "related" for duplicates of one issue, "individual" for unrelated findings
+        
+    Returns:
+        Rendered prompt
+    """
+    return fill_prompt_template(_EVALUATION_PROMPT_TEMPLATE, {
+        **_PROMPT_STYLES[prompt_style],
+        "context_section": build_context_section(task_cache),
+        "findings_json": serialize_findings(findings_batch),
+    })
@@ -0,0 +1,73 @@
+"""
+Local similarity prefilter for deduplication.
+Uses character-shingle Jaccard similarity to find which findings could possibly be duplicates,
+so that obviously unique findings never reach the LLM.
+"""
+import re
+from typing import FrozenSet, List
+
+from app.models.finding_db import FindingDB
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 4) -> FrozenSet[str]:
+    """
+    Compute character shingles of a normalized text.
+    Character shingles tolerate word-form changes (withdraw/withdrawal, call/calls)
+    that word shingles would miss between reworded duplicates.
+    
+    Args:
+        text: Text to shingle
+        size: Number of characters per shingle
+        
+    Returns:
+        Set of shingles (the normalized text itself if shorter than one shingle)
+    """
+    normalized = " ".join(_WORD_PATTERN.findall(text.lower()))
+    if len(normalized) < size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Return the Jaccard similarity of two sets (0.0 when both are empty)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def find_candidate_groups(findings: List[FindingDB], threshold: float) -> List[List[FindingDB]]:
+    """
+    Group findings that are similar enough to be duplicate candidates.
+    Two findings are linked when they share a file path (or either has none) and the
+    Jaccard similarity of their title + description shingles is at least the threshold.
+    
+    Args:
+        findings: List of findings to prefilter
+        threshold: Minimum Jaccard similarity for two findings to be candidates
+        
+    Returns:
+        Connected components with at least two findings; findings not in any group are unique
+    """
+    signatures = [shingles(f"{finding.title} {finding.description}") for finding in findings]
+    paths = [set(finding.file_paths or []) for finding in findings]
+    parent = list(range(len(findings)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(findings)):
+        for j in range(i + 1, len(findings)):
+            if paths[i] and paths[j] and paths[i].isdisjoint(paths[j]):
+                continue
+            if find(i) != find(j) and jaccard(signatures[i], signatures[j]) >= threshold:
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i, finding in enumerate(findings):
+        groups.setdefault(find(i), []).append(finding)
+    return [group for group in groups.values() if len(group) > 1]
@@ -2,16 +2,69 @@
 Finding deduplication module for security findings submissions.
 Uses Gemini 2.5 Pro to identify duplicates across all findings in a single prompt.
 """
+import asyncio
 import logging
+from collections import defaultdict
 from typing import List, Dict, Any
 
 from app.types import TaskCache
-from app.core.gemini_model import create_structured_deduplication_model, find_duplicates_structured, DuplicateFinding, DeduplicationResult
+from app.config import config
+from app.core.gemini_model import (
+    create_structured_deduplication_model,
+    create_structured_batched_deduplication_model,
+    find_duplicates_structured,
+    find_duplicates_batched,
+    find_duplicates_many,
+    DuplicateFinding,
+    DeduplicationResult,
+)
+from app.core.gemini_batch import run_dedup_batch
+from app.core.dedup_prefilter import find_candidate_groups
 from app.database.mongodb_handler import mongodb
 from app.models.finding_db import FindingDB, Status
 
 logger = logging.getLogger(__name__)
 
+def partition_findings(findings: List[FindingDB]) -> List[List[FindingDB]]:
+    """
+    Partition findings into groups that could contain duplicates of each other.
+    Duplicates must reference the same contract file, so findings are grouped into
+    connected components of shared file paths. Findings without file paths form one group.
+    
+    Args:
+        findings: List of findings to partition
+        
+    Returns:
+        Groups of findings in order of first appearance
+    """
+    parent = list(range(len(findings)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner_by_path: Dict[str, int] = {}
+    no_path_owner = None
+    for i, finding in enumerate(findings):
+        paths = finding.file_paths or []
+        if not paths:
+            if no_path_owner is None:
+                no_path_owner = i
+            else:
+                parent[find(i)] = find(no_path_owner)
+        for path in paths:
+            if path in owner_by_path:
+                parent[find(i)] = find(owner_by_path[path])
+            else:
+                owner_by_path[path] = i
+
+    groups: Dict[int, List[FindingDB]] = {}
+    for i, finding in enumerate(findings):
+        groups.setdefault(find(i), []).append(finding)
+    return list(groups.values())
+
 class FindingDeduplication:
     """
     Handles deduplication of findings using Gemini.
@@ -29,13 +82,190 @@ class FindingDeduplication:
         
         # Initialize structured deduplication model
         self.deduplication_model = create_structured_deduplication_model()
+        self.batched_deduplication_model = create_structured_batched_deduplication_model()
     
-    async def deduplicate_findings(self, findings: List[FindingDB], task_cache: TaskCache) -> Dict[str, Any]:
+    async def _run_deduplication_model(self, findings: List[FindingDB], task_cache: TaskCache, latency_sensitive: bool) -> DeduplicationResult:
+        """
+        Run the Gemini deduplication call, using Batch Mode when enabled and latency does not matter.
+        Falls back to the interactive call if the batch job fails.
+        
+        Args:
+            findings: List of findings to deduplicate
+            task_cache: Task context
+            latency_sensitive: Whether the caller is waiting on the result
+            
+        Returns:
+            Structured deduplication result
+        """
+        if config.gemini_batch_mode and not latency_sensitive:
+            try:
+                return await self._batch_deduplication(findings, task_cache)
+            except Exception as e:
+                logger.warning(f"Gemini batch deduplication failed, falling back to interactive call: {str(e)}")
+
+        if config.dedup_prefilter_threshold is not None:
+            return await self._prefiltered_deduplication(findings, task_cache)
+
+        return await self._deduplicate_group(findings, task_cache)
+
+    async def _batch_deduplication(self, findings: List[FindingDB], task_cache: TaskCache) -> DeduplicationResult:
+        """
+        Deduplicate through Gemini Batch Mode, one batch request per group of findings that could
+        contain duplicates (candidate groups when the prefilter is enabled, file groups otherwise).
+        Groups too large for one prompt are deduplicated map-reduce style with interactive calls.
+        
+        Args:
+            findings: List of findings to deduplicate
+            task_cache: Task context
+            
+        Returns:
+            Merged structured deduplication result
+        """
+        if config.dedup_prefilter_threshold is not None:
+            groups = find_candidate_groups(findings, config.dedup_prefilter_threshold)
+        else:
+            # Groups with a single finding cannot contain duplicates
+            groups = [group for group in partition_findings(findings) if len(group) > 1]
+
+        batch_groups = [group for group in groups if len(group) <= config.dedup_max_bucket_size]
+        oversized_groups = [group for group in groups if len(group) > config.dedup_max_bucket_size]
+        logger.info(
+            f"Batch deduplication: {len(batch_groups)} groups in Batch Mode, "
+            f"{len(oversized_groups)} oversized groups map-reduce style"
+        )
+
+        results = list(await run_dedup_batch(batch_groups, task_cache)) if batch_groups else []
+        results.extend(await asyncio.gather(*[
+            self._map_reduce_deduplication(group, task_cache) for group in oversized_groups
+        ]))
+        return DeduplicationResult(results=[rel for result in results for rel in result.results])
+
+    async def _deduplicate_group(self, findings: List[FindingDB], task_cache: TaskCache) -> DeduplicationResult:
+        """
+        Deduplicate one group of findings, switching to map-reduce when it is too large for one prompt.
+        
+        Args:
+            findings: List of findings to deduplicate
+            task_cache: Task context
+            
+        Returns:
+            Structured deduplication result
+        """
+        if len(findings) > config.dedup_max_bucket_size:
+            return await self._map_reduce_deduplication(findings, task_cache)
+
+        return await find_duplicates_structured(self.deduplication_model, findings, task_cache)
+
+    async def _prefiltered_deduplication(self, findings: List[FindingDB], task_cache: TaskCache) -> DeduplicationResult:
+        """
+        Only send groups of lexically similar findings to Gemini; all other findings are unique.
+        Small groups are packed several per call to share the instruction and context overhead.
+        
+        Args:
+            findings: List of findings to deduplicate
+            task_cache: Task context
+            
+        Returns:
+            Merged structured deduplication result
+        """
+        candidate_groups = find_candidate_groups(findings, config.dedup_prefilter_threshold)
+        candidates = sum(len(group) for group in candidate_groups)
+        logger.info(
+            f"Dedup prefilter: {candidates}/{len(findings)} findings in {len(candidate_groups)} candidate groups, "
+            f"{len(findings) - candidates} skipped as unique"
+        )
+
+        # Pack small groups into shared calls as long as a packed prompt stays within one bucket
+        groups_per_call = config.gemini_dedup_groups_per_call
+        small_groups = [group for group in candidate_groups if len(group) * groups_per_call <= config.dedup_max_bucket_size]
+        if groups_per_call < 2 or len(small_groups) < 2:
+            small_groups = []
+        large_groups = [group for group in candidate_groups if len(group) * groups_per_call > config.dedup_max_bucket_size] if small_groups else candidate_groups
+
+        semaphore = asyncio.Semaphore(config.gemini_max_concurrency)
+
+        async def _run(group: List[FindingDB]) -> DeduplicationResult:
+            async with semaphore:
+                return await self._deduplicate_group(group, task_cache)
+
+        async def _run_packed() -> List[DeduplicationResult]:
+            if not small_groups:
+                return []
+            return await find_duplicates_batched(self.batched_deduplication_model, small_groups, task_cache, groups_per_call)
+
+        large_results, packed_results = await asyncio.gather(
+            asyncio.gather(*[_run(group) for group in large_groups]),
+            _run_packed()
+        )
+        results = list(large_results) + packed_results
+        return DeduplicationResult(results=[rel for result in results for rel in result.results])
+
+    async def _map_reduce_deduplication(self, findings: List[FindingDB], task_cache: TaskCache) -> DeduplicationResult:
+        """
+        Deduplicate a large set of findings with bounded prompts.
+        Map: deduplicate each bucket of findings sharing contract files concurrently.
+        Reduce: when a file group had to be split over several buckets, deduplicate the
+        remaining originals of that group once more and merge the relationships.
+        
+        Args:
+            findings: List of findings to deduplicate
+            task_cache: Task context
+            
+        Returns:
+            Merged structured deduplication result
+        """
+        max_size = config.dedup_max_bucket_size
+        # Groups with a single finding cannot contain duplicates
+        groups = [group for group in partition_findings(findings) if len(group) > 1]
+        buckets_per_group = [
+            [group[start:start + max_size] for start in range(0, len(group), max_size)]
+            for group in groups
+        ]
+        buckets = [bucket for group_buckets in buckets_per_group for bucket in group_buckets]
+        logger.info(f"Map-reduce deduplication: {len(findings)} findings in {len(buckets)} buckets")
+
+        # Map
+        map_results = await find_duplicates_many(self.deduplication_model, buckets, task_cache)
+        for result in map_results:
+            if isinstance(result, Exception):
+                raise result
+        relationships = [rel for result in map_results for rel in result.results]
+
+        # Reduce: only groups that were split can have duplicates across buckets
+        duplicate_ids = {rel.findingId for rel in relationships}
+        reduce_inputs = []
+        for group, group_buckets in zip(groups, buckets_per_group):
+            representatives = [f for f in group if f.str_id not in duplicate_ids]
+            if len(group_buckets) > 1 and len(representatives) > 1:
+                reduce_inputs.append(representatives)
+        if not reduce_inputs:
+            return DeduplicationResult(results=relationships)
+
+        reduce_results = await find_duplicates_many(self.deduplication_model, reduce_inputs, task_cache)
+        new_original = {}
+        for result in reduce_results:
+            if isinstance(result, Exception):
+                raise result
+            for rel in result.results:
+                new_original[rel.findingId] = rel.duplicateOf
+                relationships.append(rel)
+
+        # Re-point duplicates of an original that turned out to be a duplicate itself
+        merged = [
+            DuplicateFinding(findingId=rel.findingId, duplicateOf=new_original[rel.duplicateOf], explanation=rel.explanation)
+            if rel.duplicateOf in new_original and rel.findingId not in new_original else rel
+            for rel in relationships
+        ]
+        return DeduplicationResult(results=merged)
+
+    async def deduplicate_findings(self, findings: List[FindingDB], task_cache: TaskCache, latency_sensitive: bool = True) -> Dict[str, Any]:
         """
         Deduplicate findings using Gemini with structured output.
         
         Args:
             findings: List of findings to deduplicate
+            task_cache: Task context
+            latency_sensitive: Whether the caller is waiting on the result (disables Batch Mode)
             
         Returns:
             Dictionary containing deduplication results and statistics
@@ -49,13 +279,25 @@ class FindingDeduplication:
                 "original_findings": [],
                 "duplicate_findings": []
             }
-        
+
+        # A single finding cannot have duplicates - skip the Gemini round-trip entirely
+        if len(findings) < 2:
+            logger.info("Only one finding to deduplicate, skipping Gemini call")
+            return {
+                "total": len(findings),
+                "duplicates": 0,
+                "originals": 0,
+                "duplicate_relationships": [],
+                "original_findings": [],
+                "duplicate_findings": []
+            }
+
         try:
             logger.info(f"Starting deduplication of {len(findings)} findings")
             
             # Use structured output for guaranteed JSON format
-            dedup_result: DeduplicationResult = await find_duplicates_structured(
-                self.deduplication_model, findings, task_cache
+            dedup_result: DeduplicationResult = await self._run_deduplication_model(
+                findings, task_cache, latency_sensitive
             )
             duplicate_results: List[DuplicateFinding] = dedup_result.results
             
@@ -207,11 +449,11 @@ class FindingDeduplication:
                 Status.PENDING: 0
             }
             
-            updated_count = 0
+            updates = []
             duplicate_rels: List[DuplicateFinding] = dedup_results["duplicate_relationships"]
             
             # Create efficient mappings once for all findings processing
-            original_to_duplicates = {}  # Maps original_id -> [duplicate_ids]
+            original_to_duplicates = defaultdict(list)  # Maps original_id -> [duplicate_ids]
             duplicate_to_original = {}   # Maps duplicate_id -> original_id
             finding_map = {f.str_id: f for f in findings}  # Maps finding_id -> finding
             
@@ -227,8 +469,6 @@ class FindingDeduplication:
                 duplicate_to_original[rel.findingId] = rel.duplicateOf
                 
                 # Build original_to_duplicates mapping
-                if rel.duplicateOf not in original_to_duplicates:
-                    original_to_duplicates[rel.duplicateOf] = []
                 original_to_duplicates[rel.duplicateOf].append(rel.findingId)
             
             for finding in findings:
@@ -261,15 +501,19 @@ class FindingDeduplication:
                         finding.duplicateOf = original_id
                         finding.deduplication_comment = f"Already reported in finding '{original_id}': {explanation}"
                         
-                # Save to database
-                success = await self.mongodb.update_finding(task_id, finding.str_id, finding)
-                
-                if success:
-                    updated_count += 1
-                    status_counts[new_status] += 1
-                    logger.info(f"Updated '{finding.title}' status: {old_status} → {new_status}")
-                else:
-                    logger.warning(f"Failed to update status for '{finding.title}'")
+                status_counts[new_status] += 1
+                # Only the deduplication fields change, so only they are written
+                updates.append((finding.str_id, {
+                    "status": finding.status,
+                    "duplicateOf": finding.duplicateOf,
+                    "deduplication_comment": finding.deduplication_comment
+                }))
+                logger.info(f"Setting '{finding.title}' status: {old_status} → {new_status}")
+            
+            # Save all status changes in one bulk write
+            updated_count = len(await self.mongodb.update_findings_bulk(task_id, updates))
+            if updated_count < len(updates):
+                logger.warning(f"Only {updated_count} of {len(updates)} finding status updates were applied")
             
             return {
                 "total_processed": len(findings),
@@ -288,13 +532,15 @@ class FindingDeduplication:
                 "error": str(e)
             }
     
-    async def process_findings(self, task_id: str, findings: List[FindingDB], task_cache: TaskCache) -> Dict[str, Any]:
+    async def process_findings(self, task_id: str, findings: List[FindingDB], task_cache: TaskCache, latency_sensitive: bool = True) -> Dict[str, Any]:
         """
         Main entry point for processing findings through deduplication with comprehensive status management.
         
         Args:
             task_id: Task identifier
             findings: List of findings to process
+            task_cache: Task context
+            latency_sensitive: Whether the caller is waiting on the result (disables Batch Mode)
             
         Returns:
             Complete processing results with detailed status information
@@ -302,7 +548,7 @@ class FindingDeduplication:
         logger.info(f"Processing {len(findings)} findings for task {task_id}")
         
         # Step 1: Deduplicate findings
-        dedup_results = await self.deduplicate_findings(findings, task_cache)
+        dedup_results = await self.deduplicate_findings(findings, task_cache, latency_sensitive)
         
         # Step 2: Apply comprehensive status management
         status_results = await self.apply_finding_statuses(task_id, findings, dedup_results)
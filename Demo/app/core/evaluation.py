@@ -1,6 +1,6 @@
 import logging
+from collections import defaultdict
 from typing import List, Dict, Any, Tuple
-from datetime import datetime, timezone
 
 from app.models.finding_input import Severity
 from app.types import TaskCache
@@ -16,6 +16,15 @@ from app.core.claude_model import (
 
 logger = logging.getLogger(__name__)
 
+# Lower-cased severity labels returned by the model, mapped to Severity values
+_SEVERITY_BY_NAME = {
+    "info": Severity.INFO,
+    "low": Severity.LOW,
+    "medium": Severity.MEDIUM,
+    "high": Severity.HIGH,
+    "critical": Severity.HIGH,
+}
+
 class FindingEvaluator:
     """
     Handles final evaluation of security findings.
@@ -54,18 +63,7 @@ class FindingEvaluator:
         Returns:
             Severity enum value
         """
-        severity_lower = severity_text.lower().strip()
-        
-        if severity_lower == "info":
-            return Severity.INFO
-        elif severity_lower == "low":
-            return Severity.LOW
-        elif severity_lower == "medium":
-            return Severity.MEDIUM
-        elif severity_lower in ["high", "critical"]:
-            return Severity.HIGH
-        else:
-            return Severity.LOW # Default fallback
+        return _SEVERITY_BY_NAME.get(severity_text.lower().strip(), Severity.LOW)  # Default fallback: LOW
     
     def group_findings_for_evaluation(self, findings: List[FindingDB], duplicate_relationships: List[DuplicateFinding]) -> Tuple[List[List[FindingDB]], List[List[FindingDB]]]:
         """
@@ -83,7 +81,7 @@ class FindingEvaluator:
         finding_map = {f.str_id: f for f in findings}
         
         # Create a mapping of originals to their duplicates based on duplicate_relationships
-        original_to_duplicates = {}
+        original_to_duplicates = defaultdict(list)
         
         for rel in duplicate_relationships:
             duplicate_id = rel.findingId
@@ -97,8 +95,6 @@ class FindingEvaluator:
                 logger.warning(f"Original ID {original_id} not found in findings list")
                 continue
 
-            if original_id not in original_to_duplicates:
-                original_to_duplicates[original_id] = []
             original_to_duplicates[original_id].append(duplicate_id)
         
         related_findings_groups = []
@@ -167,16 +163,15 @@ class FindingEvaluator:
         Returns:
             Summary of applied changes
         """
-        valid_count = 0
-        disputed_count = 0
         failed_count = 0
+        updates = []
+        validity = []  # is_valid of each entry in updates
         
         for eval_result in evaluation_results:
             try:
                 update_fields = {
                     "evaluated_severity": self._normalize_severity(eval_result.severity),
-                    "evaluation_comment": eval_result.comment,
-                    "updated_at": datetime.now(timezone.utc)
+                    "evaluation_comment": eval_result.comment
                 }
                 
                 if not eval_result.comment:
@@ -186,18 +181,8 @@ class FindingEvaluator:
                 if not eval_result.is_valid:
                     update_fields["status"] = Status.DISPUTED
                 
-                success = await self.mongodb.update_finding(task_id, eval_result.finding_id, update_fields)
-                
-                if success:
-                    if eval_result.is_valid:
-                        valid_count += 1
-                        logger.info(f"Successfully updated valid finding {eval_result.finding_id} (no status change)")
-                    else:
-                        disputed_count += 1
-                        logger.info(f"Successfully updated finding {eval_result.finding_id} with status {update_fields['status']}")
-                else:
-                    failed_count += 1
-                    logger.error(f"Failed to update finding {eval_result.finding_id} in database")
+                updates.append((eval_result.finding_id, update_fields))
+                validity.append(eval_result.is_valid)
 
             except Exception as e:
                 failed_count += 1
@@ -205,6 +190,31 @@ class FindingEvaluator:
                 logger.error(f"eval_result data: is_valid={eval_result.is_valid}, severity={eval_result.severity}, comment={eval_result.comment}")
                 continue
         
+        # Save all evaluations in one bulk write, then count each evaluation as valid, disputed
+        # or failed from whether its own finding was updated, so every evaluation is counted once
+        valid_count = 0
+        disputed_count = 0
+        if updates:
+            try:
+                updated_ids = set(await self.mongodb.update_findings_bulk(task_id, updates))
+            except Exception as e:
+                logger.error(f"Error saving evaluation results: {str(e)}")
+                updated_ids = set()
+            
+            for (finding_id, _), is_valid in zip(updates, validity):
+                if finding_id not in updated_ids:
+                    failed_count += 1
+                elif is_valid:
+                    valid_count += 1
+                else:
+                    disputed_count += 1
+            
+            not_updated = len(updates) - valid_count - disputed_count
+            if not_updated:
+                logger.error(f"Failed to update {not_updated} of {len(updates)} evaluated findings in database")
+            else:
+                logger.info(f"Updated {len(updates)} evaluated findings ({disputed_count} disputed)")
+        
         return {
             "total_evaluations": len(evaluation_results),
             "valid_count": valid_count,
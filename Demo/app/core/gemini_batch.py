@@ -0,0 +1,149 @@
+"""
+File-based Gemini Batch Mode runner for deduplication.
+Requests are uploaded as a JSONL file through the Gemini File API instead of being sent inline,
+which lifts the inline request size limit for large scheduled deduplication runs.
+"""
+import io
+import logging
+from typing import List, Optional
+
+import orjson
+from google.genai import types as genai_types
+
+from app.config import config
+from app.core.gemini_model import (
+    DeduplicationResult,
+    _build_dedup_messages,
+    find_duplicates_structured_batch,
+    get_genai_client,
+    wait_for_batch_job,
+)
+from app.models.finding_db import FindingDB
+from app.types import TaskCache
+
+logger = logging.getLogger(__name__)
+
+# Gemini rejects inline batch requests above 20MB; stay well below it
+_INLINE_BATCH_MAX_BYTES = 10 * 1024 * 1024
+
+_REQUEST_KEY_PREFIX = "group-"
+
+
+def _build_batch_jsonl(findings_groups: List[List[FindingDB]], task_cache: TaskCache) -> bytes:
+    """
+    Build the JSONL batch input, one keyed dedup request per group.
+    
+    Args:
+        findings_groups: Groups of findings, each deduplicated independently
+        task_cache: Task context containing smart contract files and documentation
+        
+    Returns:
+        Encoded JSONL content
+    """
+    schema = DeduplicationResult.model_json_schema()
+    lines = []
+    for i, group in enumerate(findings_groups):
+        (_, system_prompt), (_, user_prompt) = _build_dedup_messages(group, task_cache)
+        lines.append(orjson.dumps({
+            "key": f"{_REQUEST_KEY_PREFIX}{i}",
+            "request": {
+                "system_instruction": {"parts": [{"text": system_prompt}]},
+                "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+                "generation_config": {
+                    "response_mime_type": "application/json",
+                    "response_json_schema": schema,
+                    "max_output_tokens": config.gemini_max_tokens,
+                },
+            },
+        }))
+    return b"\n".join(lines)
+
+
+async def submit_dedup_batch(batch_jsonl: bytes, task_cache: TaskCache) -> str:
+    """
+    Upload dedup requests as a JSONL file and submit a Gemini batch job.
+    
+    Args:
+        batch_jsonl: JSONL batch input as built by _build_batch_jsonl
+        task_cache: Task context the requests were built for
+        
+    Returns:
+        Name of the submitted batch job (pass to collect_dedup_batch)
+    """
+    client = get_genai_client()
+
+    uploaded = await client.aio.files.upload(
+        file=io.BytesIO(batch_jsonl),
+        config={"display_name": f"dedup-{task_cache.taskId}", "mime_type": "jsonl"},
+    )
+    job = await client.aio.batches.create(
+        model=config.gemini_model,
+        src=uploaded.name,
+        config={"display_name": f"dedup-{task_cache.taskId}"},
+    )
+
+    logger.info(f"Submitted Gemini file dedup batch job {job.name} ({len(batch_jsonl)} bytes of requests)")
+    return job.name
+
+
+async def collect_dedup_batch(job_name: str, poll_interval: Optional[float] = None) -> List[DeduplicationResult]:
+    """
+    Wait for a file-based dedup batch job and parse its JSONL output.
+    
+    Args:
+        job_name: Name returned by submit_dedup_batch
+        poll_interval: Optional seconds between job status polls (defaults to config)
+        
+    Returns:
+        One deduplication result per submitted group, in submission order
+        
+    Raises:
+        ValueError: If the job does not succeed or any request in it failed
+    """
+    poll_interval = poll_interval if poll_interval is not None else config.gemini_batch_poll_interval
+    client = get_genai_client()
+
+    job = await wait_for_batch_job(client, await client.aio.batches.get(name=job_name), poll_interval)
+    if not job.dest or not job.dest.file_name:
+        raise ValueError(f"Gemini dedup batch job {job_name} has no output file")
+
+    output = await client.aio.files.download(file=job.dest.file_name)
+
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = orjson.loads(line)
+        if "error" in item or "response" not in item:
+            raise ValueError(f"Gemini dedup batch request {item.get('key')} failed: {item.get('error')}")
+        response = genai_types.GenerateContentResponse.model_validate(item["response"])
+        results[int(item["key"][len(_REQUEST_KEY_PREFIX):])] = DeduplicationResult.model_validate_json(response.text)
+
+    if sorted(results) != list(range(len(results))):
+        raise ValueError(f"Gemini dedup batch job {job_name} returned incomplete output")
+
+    logger.info(f"Gemini file dedup batch job {job_name} completed with {len(results)} results")
+    return [results[i] for i in range(len(results))]
+
+
+async def run_dedup_batch(findings_groups: List[List[FindingDB]], task_cache: TaskCache) -> List[DeduplicationResult]:
+    """
+    Deduplicate groups through Gemini Batch Mode, sending requests inline when small
+    and through an uploaded JSONL file when they would exceed the inline size limit.
+    
+    Args:
+        findings_groups: Groups of findings, each deduplicated independently
+        task_cache: Task context containing smart contract files and documentation
+        
+    Returns:
+        One deduplication result per group, in input order
+    """
+    batch_jsonl = _build_batch_jsonl(findings_groups, task_cache)
+    if len(batch_jsonl) <= _INLINE_BATCH_MAX_BYTES:
+        return await find_duplicates_structured_batch(findings_groups, task_cache)
+
+    job_name = await submit_dedup_batch(batch_jsonl, task_cache)
+    results = await collect_dedup_batch(job_name)
+    if len(results) != len(findings_groups):
+        raise ValueError(f"Gemini dedup batch job {job_name} returned {len(results)} results for {len(findings_groups)} groups")
+    return results
@@ -1,11 +1,18 @@
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from functools import lru_cache, partial
+from typing import Optional, Dict, Any, List, Tuple
 from app.types import TaskCache
 from app.models.finding_db import FindingDB
 from app.config import config
 from langchain_google_genai import ChatGoogleGenerativeAI
-from pydantic import BaseModel, Field
-from app.core.prompt_utils import build_context_section
+from langchain_core.runnables import RunnableBinding, RunnableLambda, RunnableParallel, RunnableSequence
+from google import genai
+from google.genai import types as genai_types
+from pydantic import BaseModel, ConfigDict, Field
+from app.core.prompt_utils import build_context_section, fill_prompt_template, serialize_findings
+from app.core.llm_cache import dedup_response_cache
+from app.core.rate_limit import ainvoke_with_limits
 
 
 logger = logging.getLogger(__name__)
@@ -13,14 +20,24 @@ logger = logging.getLogger(__name__)
 
 class DuplicateFinding(BaseModel):
     """Single duplicate finding relationship."""
+    model_config = ConfigDict(frozen=True)
+
     findingId: str = Field(description="ID of the finding that is a duplicate", min_length=1)
     duplicateOf: str = Field(description="ID of the original finding", min_length=1)
     explanation: str = Field(description="Explanation of why the finding is a duplicate")
 
 class DeduplicationResult(BaseModel):
     """Result of deduplication analysis."""
+    model_config = ConfigDict(frozen=True)
+
     results: List[DuplicateFinding] = Field(description="List of duplicate relationships")
 
+class BatchedDeduplicationResult(BaseModel):
+    """Result of deduplication analysis over several independent groups."""
+    model_config = ConfigDict(frozen=True)
+
+    groups: List[DeduplicationResult] = Field(description="One deduplication result per group, in group order")
+
 def get_gemini_config() -> Dict[str, Any]:
     """
     Get Gemini model configuration from environment variables.
@@ -112,7 +129,32 @@ def create_gemini_model(
         if gemini_config["temperature"] is not None:
             kwargs["temperature"] = gemini_config["temperature"]
 
-    return ChatGoogleGenerativeAI(**kwargs)
+    # Reuse one client (and its pooled connections) per distinct configuration
+    if kwargs["api_key"] not in _seen_api_keys:
+        _seen_api_keys.add(kwargs["api_key"])
+        if len(_seen_api_keys) > 1:
+            logger.warning("Multiple Gemini API keys in use; each key gets its own cached client.")
+
+    return _cached_gemini_model(tuple(sorted(kwargs.items())))
+
+# API keys seen by create_gemini_model (several keys means several cached clients)
+_seen_api_keys = set()
+
+@lru_cache(maxsize=8)
+def _cached_gemini_model(model_kwargs: Tuple[Tuple[str, Any], ...]) -> ChatGoogleGenerativeAI:
+    """
+    Create a Gemini model once per configuration.
+    
+    Args:
+        model_kwargs: Sorted (name, value) pairs of ChatGoogleGenerativeAI arguments
+        
+    Returns:
+        Shared ChatGoogleGenerativeAI instance
+    """
+    return ChatGoogleGenerativeAI(**dict(model_kwargs))
+
+# Default structured deduplication model, created lazily and shared by all callers
+_default_structured_dedup_model = None
 
 def create_structured_deduplication_model(
     model: Optional[ChatGoogleGenerativeAI] = None
@@ -126,10 +168,97 @@ def create_structured_deduplication_model(
     Returns:
         Configured model with structured output for deduplication
     """
-    if not model:
-        model = create_gemini_model()
+    global _default_structured_dedup_model
+
+    if model:
+        return model.with_structured_output(DeduplicationResult, include_raw=True)
+
+    # Share one runnable across all callers/coroutines when using the default model
+    if _default_structured_dedup_model is None:
+        _default_structured_dedup_model = create_gemini_model().with_structured_output(
+            DeduplicationResult, include_raw=True
+        )
+    return _default_structured_dedup_model
+
+# Output contract stated in one line; the structured-output schema enforces the details
+_DEDUP_RETURN_FORMAT = """Output JSON: {"results": [{"findingId": "<duplicate ID>", "duplicateOf": "<original ID>", "explanation": "<2-3 sentences>"}]} - duplicates only, [] if none."""
+
+_BATCHED_DEDUP_RETURN_FORMAT = """Findings are split into independent groups; only compare findings within the same group.
+Output JSON with one entry per group, in group order: {"groups": [{"results": [{"findingId": "<duplicate ID>", "duplicateOf": "<original ID in same group>", "explanation": "<2-3 sentences>"}]}]} - duplicates only, [] for a group without any."""
+
+# Compact system instructions; placeholders are filled in a single pass (JSON braces need no escaping)
+_DEDUP_SYSTEM_TEMPLATE = """You are a Solidity security expert. Identify duplicate findings among the security reports provided.
+
+A finding is a duplicate of another only if ALL hold:
+1. Same contract file
+2. Same function
+3. Same or overlapping code lines
+4. Same root cause (identical vulnerability mechanism)
+
+Rules:
+- Similar issue types in different functions, files or code sections are NOT duplicates (e.g. reentrancy in claimReward() vs processRefund()).
+- Each duplicate group has exactly one original; no circular links; no finding is both original and duplicate.
+- Choose as original the most accurate, complete, clear and best-evidenced finding of its group.
+- List only duplicates (never originals) with exact finding IDs; each explanation cites the matching code section.
+- Be conservative: if unsure, it is not a duplicate.
 
-    return model.with_structured_output(DeduplicationResult, include_raw=True)
+{return_format}"""
+
+_DEDUP_USER_TEMPLATE = """## SMART CONTRACT CONTEXT
+{context_section}
+
+## FINDINGS TO ANALYZE
+{findings_json}"""
+
+def _render_dedup_messages(context_section: str, findings_json: str, return_format: str) -> List[Tuple[str, str]]:
+    """Render the deduplication prompt as (role, content) system and user messages."""
+    return [
+        ("system", fill_prompt_template(_DEDUP_SYSTEM_TEMPLATE, {"return_format": return_format})),
+        ("human", fill_prompt_template(_DEDUP_USER_TEMPLATE, {"context_section": context_section, "findings_json": findings_json})),
+    ]
+
+def _build_dedup_messages(findings: List[FindingDB], task_cache: TaskCache) -> List[Tuple[str, str]]:
+    """Build the deduplication messages for a group of findings."""
+    return _render_dedup_messages(
+        build_context_section(task_cache),
+        serialize_findings(findings),
+        _DEDUP_RETURN_FORMAT
+    )
+
+def _build_batched_dedup_messages(findings_groups: List[List[FindingDB]], task_cache: TaskCache) -> List[Tuple[str, str]]:
+    """Build deduplication messages covering several independent groups of findings."""
+    findings_section = "\n\n".join(
+        f"### GROUP {i}\n{serialize_findings(group)}"
+        for i, group in enumerate(findings_groups)
+    )
+    return _render_dedup_messages(
+        build_context_section(task_cache),
+        findings_section,
+        _BATCHED_DEDUP_RETURN_FORMAT
+    )
+
+def _model_cache_identity(runnable: Any) -> Optional[Tuple[str, ...]]:
+    """
+    Identify the Gemini chat model behind a (structured output) runnable for response caching.
+    
+    Args:
+        runnable: Chat model, or a runnable wrapping one (e.g. from with_structured_output)
+        
+    Returns:
+        Model name and generation settings, or None if no Gemini chat model is found
+    """
+    pending = [runnable]
+    while pending:
+        current = pending.pop(0)
+        if isinstance(current, ChatGoogleGenerativeAI):
+            return (current.model, str(current.temperature), str(current.thinking_level), str(current.max_output_tokens))
+        if isinstance(current, RunnableBinding):
+            pending.append(current.bound)
+        elif isinstance(current, RunnableSequence):
+            pending.extend(current.steps)
+        elif isinstance(current, RunnableParallel):
+            pending.extend(current.steps__.values())
+    return None
 
 async def find_duplicates_structured(
     model_with_structured_output: any,
@@ -149,81 +278,20 @@ async def find_duplicates_structured(
         Structured deduplication result with guaranteed JSON format
     """
     
-    # Build context section
-    context_section = build_context_section(task_cache)
-    
-    prompt = f"""
-You are a security expert with deep expertise in Solidity smart contract vulnerabilities, tasked with identifying duplicate findings among security vulnerability reports.
-
-## TASK:
-1. **Group duplicate findings** - Identify vulnerabilities that describe the same underlying security issue affecting the same function and code section
-2. **Select the best finding in each group** - For each group of duplicates, choose the highest quality finding as the original
-3. **Provide explanation** - Explain why each finding is considered a duplicate of the original
-
-## DUPLICATE IDENTIFICATION - Four-Step Validation:
-1. **Same contract file**: Do findings reference the same contract?
-2. **Same function**: Do findings reference the exact same function name?
-3. **Same code section**: Do findings reference the same or overlapping code lines?
-4. **Same root cause**: Is the underlying vulnerability mechanism identical?
-
-✅ **THESE ARE DUPLICATES:**
-- Same vulnerability type and attack vector in the exact same function with different descriptions
-- Identical root cause affecting the exact same code lines with different wording
-
-❌ **THESE ARE NOT DUPLICATES:**
-- Similar vulnerability types in different functions (e.g., reentrancy in different functions)
-- Similar descriptions but different contract files or code sections
-- Different root causes, attack vectors, or consequences despite similar terminology
-
-## CRITICAL RULES TO PREVENT ERRORS:
-
-🚫 **NO CIRCULAR RELATIONSHIPS:**
-- Each duplicate group has exactly ONE original that others point to
-- If Finding A is duplicate of Finding B, then Finding B CANNOT be duplicate of Finding A
-- No finding can appear as both original and duplicate
-
-🚫 **NO OVER-GROUPING:**
-- Findings affecting different functions or code sectionsare never duplicates, even if vulnerability types are similar
-- Example: "Missing access control in withdraw()" vs "Missing access control in deposit()" = NOT duplicates
-- Example: "Reentrancy in claimReward()" vs "Reentrancy in processRefund()" = NOT duplicates
-
-## QUALITY CRITERIA for selecting the original:
-- **Technical accuracy**: Most precise vulnerability description
-- **Completeness**: Contains comprehensive details about the issue
-- **Clarity**: Easy to understand and identify
-- **Evidence**: Better code references, examples, or proof-of-concept
-
-## OUTPUT REQUIREMENTS:
-- **For each duplicate**: Include findingId, duplicateOf, and detailed explanation
-- **Only duplicates in results**: Don't include the original findings in the results
-- **Empty list if no duplicates**: Return [] if no duplicate relationships exist
-- **Clear explanations**: Each explanation should be 2-3 sentences describing why it's a duplicate
-- **Use exact Finding IDs**: Make sure to use the exact Finding ID from the analysis
-
-## RETURN FORMAT
-Return a JSON object with the following structure:
-```json
-{{
-    "results": [
-        {{
-            "findingId": "Finding ID that is a duplicate",
-            "duplicateOf": "Original Finding ID",
-            "explanation": "Explanation including specific code section match and reason why it's a duplicate"
-        }}
-    ]
-}}
-```
-
-## SMART CONTRACT CONTEXT
-{context_section}
-
-## FINDINGS TO ANALYZE
-{[finding.dump() for finding in findings]}
+    messages = _build_dedup_messages(findings, task_cache)
 
-Analyze systematically: group similar findings, examine each vulnerability against the smart contract context above, compare affected functions, code sections and root causes, and rank quality within duplicate groups. Be conservative - only mark findings as duplicates if you're confident they describe the same underlying security vulnerability in the same function and code section.
-"""
+    # Identical prompt + model settings -> identical request, reuse the previous answer.
+    # Responses of models that cannot be identified are never cached.
+    model_identity = _model_cache_identity(model_with_structured_output)
+    cache_key = None
+    if model_identity is not None:
+        cache_key = dedup_response_cache.make_key(*model_identity, *(content for _, content in messages))
+        cached = dedup_response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Gemini dedup: returning cached response")
+            return DeduplicationResult.model_validate_json(cached)
 
-    response = await model_with_structured_output.ainvoke(prompt)
+    response = await ainvoke_with_limits(model_with_structured_output, messages)
 
     raw = response.get("raw")
     parsed = response.get("parsed")
@@ -244,4 +312,206 @@ Analyze systematically: group similar findings, examine each vulnerability again
     if parsing_error is not None or parsed is None:
         raise ValueError(f"Failed to parse Gemini deduplication response: {parsing_error}")
 
+    if cache_key is not None:
+        dedup_response_cache.set(cache_key, parsed.model_dump_json())
     return parsed
+
+def create_structured_batched_deduplication_model(
+    model: Optional[ChatGoogleGenerativeAI] = None
+) -> any:
+    """
+    Create a Gemini model with structured output for batched (multi-group) deduplication.
+    
+    Args:
+        model: Optional ChatGoogleGenerativeAI model (created from environment if not provided)
+        
+    Returns:
+        Configured model with structured output for batched deduplication
+    """
+    if not model:
+        model = create_gemini_model()
+
+    return model.with_structured_output(BatchedDeduplicationResult, include_raw=True)
+
+async def find_duplicates_batched(
+    model_with_structured_output,
+    findings_groups: List[List[FindingDB]],
+    task_cache: TaskCache,
+    groups_per_call: Optional[int] = None
+) -> List[DeduplicationResult]:
+    """
+    Find duplicate findings for several small groups, packing multiple groups into one Gemini call.
+    Saves the fixed instruction/context overhead that separate calls would pay per group.
+    
+    Args:
+        model_with_structured_output: Gemini model configured for BatchedDeduplicationResult output
+        findings_groups: Groups of findings, each deduplicated independently
+        task_cache: Task context containing smart contract files and documentation
+        groups_per_call: Optional number of groups per call (defaults to config)
+        
+    Returns:
+        One deduplication result per group, in input order
+        
+    Raises:
+        ValueError: If a response cannot be parsed or has the wrong number of groups
+    """
+    groups_per_call = groups_per_call or config.gemini_dedup_groups_per_call
+    chunks = [findings_groups[start:start + groups_per_call] for start in range(0, len(findings_groups), groups_per_call)]
+    if not chunks:
+        return []
+
+    # Chunks are independent - send them concurrently through an LCEL runnable that keeps the rate limit
+    limited_model = RunnableLambda(partial(ainvoke_with_limits, model_with_structured_output))
+    responses = await limited_model.abatch(
+        [_build_batched_dedup_messages(chunk, task_cache) for chunk in chunks],
+        config={"max_concurrency": config.gemini_max_concurrency}
+    )
+
+    results: List[DeduplicationResult] = []
+    for chunk, response in zip(chunks, responses):
+        parsed = response.get("parsed")
+        parsing_error = response.get("parsing_error")
+        if parsing_error is not None or parsed is None:
+            raise ValueError(f"Failed to parse Gemini batched deduplication response: {parsing_error}")
+        if len(parsed.groups) != len(chunk):
+            raise ValueError(f"Gemini returned {len(parsed.groups)} groups, expected {len(chunk)}")
+
+        results.extend(parsed.groups)
+
+    return results
+
+async def find_duplicates_many(
+    model_with_structured_output,
+    findings_groups: List[List[FindingDB]],
+    task_cache: TaskCache,
+    max_concurrency: Optional[int] = None
+) -> List[Any]:
+    """
+    Find duplicate findings for several independent groups concurrently.
+    
+    Args:
+        model_with_structured_output: Gemini model configured for structured output
+        findings_groups: Groups of findings, each deduplicated independently
+        task_cache: Task context containing smart contract files and documentation
+        max_concurrency: Optional cap on in-flight Gemini calls (defaults to config)
+        
+    Returns:
+        One entry per group, in input order: a DeduplicationResult, or the exception raised for that group
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or config.gemini_max_concurrency)
+
+    async def _run(group: List[FindingDB]) -> DeduplicationResult:
+        async with semaphore:
+            return await find_duplicates_structured(model_with_structured_output, group, task_cache)
+
+    return await asyncio.gather(*[_run(group) for group in findings_groups], return_exceptions=True)
+
+# Gemini SDK client for Batch Mode and the File API, created lazily and shared by all callers
+_genai_client = None
+
+def get_genai_client() -> genai.Client:
+    """
+    Get the shared Gemini SDK client, creating it on first use.
+    
+    Returns:
+        Shared genai.Client instance
+    """
+    global _genai_client
+
+    if _genai_client is None:
+        _genai_client = genai.Client(api_key=config.gemini_api_key)
+    return _genai_client
+
+# Batch job states after which the job will not change anymore
+_BATCH_TERMINAL_STATES = {
+    genai_types.JobState.JOB_STATE_SUCCEEDED,
+    genai_types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    genai_types.JobState.JOB_STATE_FAILED,
+    genai_types.JobState.JOB_STATE_CANCELLED,
+    genai_types.JobState.JOB_STATE_EXPIRED,
+}
+
+async def wait_for_batch_job(client: genai.Client, job: genai_types.BatchJob, poll_interval: float) -> genai_types.BatchJob:
+    """
+    Poll a Gemini batch job until it reaches a terminal state.
+    
+    Args:
+        client: Gemini client
+        job: Batch job as returned by create/get
+        poll_interval: Seconds between status polls
+        
+    Returns:
+        The succeeded batch job
+        
+    Raises:
+        ValueError: If the job ends in any state other than succeeded
+    """
+    while job.state not in _BATCH_TERMINAL_STATES:
+        await asyncio.sleep(poll_interval)
+        job = await client.aio.batches.get(name=job.name)
+
+    if job.state != genai_types.JobState.JOB_STATE_SUCCEEDED:
+        raise ValueError(f"Gemini dedup batch job {job.name} finished with state {job.state}: {job.error}")
+    return job
+
+async def find_duplicates_structured_batch(
+    findings_groups: List[List[FindingDB]],
+    task_cache: TaskCache,
+    poll_interval: Optional[float] = None
+) -> List[DeduplicationResult]:
+    """
+    Find duplicate findings for several groups through Gemini Batch Mode.
+    Batch jobs are cheaper than interactive calls but have no latency guarantee,
+    so this is only meant for non-interactive deduplication (e.g. at task deadline).
+    
+    Args:
+        findings_groups: Groups of findings, each deduplicated independently
+        task_cache: Task context containing smart contract files and documentation
+        poll_interval: Optional seconds between job status polls (defaults to config)
+        
+    Returns:
+        One structured deduplication result per group, in input order
+        
+    Raises:
+        ValueError: If the batch job does not succeed or a response cannot be parsed
+    """
+    if not findings_groups:
+        return []
+
+    poll_interval = poll_interval if poll_interval is not None else config.gemini_batch_poll_interval
+    client = get_genai_client()
+
+    inlined_requests = []
+    for group in findings_groups:
+        (_, system_prompt), (_, user_prompt) = _build_dedup_messages(group, task_cache)
+        inlined_requests.append({
+            "contents": [{"role": "user", "parts": [{"text": user_prompt}]}],
+            "config": {
+                "system_instruction": system_prompt,
+                "response_mime_type": "application/json",
+                "response_schema": DeduplicationResult,
+                "max_output_tokens": config.gemini_max_tokens,
+            },
+        })
+
+    job = await client.aio.batches.create(
+        model=config.gemini_model,
+        src=inlined_requests,
+        config={"display_name": f"dedup-{task_cache.taskId}"},
+    )
+    logger.info(f"Submitted Gemini dedup batch job {job.name} with {len(inlined_requests)} requests")
+
+    job = await wait_for_batch_job(client, job, poll_interval)
+
+    inlined_responses = job.dest.inlined_responses if job.dest else None
+    if not inlined_responses or len(inlined_responses) != len(findings_groups):
+        raise ValueError(f"Gemini dedup batch job {job.name} returned an unexpected number of responses")
+
+    results = []
+    for inlined in inlined_responses:
+        if inlined.error is not None or inlined.response is None:
+            raise ValueError(f"Gemini dedup batch request failed: {inlined.error}")
+        results.append(DeduplicationResult.model_validate_json(inlined.response.text))
+
+    logger.info(f"Gemini dedup batch job {job.name} completed with {len(results)} results")
+    return results
@@ -0,0 +1,102 @@
+"""
+In-process response cache for LLM calls.
+Avoids re-paying tokens and latency when the exact same prompt is sent again (retries, reruns).
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+from app.config import config
+
+
+class LLMResponseCache:
+    """
+    TTL + LRU cache of serialized LLM responses keyed by a SHA-256 content hash.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl_seconds: How long an entry stays valid
+            max_entries: Maximum number of entries kept (least recently used are evicted)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Build a cache key from the given parts.
+        
+        Args:
+            parts: Strings that together identify the request (model, settings, prompt)
+            
+        Returns:
+            Hex SHA-256 digest of the parts
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached value if present and not expired.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached serialized response or None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a serialized response.
+        
+        Args:
+            key: Cache key
+            value: Serialized response
+        """
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counts and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+# Global cache for deduplication responses
+dedup_response_cache = LLMResponseCache(
+    ttl_seconds=config.llm_cache_ttl_seconds,
+    max_entries=config.llm_cache_max_entries
+)
+
+def cache_stats() -> Dict[str, int]:
+    """Return statistics of the deduplication response cache."""
+    return dedup_response_cache.stats()
@@ -1,30 +1,77 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
 from app.types import TaskCache
+from app.models.finding_db import FindingDB
 
 
 def build_context_section(task_cache: TaskCache) -> str:
     """Build the context section for evaluation prompts."""
+    return _build_context_section_cached(
+        task_cache.selectedFilesContent,
+        task_cache.selectedDocsContent,
+        task_cache.additionalDocs,
+        tuple(task_cache.additionalLinks or ()),
+        tuple((qa.question, qa.answer) for qa in task_cache.qaResponses or ())
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_context_section_cached(
+    selected_files_content: Optional[str],
+    selected_docs_content: Optional[str],
+    additional_docs: Optional[str],
+    additional_links: Tuple[str, ...],
+    qa_responses: Tuple[Tuple[str, str], ...]
+) -> str:
+    """
+    Build the context section once per distinct task context.
+    The context embeds the full contract source and is identical for every
+    dedup/evaluation call of a task, so it is cached instead of rebuilt per call.
+    """
     context_parts = []
     
     # Smart contract files
-    if task_cache.selectedFilesContent:
-        context_parts.append(f"### SMART CONTRACT CODE:\n```solidity\n{task_cache.selectedFilesContent}\n```\n")
+    if selected_files_content:
+        context_parts.append(f"### SMART CONTRACT CODE:\n```solidity\n{selected_files_content}\n```\n")
     
     # Documentation files
-    if task_cache.selectedDocsContent:
-        context_parts.append(f"### DOCUMENTATION:\n{task_cache.selectedDocsContent}\n")
+    if selected_docs_content:
+        context_parts.append(f"### DOCUMENTATION:\n{selected_docs_content}\n")
 
     # Additional documentation
-    if task_cache.additionalDocs:
-        context_parts.append(f"### ADDITIONAL DOCUMENTATION:\n{task_cache.additionalDocs}\n")
+    if additional_docs:
+        context_parts.append(f"### ADDITIONAL DOCUMENTATION:\n{additional_docs}\n")
     
     # Additional links
-    if task_cache.additionalLinks:
-        links = '\n'.join([f"- {link}" for link in task_cache.additionalLinks])
+    if additional_links:
+        links = '\n'.join([f"- {link}" for link in additional_links])
         context_parts.append(f"### ADDITIONAL RESOURCES:\n{links}\n")
     
     # Q&A responses
-    if task_cache.qaResponses:
-        qa_text = "\n\n".join([f"**Q: {qa.question}**\n**A: {qa.answer}**" for qa in task_cache.qaResponses])
+    if qa_responses:
+        qa_text = "\n\n".join([f"**Q: {question}**\n**A: {answer}**" for question, answer in qa_responses])
         context_parts.append(f"### PROJECT Q&A:\n{qa_text}\n")
     
     return '\n'.join(context_parts) if context_parts else "No smart contract context available."
+
+
+def serialize_findings(findings: List[FindingDB]) -> str:
+    """Serialize findings for a prompt as a compact JSON array (fewer tokens than a Python repr)."""
+    return orjson.dumps([finding.dump() for finding in findings]).decode("utf-8")
+
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def fill_prompt_template(template: str, sections: Dict[str, str]) -> str:
+    """
+    Fill `{name}` placeholders of a prompt template in a single pass.
+    Substituted text is never re-scanned, so placeholder-like text inside contract code
+    or findings is left untouched, and JSON braces in templates need no escaping.
+    Placeholders without a section are kept as-is.
+    """
+    return _PLACEHOLDER_PATTERN.sub(lambda match: sections.get(match.group(1), match.group(0)), template)
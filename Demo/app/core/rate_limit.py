@@ -0,0 +1,205 @@
+"""
+Client-side rate limiting and rate-limit retries for LLM calls.
+Keeps request rates under the provider limit and retries 429 / RESOURCE_EXHAUSTED
+responses with exponential backoff and jitter instead of failing the whole job.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing `rate` requests per second with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens (bucket capacity)
+        """
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting until one is available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+
+            wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+            return wait
+
+
+class AdaptiveSemaphore:
+    """
+    Concurrency limit that adapts to the provider: grows by one permit after a run of
+    successful calls and halves when a call is rate limited.
+    Use as `async with semaphore:`; rate-limit errors leaving the block shrink the limit.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, increase_every: int = 5):
+        """
+        Initialize the adaptive semaphore.
+        
+        Args:
+            initial: Starting number of permits
+            maximum: Upper bound for the number of permits
+            minimum: Lower bound for the number of permits
+            increase_every: Consecutive successes needed to add one permit
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.increase_every = increase_every
+        self.wait_seconds = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveSemaphore":
+        started = time.monotonic()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        self.wait_seconds += time.monotonic() - started
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if exc is not None and is_rate_limit_error(exc):
+                self.on_rate_limited()
+            elif exc is None:
+                self.on_success()
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        """Record a successful call, adding a permit after enough consecutive successes."""
+        self._successes += 1
+        if self._successes >= self.increase_every and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+            logger.info(f"Gemini concurrency limit raised to {self.limit}")
+
+    def on_rate_limited(self) -> None:
+        """Record a rate-limited call, halving the number of permits."""
+        self._successes = 0
+        new_limit = max(self.minimum, self.limit // 2)
+        if new_limit != self.limit:
+            self.limit = new_limit
+            logger.warning(f"Gemini rate limited, concurrency limit lowered to {self.limit}")
+
+
+class RateLimitMetrics:
+    """Counters describing rate limiting of LLM calls."""
+
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self.calls = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counter values."""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "concurrency_wait_seconds": round(gemini_concurrency.wait_seconds, 3),
+            "concurrency_limit": gemini_concurrency.limit
+        }
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Check whether an exception (or any exception it wraps) is a provider rate-limit error.
+    
+    Args:
+        error: Exception raised by the LLM client
+        
+    Returns:
+        True for HTTP 429 / RESOURCE_EXHAUSTED errors
+    """
+    while error is not None:
+        if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+            return True
+        if "RESOURCE_EXHAUSTED" in str(error) or "RateLimit" in type(error).__name__:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+# Global limiter and metrics for Gemini calls
+gemini_rate_limiter = TokenBucket(rate=config.gemini_rps, burst=config.gemini_burst)
+gemini_rate_limit_metrics = RateLimitMetrics()
+gemini_concurrency = AdaptiveSemaphore(
+    initial=config.gemini_initial_concurrency,
+    maximum=config.gemini_max_concurrency
+)
+
+async def ainvoke_with_limits(
+    runnable,
+    prompt: Any,
+    limiter: Optional[TokenBucket] = None,
+    max_retries: Optional[int] = None
+) -> Any:
+    """
+    Invoke a runnable under the Gemini rate and concurrency limits, retrying rate-limit errors.
+    
+    Args:
+        runnable: LangChain runnable to invoke
+        prompt: Input passed to `ainvoke`
+        limiter: Optional token bucket (defaults to the global Gemini limiter)
+        max_retries: Optional number of retries on rate-limit errors (defaults to config)
+        
+    Returns:
+        The runnable's response
+        
+    Raises:
+        Exception: Non rate-limit errors immediately, rate-limit errors once retries are exhausted
+    """
+    limiter = limiter or gemini_rate_limiter
+    max_retries = config.gemini_max_retries if max_retries is None else max_retries
+
+    for attempt in range(max_retries + 1):
+        gemini_rate_limit_metrics.throttled_seconds += await limiter.acquire()
+        gemini_rate_limit_metrics.calls += 1
+        try:
+            async with gemini_concurrency:
+                return await runnable.ainvoke(prompt)
+        except Exception as e:
+            if attempt == max_retries or not is_rate_limit_error(e):
+                raise
+
+            gemini_rate_limit_metrics.retries += 1
+            delay = min(30.0, 2 ** attempt) + random.uniform(0, 1)
+            logger.warning(
+                f"Gemini rate limit hit (attempt {attempt + 1}/{max_retries + 1}), retrying in {delay:.1f}s: {str(e)}"
+            )
+            await asyncio.sleep(delay)
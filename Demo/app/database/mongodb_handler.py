@@ -2,17 +2,59 @@
 MongoDB database handler for security findings.
 Handles storage and retrieval of findings using native MongoDB Motor operations.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, Union
+import asyncio
+import logging
+import time
 import motor.motor_asyncio
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import os
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from app.models.finding_input import FindingInput, Finding
 from app.models.finding_db import FindingDB, Status
 from app.config import config
 from app.types import Task
 
+logger = logging.getLogger(__name__)
+
+# Indexes for the per-task findings collections. Equality fields come before the
+# created_at range so agent/since queries are served by a single index seek.
+AGENT_CREATED_AT_INDEX = [("agent_id", ASCENDING), ("created_at", ASCENDING)]
+STATUS_INDEX = [("status", ASCENDING)]
+CREATED_AT_INDEX = [("created_at", ASCENDING)]
+FINDINGS_INDEXES = [
+    IndexModel(AGENT_CREATED_AT_INDEX),
+    IndexModel(STATUS_INDEX),
+    IndexModel(CREATED_AT_INDEX),
+]
+
+# Seconds a metadata document is served from memory before it is read again
+METADATA_CACHE_TTL_SECONDS = 5.0
+
+# Seconds an authenticated API key -> agent ID lookup is served from memory;
+# role or status changes (e.g. deactivation) take effect within this window
+AGENT_CACHE_TTL_SECONDS = 60.0
+
+# Documents fetched per cursor round-trip when reading findings
+FINDINGS_BATCH_SIZE = 1000
+FINDINGS_STREAM_BATCH_SIZE = 500
+
+# Fields of an agent_arena user needed to authenticate an agent
+AGENT_AUTH_PROJECTION = {"role": 1, "status": 1}
+
+# Only the fields declared on Task are fetched from the agent_arena tasks collection
+TASK_PROJECTION = {"_id": 0, **{field: 1 for field in Task.model_fields}}
+
+# Documents per insert_many call, and how many of those calls may be in flight at once
+INSERT_CHUNK_SIZE = 500
+MAX_CONCURRENT_INSERTS = 8
+
+# Fallback MongoDB URL, selected once at import based on environment (Docker detection)
+DEFAULT_MONGODB_URL = "mongodb://mongodb:27017" if os.path.exists("/.dockerenv") else "mongodb://localhost:27017"
+
 class MongoDBHandler:
     """
     MongoDB database handler using Motor for async operations.
@@ -30,25 +72,66 @@ class MongoDBHandler:
         self.findings_db = None
         self.agent_arena_db = None
         
-        # Automatically select MongoDB URL based on environment
-        is_docker = os.path.exists("/.dockerenv")  # Docker environment detection
-        default_mongo_url = "mongodb://mongodb:27017" if is_docker else "mongodb://localhost:27017"
-        
-        self.connection_string = connection_string or config.mongodb_url or default_mongo_url
+        self.connection_string = connection_string or config.mongodb_url or DEFAULT_MONGODB_URL
         self.findings_db_name = "security_findings"
         self.agent_arena_db_name = "agent_arena"
         self.metadata_collection = "metadata"
+        self._indexed_tasks = set()
+        self._findings_collections: Dict[str, motor.motor_asyncio.AsyncIOMotorCollection] = {}
+        self._metadata_cache: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._agent_cache: Dict[str, Tuple[float, str]] = {}
+        self._connect_lock = asyncio.Lock()
     
     async def connect(self):
-        """Connect to MongoDB databases."""
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(self.connection_string)
+        """
+        Connect to MongoDB databases with one shared, explicitly sized connection pool.
+        Idempotent: concurrent or repeated calls reuse the existing client instead of leaking a new pool.
+        """
+        async with self._connect_lock:
+            if self.client is None:
+                await self._create_client()
+
+    async def _create_client(self):
+        """Create and ping the Motor client, then set up database handles and the metadata index."""
+        self.client = motor.motor_asyncio.AsyncIOMotorClient(
+            self.connection_string,
+            maxPoolSize=config.mongodb_max_pool_size,
+            minPoolSize=config.mongodb_min_pool_size,
+            maxIdleTimeMS=config.mongodb_max_idle_time_ms,
+            compressors=config.mongodb_compressors,
+            zlibCompressionLevel=config.mongodb_zlib_compression_level,
+            retryWrites=True
+        )
+        # Motor connects lazily; ping so an unreachable server fails startup instead of the first request
+        try:
+            await self.client.admin.command("ping")
+        except Exception:
+            self.client.close()
+            self.client = None
+            raise
         self.findings_db = self.client[self.findings_db_name]
         self.agent_arena_db = self.client[self.agent_arena_db_name]
+        self._findings_collections.clear()
+        self._metadata_cache.clear()
+        self._agent_cache.clear()
+
+        # Metadata is always looked up by key, and claim_metadata relies on the unique index
+        # to reject a second claim; without it two runs could both claim and process a task,
+        # so a failed index build (e.g. duplicate keys left by an old upsert race) aborts startup
+        try:
+            await self.get_metadata_collection().create_index("key", unique=True)
+        except Exception as e:
+            logger.error(f"Could not create unique metadata key index: {str(e)}")
+            self.client.close()
+            self.client = None
+            raise
     
     async def close(self):
         """Close MongoDB connection."""
         if self.client:
             self.client.close()
+            self.client = None
+            self._findings_collections.clear()
     
     def get_findings_collection_name(self, task_id: str) -> str:
         """
@@ -61,6 +144,44 @@ class MongoDBHandler:
             Findings collection name for the task
         """
         return f"findings_{task_id}"
+
+    def get_findings_collection(self, task_id: str) -> motor.motor_asyncio.AsyncIOMotorCollection:
+        """
+        Get the findings collection handle for a task.
+        
+        Args:
+            task_id: Task identifier
+            
+        Returns:
+            Motor collection holding the task findings
+        """
+        collection = self._findings_collections.get(task_id)
+        if collection is None:
+            collection = self.findings_db[self.get_findings_collection_name(task_id)]
+            self._findings_collections[task_id] = collection
+        return collection
+
+    async def ensure_findings_indexes(self, task_id: str) -> None:
+        """
+        Create the findings indexes for a task once per process.
+        create_indexes is idempotent on the server, so the set only saves the round-trip.
+        
+        Args:
+            task_id: Task identifier
+        """
+        if task_id in self._indexed_tasks:
+            return
+        await self.get_findings_collection(task_id).create_indexes(FINDINGS_INDEXES)
+        self._indexed_tasks.add(task_id)
+
+    def get_metadata_collection(self) -> motor.motor_asyncio.AsyncIOMotorCollection:
+        """
+        Get the metadata collection handle.
+        
+        Returns:
+            Motor collection holding processing metadata
+        """
+        return self.findings_db[self.metadata_collection]
     
     async def create_finding(self, task_id: str, agent_id: str, finding: Finding, status: Status = Status.PENDING) -> FindingDB:
         """
@@ -75,27 +196,21 @@ class MongoDBHandler:
         Returns:
             FindingDB object of the created finding
         """
-        # Create FindingDB from Finding
-        finding_db = FindingDB(
-            **finding.model_dump(exclude_unset=True),
-            agent_id=agent_id,
-            status=status,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
-        
-        collection_name = self.get_findings_collection_name(task_id)
-        collection = self.findings_db[collection_name]
-        
-        # Convert to dict and insert
-        doc_dict = finding_db.model_dump(by_alias=True, exclude_unset=True)
-        if doc_dict.get('_id') is None:
-            doc_dict.pop('_id', None)
+        current_time = datetime.now(timezone.utc)
+        doc_dict = finding.to_db_dict({
+            "agent_id": agent_id,
+            "status": status,
+            "created_at": current_time,
+            "updated_at": current_time
+        })
         
-        result = await collection.insert_one(doc_dict)
+        await self.ensure_findings_indexes(task_id)
+        collection = self.get_findings_collection(task_id)
         
-        # Set the ID from the insert result
-        finding_db.id = result.inserted_id
+        # insert_one sets the generated _id on doc_dict
+        await collection.insert_one(doc_dict)
+        # doc_dict was dumped from a validated Finding plus typed system fields, so it is not re-validated
+        finding_db = FindingDB.model_construct(**doc_dict)
         
         # Return the finding with proper ID set
         return finding_db
@@ -118,34 +233,42 @@ class MongoDBHandler:
         task_id = input_data.task_id
         current_time = datetime.now(timezone.utc)
         
-        # Create FindingDB objects
-        finding_dbs = []
-        for finding in input_data.findings:
-            finding_db = FindingDB(
-                **finding.model_dump(exclude_unset=True),
-                agent_id=agent_id,
-                created_at=current_time,
-                updated_at=current_time
-            )
-            finding_dbs.append(finding_db)
-        
-        collection_name = self.get_findings_collection_name(task_id)
-        collection = self.findings_db[collection_name]
-        
-        # Convert to dicts and insert
-        docs = []
-        for finding_db in finding_dbs:
-            doc_dict = finding_db.model_dump(by_alias=True, exclude_unset=True)
-            if doc_dict.get('_id') is None:
-                doc_dict.pop('_id', None)
-            docs.append(doc_dict)
-        
-        if docs:
-            await collection.insert_many(docs)
+        base_fields = {
+            "agent_id": agent_id,
+            "status": Status.PENDING,
+            "created_at": current_time,
+            "updated_at": current_time
+        }
+        docs = [finding.to_db_dict(base_fields) for finding in input_data.findings]
+        
+        await self.ensure_findings_indexes(task_id)
+        collection = self.get_findings_collection(task_id)
+        await self._insert_many_chunked(collection, docs)
             
         # Return the titles
         return [finding.title for finding in input_data.findings]
     
+    async def _insert_many_chunked(self, collection: motor.motor_asyncio.AsyncIOMotorCollection,
+                                   docs: List[Dict[str, Any]]) -> None:
+        """
+        Insert documents in bounded chunks, running a few chunks concurrently.
+        Inserts are unordered so the server does not serialize them or stop at the first error.
+        
+        Args:
+            collection: Target collection
+            docs: Documents to insert
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_INSERTS)
+
+        async def insert_chunk(chunk: List[Dict[str, Any]]) -> None:
+            async with semaphore:
+                await collection.insert_many(chunk, ordered=False)
+
+        await asyncio.gather(*(
+            insert_chunk(docs[i:i + INSERT_CHUNK_SIZE])
+            for i in range(0, len(docs), INSERT_CHUNK_SIZE)
+        ))
+
     async def update_finding(self, task_id: str, id: str, update_fields: Dict[str, Any]) -> bool:
         """
         Update specific fields of an existing finding.
@@ -158,21 +281,19 @@ class MongoDBHandler:
         Returns:
             True if update was successful, False otherwise
         """
-        collection_name = self.get_findings_collection_name(task_id)
-        collection = self.findings_db[collection_name]
+        collection = self.get_findings_collection(task_id)
         
         if isinstance(update_fields, FindingDB):
-            update_fields = update_fields.model_dump(by_alias=True, exclude_unset=True)
+            update_fields = update_fields.model_dump(by_alias=True, exclude_unset=True, exclude={"id"})
 
         # Ensure updated_at is set
         if "updated_at" not in update_fields:
             update_fields["updated_at"] = datetime.now(timezone.utc)
         
-        # Convert string id to ObjectId
-        try:
-            object_id = ObjectId(id)
-        except Exception:
+        # Validate and convert string id to ObjectId
+        if not ObjectId.is_valid(id):
             return False
+        object_id = ObjectId(id)
         
         # Update in database
         result = await collection.update_one(
@@ -182,6 +303,51 @@ class MongoDBHandler:
         
         return result.modified_count > 0
         
+    async def update_findings_bulk(self, task_id: str,
+                                   updates: List[Tuple[str, Union[Dict[str, Any], FindingDB]]]) -> List[str]:
+        """
+        Update many findings with a single bulk write instead of one round-trip per finding.
+        
+        Args:
+            task_id: Task identifier
+            updates: (finding ID, fields to update) pairs; fields may also be a FindingDB
+            
+        Returns:
+            IDs of the findings that were updated, so callers can tell which updates applied
+        """
+        current_time = datetime.now(timezone.utc)
+        operations = []
+        object_ids = []
+        for id, update_fields in updates:
+            if isinstance(update_fields, FindingDB):
+                update_fields = update_fields.model_dump(by_alias=True, exclude_unset=True, exclude={"id"})
+
+            # Invalid IDs cannot match a document and are reported as not updated
+            if not ObjectId.is_valid(id):
+                continue
+
+            object_ids.append(ObjectId(id))
+            operations.append(UpdateOne(
+                {"_id": object_ids[-1]},
+                {"$set": {"updated_at": current_time, **update_fields}}
+            ))
+
+        if not operations:
+            return []
+
+        collection = self.get_findings_collection(task_id)
+        result = await collection.bulk_write(operations, ordered=False)
+
+        # A bulk write only reports totals; when some updates matched nothing, look up which
+        # of the findings exist (IDs only) instead of assuming which ones were updated
+        if result.matched_count < len(set(object_ids)):
+            existing = await collection.find({"_id": {"$in": object_ids}}, projection={"_id": 1}).to_list(length=None)
+            matched_ids = {doc["_id"] for doc in existing}
+        else:
+            matched_ids = set(object_ids)
+
+        return [str(object_id) for object_id in object_ids if object_id in matched_ids]
+
     async def delete_agent_findings(self, task_id: str, agent_id: str) -> int:
         """
         Delete all findings for a specific agent and task.
@@ -194,11 +360,11 @@ class MongoDBHandler:
         Returns:
             Number of findings deleted
         """
-        collection_name = self.get_findings_collection_name(task_id)
-        collection = self.findings_db[collection_name]
+        await self.ensure_findings_indexes(task_id)
+        collection = self.get_findings_collection(task_id)
         
         # Delete all findings for this agent and task
-        result = await collection.delete_many({"agent_id": agent_id})
+        result = await collection.delete_many({"agent_id": agent_id}, hint=AGENT_CREATED_AT_INDEX)
         
         return result.deleted_count
 
@@ -210,10 +376,17 @@ class MongoDBHandler:
             key: Metadata key
             
         Returns:
-            Metadata value if found, None otherwise
+            Metadata value if found, None otherwise; may be up to
+            METADATA_CACHE_TTL_SECONDS old if another process wrote it
         """
+        # Serve recent reads and writes from memory
+        cached = self._metadata_cache.get(key)
+        if cached and time.monotonic() - cached[0] < METADATA_CACHE_TTL_SECONDS:
+            return cached[1]
+        
         # Query database
-        doc = await self.findings_db[self.metadata_collection].find_one({"key": key})
+        doc = await self.get_metadata_collection().find_one({"key": key})
+        self._metadata_cache[key] = (time.monotonic(), doc)
         
         return doc
         
@@ -228,35 +401,112 @@ class MongoDBHandler:
         Returns:
             True if operation was successful
         """
-        # Add the key to the value dictionary
-        value["key"] = key
+        # Add the key and a timezone-aware write timestamp without mutating the caller's dict
+        document = {**value, "key": key, "updated_at": datetime.now(timezone.utc)}
         
         # Upsert the document (insert if not exists, update if exists)
-        result = await self.findings_db[self.metadata_collection].update_one(
+        result = await self.get_metadata_collection().update_one(
             {"key": key},
-            {"$set": value},
+            {"$set": document},
             upsert=True
         )
         
+        # Write through so the next read does not need a round-trip
+        if result.acknowledged:
+            self._metadata_cache[key] = (time.monotonic(), document)
+        else:
+            self._metadata_cache.pop(key, None)
+        
         return result.acknowledged
 
-    async def get_findings(self, task_id: str,
-                           agent_id: Optional[str] = None,
-                           status: Optional[Status] = None,
-                           since_timestamp: Optional[datetime] = None) -> List[FindingDB]:
+    async def claim_metadata(self, key: str, ttl_seconds: float) -> bool:
         """
-        Get all findings for a task with optional agent, status, and since_timestamp filters.
+        Atomically claim a metadata key, e.g. to make sure a task is processed only once.
+        The claim is a single upsert: it succeeds if the key does not exist or its claim is
+        older than ttl_seconds, and fails with a duplicate key error if another caller holds it.
+        
+        Args:
+            key: Metadata key to claim
+            ttl_seconds: Age after which an existing claim may be taken over
+            
+        Returns:
+            True if this caller now holds the claim, False otherwise
+        """
+        current_time = datetime.now(timezone.utc)
+        try:
+            await self.get_metadata_collection().update_one(
+                {
+                    "key": key,
+                    "$or": [
+                        {"claimed_at": {"$exists": False}},  # Released by release_metadata_claim
+                        {"claimed_at": {"$lt": current_time - timedelta(seconds=ttl_seconds)}}
+                    ]
+                },
+                {"$set": {"key": key, "claimed_at": current_time, "updated_at": current_time}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        
+        self._metadata_cache.pop(key, None)
+        return True
+
+    async def release_metadata_claim(self, key: str) -> None:
+        """
+        Release a claim taken with claim_metadata so the key can be claimed again right away,
+        e.g. after processing failed, instead of waiting for the claim to expire.
+        
+        Args:
+            key: Metadata key to release
+        """
+        await self.get_metadata_collection().update_one(
+            {"key": key},
+            {"$unset": {"claimed_at": ""}, "$set": {"updated_at": datetime.now(timezone.utc)}}
+        )
+        self._metadata_cache.pop(key, None)
+
+    @staticmethod
+    def _findings_index_hint(query: Dict[str, Any]) -> Optional[List[Tuple[str, int]]]:
+        """
+        Pick the findings index for a get_findings query.
+        Hinting skips plan selection, which otherwise runs cold for each small per-task collection.
+        
+        Args:
+            query: Findings filter
+            
+        Returns:
+            Index key pattern to hint, or None for unfiltered scans
+        """
+        if "agent_id" in query:
+            return AGENT_CREATED_AT_INDEX
+        if "status" in query:
+            return STATUS_INDEX
+        if "created_at" in query:
+            return CREATED_AT_INDEX
+        return None
+
+    async def _find_findings(self, task_id: str,
+                             agent_id: Optional[str],
+                             status: Optional[Status],
+                             since_timestamp: Optional[datetime],
+                             projection: Optional[Dict[str, int]],
+                             batch_size: int) -> motor.motor_asyncio.AsyncIOMotorCursor:
+        """
+        Build the hinted cursor shared by get_findings and iter_findings.
         
         Args:
             task_id: Task identifier
             agent_id: Agent identifier (optional)
             status: Status of the findings (optional)
             since_timestamp: Only include findings created after this timestamp (optional)
+            projection: Fields to fetch (optional)
+            batch_size: Documents fetched per cursor round-trip
+            
         Returns:
-            List of all findings matching the filters
+            Cursor over the matching findings documents
         """
-        collection_name = self.get_findings_collection_name(task_id)
-        collection = self.findings_db[collection_name]
+        await self.ensure_findings_indexes(task_id)
+        collection = self.get_findings_collection(task_id)
         
         # Query database for task findings
         query = {}
@@ -267,13 +517,63 @@ class MongoDBHandler:
         if since_timestamp:
             query["created_at"] = {"$gt": since_timestamp}
 
-        cursor = collection.find(query)
-        findings = []
+        return collection.find(
+            query,
+            projection=projection,
+            hint=self._findings_index_hint(query),
+            batch_size=batch_size
+        )
+
+    async def get_findings(self, task_id: str,
+                           agent_id: Optional[str] = None,
+                           status: Optional[Status] = None,
+                           since_timestamp: Optional[datetime] = None,
+                           projection: Optional[Dict[str, int]] = None) -> Union[List[FindingDB], List[Dict[str, Any]]]:
+        """
+        Get all findings for a task with optional agent, status, and since_timestamp filters.
         
-        async for doc in cursor:
-            findings.append(FindingDB(**doc))
+        Args:
+            task_id: Task identifier
+            agent_id: Agent identifier (optional)
+            status: Status of the findings (optional)
+            since_timestamp: Only include findings created after this timestamp (optional)
+            projection: Fields to fetch, e.g. {"_id": 1} (optional)
+        Returns:
+            List of all findings matching the filters; raw documents when a projection
+            is given, since partial documents are not valid FindingDB objects
+        """
+        cursor = await self._find_findings(
+            task_id, agent_id, status, since_timestamp, projection, FINDINGS_BATCH_SIZE
+        )
+        docs = await cursor.to_list(length=None)
+        if projection:
+            return docs
         
-        return findings
+        # Validate on read so enum fields are Status/Severity members and malformed documents are rejected
+        return [FindingDB.model_validate(doc) for doc in docs]
+
+    async def iter_findings(self, task_id: str,
+                            agent_id: Optional[str] = None,
+                            status: Optional[Status] = None,
+                            since_timestamp: Optional[datetime] = None) -> AsyncIterator[FindingDB]:
+        """
+        Stream findings for a task with the same filters as get_findings.
+        Only one cursor batch is held in memory at a time, so large tasks can be
+        consumed without materializing every finding.
+        
+        Args:
+            task_id: Task identifier
+            agent_id: Agent identifier (optional)
+            status: Status of the findings (optional)
+            since_timestamp: Only include findings created after this timestamp (optional)
+        Yields:
+            Findings matching the filters
+        """
+        cursor = await self._find_findings(
+            task_id, agent_id, status, since_timestamp, None, FINDINGS_STREAM_BATCH_SIZE
+        )
+        async for doc in cursor:
+            yield FindingDB.model_validate(doc)
 
     async def get_agent_id(self, api_key: str) -> str:
         """
@@ -283,10 +583,16 @@ class MongoDBHandler:
             api_key: Agent API key
             
         Returns:
-            Agent ID if agent is found and valid
+            Agent ID if agent is found and valid; may be up to
+            AGENT_CACHE_TTL_SECONDS old
         """
+        # Only successful lookups are cached, so a rejected key is re-checked on every request
+        cached = self._agent_cache.get(api_key)
+        if cached and time.monotonic() - cached[0] < AGENT_CACHE_TTL_SECONDS:
+            return cached[1]
+        
         users_collection = self.agent_arena_db["users"]
-        user = await users_collection.find_one({"api_key": api_key})
+        user = await users_collection.find_one({"api_key": api_key}, projection=AGENT_AUTH_PROJECTION)
         
         if not user:
             raise ValueError(f"User with API key {api_key} not found")
@@ -295,7 +601,9 @@ class MongoDBHandler:
             raise ValueError(f"Invalid role or status for user with API key {api_key}")
         
         # The agent ID is the user ID for now
-        return str(user.get("_id"))
+        agent_id = str(user.get("_id"))
+        self._agent_cache[api_key] = (time.monotonic(), agent_id)
+        return agent_id
 
     async def get_approved_tasks(self) -> List[Task]:
         """
@@ -305,7 +613,7 @@ class MongoDBHandler:
             List of approved tasks
         """
         tasks_collection = self.agent_arena_db["tasks"]
-        cursor = tasks_collection.find({"status": "approved"})
+        cursor = tasks_collection.find({"status": "approved"}, projection=TASK_PROJECTION)
         tasks = []
         
         async for doc in cursor:
@@ -325,7 +633,7 @@ class MongoDBHandler:
             Task object
         """
         tasks_collection = self.agent_arena_db["tasks"]
-        doc = await tasks_collection.find_one({"taskId": task_id})
+        doc = await tasks_collection.find_one({"taskId": task_id}, projection=TASK_PROJECTION)
         
         if not doc:
             raise ValueError(f"Task {task_id} not found")
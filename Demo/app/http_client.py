@@ -0,0 +1,51 @@
+"""
+Shared HTTP client for calls to the backend.
+"""
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits of the shared client
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+
+# Retries of a failed connection attempt; requests that reached the server are never retried
+HTTP_CONNECT_RETRIES = 1
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it on first use.
+    Reusing one client keeps backend connections alive instead of paying a
+    new TCP/TLS handshake and connection pool per request.
+
+    Returns:
+        Shared httpx AsyncClient
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # Limits go on the transport, which the client uses instead of building its own;
+        # a failed connection attempt (e.g. a stale keep-alive slot) is retried once
+        _http_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                retries=HTTP_CONNECT_RETRIES
+            )
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -6,16 +6,20 @@ Provides API endpoints for submitting and managing security findings.
 import sys
 from contextlib import asynccontextmanager
 import traceback
-from fastapi import FastAPI, HTTPException, Header, BackgroundTasks
+import hmac
+import time
+from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List, Optional
-import httpx
+from typing import Dict, Any, List, Optional, Tuple
 import shutil
 import os
 from datetime import datetime, timezone
 import asyncio
+import orjson
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from collections import defaultdict
 
 from app.models.finding_db import FindingDB, Status
@@ -25,6 +29,7 @@ from app.database.mongodb_handler import mongodb
 from app.core.deduplication import FindingDeduplication
 from app.core.evaluation import FindingEvaluator
 from app.task_utils import download_repository, read_and_concatenate_files
+from app.http_client import get_http_client, close_http_client
 import logging
 from app.types import TaskCache
 
@@ -49,6 +54,13 @@ evaluator = FindingEvaluator()
 # Cache for TESTTASK to avoid re-downloading repository unnecessarily
 test_task_cache: Optional[Dict[str, Any]] = None
 
+# Bounds how many tasks are processed at once when several deadlines fire together
+task_processing_semaphore = asyncio.Semaphore(config.max_concurrent_task_processing)
+
+# Short-lived cache of GET /tasks/{task_id}/findings responses: task_id -> (monotonic time, JSON body)
+TASK_FINDINGS_CACHE_TTL_SECONDS = 10.0
+task_findings_cache: Dict[str, Tuple[float, str]] = {}
+
 # Initialize per-agent submission locks to prevent concurrent processing
 # Key format: (task_id, agent_id)
 agent_submission_locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
@@ -59,8 +71,8 @@ scheduler = AsyncIOScheduler()
 # Interval for refreshing task scheduling (in seconds)
 REFRESH_INTERVAL_SECONDS = 1800  # 30 minutes
 
-# Reference to refresh schedule background task so we can cancel it on shutdown
-refresh_schedule_task = None
+# Job ID of the periodic task scheduling refresh
+REFRESH_JOB_ID = "refresh_task_scheduling"
 
 async def schedule_task_processing(task_id: str, start_time: datetime, deadline: datetime):
     """
@@ -80,19 +92,15 @@ async def schedule_task_processing(task_id: str, start_time: datetime, deadline:
         # Create a unique job ID
         job_id = f"task_{task_id}"
         
-        # Remove any existing job for this task
-        if scheduler.get_job(job_id):
-            scheduler.remove_job(job_id)
-            logger.info(f"Removed existing task processing job for task {task_id}")
-        
-        # Schedule the new job
+        # Schedule the job, replacing any existing job for this task in one jobstore operation
         scheduler.add_job(
             process_task_scheduled,
             trigger=DateTrigger(run_date=deadline),
             args=[task_id],
             id=job_id,
             name=f"Process task {task_id}",
-            misfire_grace_time=300  # Allow 5 minutes grace time if system is busy
+            misfire_grace_time=300,  # Allow 5 minutes grace time if system is busy
+            replace_existing=True
         )
         
         logger.info(f"Scheduled task processing for task {task_id}: start={start_time.isoformat()}, deadline={deadline.isoformat()}")
@@ -100,6 +108,45 @@ async def schedule_task_processing(task_id: str, start_time: datetime, deadline:
     except Exception as e:
         logger.error(f"Error scheduling task processing job for task {task_id}: {str(e)}")
 
+async def process_task_once(task_id: str, scheduled_processing: bool) -> Optional[datetime]:
+    """
+    Claim, process and mark a task as processed.
+    Shared by the scheduled job and the manual trigger so both use the same claim and
+    processed marker; callers check the marker first to report an already processed task.
+    
+    Args:
+        task_id: Task identifier
+        scheduled_processing: Whether processing was started by the scheduled job
+        
+    Returns:
+        Time the task was marked as processed, or None if another run holds the claim
+        
+    Raises:
+        Exception: If processing failed; the claim is released so the task can be retried
+    """
+    # Atomically claim the task so concurrent scheduled and manual runs cannot both process it
+    claim_key = f"processing_{task_id}"
+    if not await mongodb.claim_metadata(claim_key, config.task_claim_ttl_seconds):
+        return None
+    
+    # Process the task findings, waiting for a free processing slot. If processing fails or is
+    # cancelled, release the claim instead of blocking retries until it expires
+    try:
+        async with task_processing_semaphore:
+            await process_task(task_id)
+    except BaseException:
+        await asyncio.shield(mongodb.release_metadata_claim(claim_key))
+        raise
+    
+    # Mark this task as processed; shielded so a cancellation after the results were
+    # posted cannot leave the task unmarked and processed again
+    current_time = datetime.now(timezone.utc)
+    await asyncio.shield(mongodb.set_metadata(f"task_{task_id}", {
+        "processed_at": current_time,
+        "scheduled_processing": scheduled_processing
+    }))
+    return current_time
+
 async def process_task_scheduled(task_id: str):
     """
     Wrapper function for scheduled task processing.
@@ -119,21 +166,22 @@ async def process_task_scheduled(task_id: str):
             logger.info(f"Task {task_id} was already processed at {processed_metadata.get('processed_at')}. Skipping.")
             return
         
-        # Process the task findings
-        await process_task(task_id)
-        
-        # Mark this task as processed
-        current_time = datetime.now(timezone.utc)
-        await mongodb.set_metadata(processed_key, {
-            "processed_at": current_time,
-            "scheduled_processing": True
-        })
+        if not await process_task_once(task_id, scheduled_processing=True):
+            logger.info(f"Task {task_id} is already being processed. Skipping.")
+            return
         
         logger.info(f"Marked task {task_id} as processed via scheduled job")
         
     except Exception as e:
         logger.error(f"Error in scheduled task processing for task {task_id}: {str(e)}")
 
+async def refresh_task_scheduling():
+    """Re-schedule processing jobs for approved tasks; run periodically by the scheduler."""
+    try:
+        await schedule_approved_tasks()
+    except Exception as e:
+        logger.error(f"Error refreshing task scheduling: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan events."""
@@ -146,48 +194,32 @@ async def lifespan(app: FastAPI):
         scheduler.start()
         logger.info("✅ Started APScheduler for task processing jobs")
         
-        try:
-            # Initial scheduling of task processing jobs
-            await schedule_approved_tasks()
-        except Exception as e:
-            logger.error(f"Error during initial task scheduling: {str(e)}")
-
-        # --------------------------------------------------------------
-        # Schedule periodic task scheduling refresh
-        # --------------------------------------------------------------
-        async def _periodic_task_scheduling_refresh():
-            while True:
-                try:
-                    await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
-                    await schedule_approved_tasks()
-                except Exception as e:
-                    logger.error(f"Error refreshing task scheduling: {str(e)}")
-                
-
-        # Start background task and store reference
-        global refresh_schedule_task
-        refresh_schedule_task = asyncio.create_task(_periodic_task_scheduling_refresh())
+        # Schedule periodic task scheduling refresh on the running scheduler; its first run
+        # does the initial scheduling in the background so the API serves requests right away
+        scheduler.add_job(
+            refresh_task_scheduling,
+            trigger=IntervalTrigger(seconds=REFRESH_INTERVAL_SECONDS),
+            id=REFRESH_JOB_ID,
+            name="Refresh task scheduling",
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
         
         yield
         
         # Shutdown
-        # Cancel refresh schedule background task
-        if refresh_schedule_task:
-            refresh_schedule_task.cancel()
-            try:
-                await refresh_schedule_task
-            except asyncio.CancelledError:
-                pass  # Expected when cancelling
-            except Exception as e:
-                logger.error(f"Error during background task shutdown: {str(e)}")
-
-        # Cancel scheduler
+        # Cancel scheduler, including the refresh job
         try:
             scheduler.shutdown()
             logger.info("✅ Shut down APScheduler")
         except Exception as e:
             logger.error(f"Error shutting down scheduler: {str(e)}")
 
+        # Close the shared backend HTTP client
+        await close_http_client()
+
         # Close MongoDB connection
         await mongodb.close()
         logger.info("✅ Disconnected from MongoDB")
@@ -201,6 +233,7 @@ app = FastAPI(
     title="Security Findings API",
     description="API for managing security findings and deduplication",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -217,6 +250,22 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Log an unexpected endpoint error and return a generic 500 response.
+    HTTPExceptions raised by endpoints are handled by FastAPI and never reach this handler.
+    
+    Args:
+        request: Request that failed
+        exc: Unhandled exception
+        
+    Returns:
+        500 JSON response
+    """
+    logger.exception(f"Unhandled error on {request.method} {request.url.path}: {str(exc)}", exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+
 async def schedule_approved_tasks():
     """Fetch approved tasks metadata from database and schedule processing jobs."""
     logger.info("Fetching approved tasks from database")
@@ -284,13 +333,12 @@ async def fetch_task_data(task_id: str) -> Optional[TaskCache]:
         if task_id == "TESTTASK":
             current_commit_sha = task.commitSha
             
-            # Check if we have cached data with the same commitSha
-            if (test_task_cache and 
-                test_task_cache.get("commitSha") == current_commit_sha and 
-                test_task_cache.get("task_cache")):
-                
+            # Check if we have cached data with the same commitSha; the entry is read once so the
+            # commitSha and task cache checked here always come from the same snapshot
+            cached = test_task_cache
+            if cached and cached.get("commitSha") == current_commit_sha and cached.get("task_cache"):
                 logger.info(f"Using cached data for TESTTASK (commitSha: {current_commit_sha})")
-                return test_task_cache["task_cache"]
+                return cached["task_cache"]
             
             logger.info(f"TESTTASK commitSha changed or no cache available. Re-downloading repository (commitSha: {current_commit_sha})")
             
@@ -305,26 +353,33 @@ async def fetch_task_data(task_id: str) -> Optional[TaskCache]:
             if not os.path.exists(config.data_dir):
                 os.makedirs(config.data_dir, exist_ok=True)
 
-            # Store repository in data directory
+            # Store repository in data directory. The tree is moved rather than copied (a plain
+            # rename when both directories share a filesystem), and all filesystem work runs in a
+            # worker thread so it does not block the event loop
             repo_storage_path = os.path.join(config.data_dir, f"repo_{task_id}")
             if os.path.exists(repo_storage_path):
-                shutil.rmtree(repo_storage_path)
-            shutil.copytree(repo_dir, repo_storage_path)
+                await asyncio.to_thread(shutil.rmtree, repo_storage_path)
+            await asyncio.to_thread(shutil.move, repo_dir, repo_storage_path)
             logger.info(f"Repository for task {task_id} stored at {repo_storage_path}")
         finally:
             # Always clean up temp directory
             if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+                await asyncio.to_thread(shutil.rmtree, temp_dir)
                 
-        # Concatenate contract files
-        concatenated_contracts = read_and_concatenate_files(repo_storage_path, selected_files)
+        # Concatenate contract and documentation files, reading both sets concurrently in worker threads
+        selected_docs = task.selectedDocs or []
+        read_docs = (
+            asyncio.to_thread(read_and_concatenate_files, repo_storage_path, selected_docs)
+            if selected_docs else asyncio.sleep(0, result="")
+        )
+        concatenated_contracts, concatenated_docs = await asyncio.gather(
+            asyncio.to_thread(read_and_concatenate_files, repo_storage_path, selected_files),
+            read_docs
+        )
         if not concatenated_contracts:
             logger.warning(f"No valid contracts content found for task {task_id}")
             return None
             
-        # Concatenate documentation files
-        selected_docs = task.selectedDocs or []
-        concatenated_docs = read_and_concatenate_files(repo_storage_path, selected_docs) if selected_docs else ""
         if not concatenated_docs:
             logger.warning(f"No valid docs content found for task {task_id}")
             
@@ -372,7 +427,7 @@ def format_finding(finding: FindingDB) -> Dict[str, Any]:
         "deduplication_comment": finding.deduplication_comment if finding.deduplication_comment else None,
         "evaluated_severity": finding.evaluated_severity if finding.evaluated_severity else None,
         "evaluation_comment": finding.evaluation_comment if finding.evaluation_comment else None,
-        "created_at": finding.created_at.isoformat()
+        "created_at": finding.created_at  # Encoded as an ISO 8601 string by orjson
     }
 
 async def process_task(task_id: str):
@@ -383,6 +438,10 @@ async def process_task(task_id: str):
     
     Args:
         task_id: Task identifier for the ended task
+        
+    Raises:
+        Exception: If deduplication or evaluation failed; failures to post the
+        results to the backend are only logged
     """
     try:
         logger.info(f"Processing task findings for task_id: {task_id}")
@@ -405,7 +464,7 @@ async def process_task(task_id: str):
         # Step 1: Identify duplicates
         logger.info(f"Starting deduplication for task_id: {task_id}")
 
-        dedup_results = await deduplicator.process_findings(task_id, pending_findings, task_cache)
+        dedup_results = await deduplicator.process_findings(task_id, pending_findings, task_cache, latency_sensitive=False)
         duplicate_relationships = dedup_results["deduplication"]["duplicate_relationships"]
 
         logger.info(
@@ -435,18 +494,19 @@ async def process_task(task_id: str):
             f"{evaluation_results['application_results']['failed_count']} failed to update"
         )
         
+        # Statuses and evaluations were written; serve them on the next findings request
+        invalidate_task_findings_cache(task_id)
+
         # Step 4: Post results to backend endpoint
         try:
-            # Get all findings for this task from all agents
-            all_task_findings = await mongodb.get_findings(task_id=task_id)
+            # Stream all findings for this task from all agents, formatting each as it arrives
+            # so the FindingDB objects are never all held in memory at once
+            formatted_findings = [format_finding(finding) async for finding in mongodb.iter_findings(task_id=task_id)]
             
-            if not all_task_findings:
+            if not formatted_findings:
                 logger.info(f"No findings to sync with backend endpoint for task_id: {task_id}")
             else:
-                logger.info(f"Syncing all {len(all_task_findings)} findings for task_id: {task_id} in one batch")
-
-                # Format findings data for the backend endpoint
-                formatted_findings = [format_finding(finding) for finding in all_task_findings]
+                logger.info(f"Syncing all {len(formatted_findings)} findings for task_id: {task_id} in one batch")
 
                 # Prepare payload for backend endpoint
                 payload = {
@@ -457,16 +517,14 @@ async def process_task(task_id: str):
                 # Post to backend endpoint
                 backend_endpoint = config.backend_findings_endpoint
                 if backend_endpoint:
-                    async with httpx.AsyncClient() as client:
-                        headers = {"X-API-Key": config.backend_api_key}
-                        response = await client.post(backend_endpoint, json=payload, headers=headers)
-                        logger.debug(f"Backend API response for task_id: {task_id}: {response.json()}")
-                        logger.debug(f"Backend API status code for task_id: {task_id}: {response.status_code}")
+                    client = get_http_client()
+                    response = await client.post(backend_endpoint, content=orjson.dumps(payload), headers=backend_headers())
+                    logger.debug("Backend API status code for task_id: %s: %d", task_id, response.status_code)
                         
-                        if response.status_code == 200:
-                            logger.info(f"Successfully posted {len(formatted_findings)} findings to backend for task_id: {task_id}")
-                        else:
-                            logger.error(f"Failed to post findings to backend. Status code: {response.status_code}, Response: {response.text}")
+                    if response.status_code == 200:
+                        logger.info(f"Successfully posted {len(formatted_findings)} findings to backend for task_id: {task_id}")
+                    else:
+                        logger.error(f"Failed to post findings to backend. Status code: {response.status_code}, Response: {response.text}")
                 else:
                     logger.warning(f"BACKEND_FINDINGS_ENDPOINT not configured, skipping backend post for task_id: {task_id}")
             
@@ -484,6 +542,7 @@ async def process_task(task_id: str):
         error_trace = traceback.format_exc()
         logger.error(f"Error during task processing for task_id: {task_id}: {str(e)}")
         logger.error(f"Traceback for task_id: {task_id}: {error_trace}")
+        raise
 
 async def process_task_for_agent(task_id: str, agent_id: str):
     """
@@ -493,8 +552,12 @@ async def process_task_for_agent(task_id: str, agent_id: str):
     try:
         logger.info(f"Processing task findings for task_id: {task_id}, agent_id: {agent_id}")
 
-        # Get pending task findings for this agent
-        pending_findings = await mongodb.get_findings(task_id=task_id, agent_id=agent_id, status=Status.PENDING)
+        # Get pending task findings for this agent and fetch task data concurrently; this
+        # runs right after the agent's submission, so there are almost always findings to process
+        pending_findings, task_cache = await asyncio.gather(
+            mongodb.get_findings(task_id=task_id, agent_id=agent_id, status=Status.PENDING),
+            fetch_task_data(task_id)
+        )
 
         if not pending_findings:
             logger.info(f"No pending findings for task_id: {task_id}, agent_id: {agent_id}")
@@ -502,8 +565,6 @@ async def process_task_for_agent(task_id: str, agent_id: str):
 
         logger.info(f"Found {len(pending_findings)} pending findings for task_id: {task_id}, agent_id: {agent_id}")
 
-        # Fetch task data with repository download
-        task_cache = await fetch_task_data(task_id)
         if not task_cache:
             logger.error(f"Failed to fetch task data for task_id: {task_id}. Evaluation cannot proceed without smart contract context.")
             return
@@ -539,6 +600,8 @@ async def process_task_for_agent(task_id: str, agent_id: str):
             f"{evaluation_results['application_results']['failed_count']} failed to update"
         )
 
+        invalidate_task_findings_cache(task_id)
+
         # Post only this agent's findings to backend, honoring last-sync for TESTTASK
         try:
             latest_findings = await get_latest_findings(task_id, agent_id)
@@ -559,26 +622,9 @@ async def process_task_for_agent(task_id: str, agent_id: str):
 
             backend_endpoint = config.backend_findings_endpoint
             if backend_endpoint:
-                async with httpx.AsyncClient() as client:
-                    headers = {"X-API-Key": config.backend_api_key}
-                    response = await client.post(backend_endpoint, json=payload, headers=headers)
-                    logger.debug(
-                        f"Backend API response for task_id: {task_id}, agent_id: {agent_id}: {response.json()}"
-                    )
-                    logger.debug(
-                        f"Backend API status code for task_id: {task_id}, agent_id: {agent_id}: {response.status_code}"
-                    )
-
-                    if response.status_code == 200:
-                        last_sync_key = f"last_sync_{task_id}_{agent_id}"
-                        await mongodb.set_metadata(last_sync_key, {"timestamp": current_sync_time})
-                        logger.info(
-                            f"Updated last sync timestamp to {current_sync_time} for task_id: {task_id}, agent_id: {agent_id}"
-                        )
-                    elif response.status_code != 200:
-                        logger.error(
-                            f"Failed to post findings to backend. Status code: {response.status_code}, Response: {response.text}"
-                        )
+                # Shielded so a cancellation (e.g. on shutdown) cannot post the findings
+                # without recording the sync, which would re-send them on the next run
+                await asyncio.shield(post_agent_findings(task_id, agent_id, payload, current_sync_time))
             else:
                 logger.warning(
                     f"BACKEND_FINDINGS_ENDPOINT not configured, skipping backend post for task_id: {task_id}, agent_id: {agent_id}"
@@ -602,6 +648,33 @@ async def process_task_for_agent(task_id: str, agent_id: str):
         )
         logger.error(f"Traceback for task_id: {task_id}, agent_id: {agent_id}: {error_trace}")
 
+async def post_agent_findings(task_id: str, agent_id: str, payload: Dict[str, Any], sync_time: datetime):
+    """
+    Post an agent's findings to the backend and record the sync time on success.
+    
+    Args:
+        task_id: Task identifier
+        agent_id: Agent identifier
+        payload: Findings payload for the backend findings endpoint
+        sync_time: Time to record as the agent's last sync
+    """
+    client = get_http_client()
+    response = await client.post(config.backend_findings_endpoint, content=orjson.dumps(payload), headers=backend_headers())
+    logger.debug(
+        "Backend API status code for task_id: %s, agent_id: %s: %d", task_id, agent_id, response.status_code
+    )
+
+    if response.status_code == 200:
+        last_sync_key = f"last_sync_{task_id}_{agent_id}"
+        await mongodb.set_metadata(last_sync_key, {"timestamp": sync_time})
+        logger.info(
+            f"Updated last sync timestamp to {sync_time} for task_id: {task_id}, agent_id: {agent_id}"
+        )
+    else:
+        logger.error(
+            f"Failed to post findings to backend. Status code: {response.status_code}, Response: {response.text}"
+        )
+
 async def get_latest_findings(task_id: str, agent_id: str) -> List[FindingDB]:
     last_sync_key = f"last_sync_{task_id}_{agent_id}"
     last_sync = await mongodb.get_metadata(last_sync_key)
@@ -622,6 +695,39 @@ async def get_latest_findings(task_id: str, agent_id: str) -> List[FindingDB]:
         
     return latest_findings
 
+def invalidate_task_findings_cache(task_id: str) -> None:
+    """
+    Drop the cached findings response of a task after its findings changed.
+    
+    Args:
+        task_id: Task identifier
+    """
+    task_findings_cache.pop(task_id, None)
+
+def backend_headers() -> Dict[str, str]:
+    """
+    Build the headers for a JSON post to the backend.
+    Bodies are encoded with orjson and sent as raw content instead of through
+    httpx's stdlib json encoder, so the content type is set explicitly.
+    
+    Returns:
+        Request headers with the backend API key
+    """
+    return {"X-API-Key": config.backend_api_key, "Content-Type": "application/json"}
+
+def is_backend_api_key(api_key: str) -> bool:
+    """
+    Check an API key against the backend API key in constant time,
+    so response timing does not reveal how much of the key matched.
+    
+    Args:
+        api_key: API key sent by the caller
+        
+    Returns:
+        True if the key is the backend API key
+    """
+    return hmac.compare_digest(api_key.encode("utf-8"), config.backend_api_key.encode("utf-8"))
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -649,14 +755,13 @@ async def post_submission(task_id: str, agent_id: str, findings_count: int):
             "findings_count": findings_count
         }
         
-        async with httpx.AsyncClient() as client:
-            headers = {"X-API-Key": config.backend_api_key}
-            response = await client.post(submissions_endpoint, json=payload, headers=headers)
+        client = get_http_client()
+        response = await client.post(submissions_endpoint, content=orjson.dumps(payload), headers=backend_headers())
             
-            if response.status_code == 200:
-                logger.info(f"Successfully posted submission: {findings_count} findings for task {task_id}, agent {agent_id}")
-            else:
-                logger.error(f"Failed to post submission. Status code: {response.status_code}, Response: {response.text}")
+        if response.status_code == 200:
+            logger.info(f"Successfully posted submission: {findings_count} findings for task {task_id}, agent {agent_id}")
+        else:
+            logger.error(f"Failed to post submission. Status code: {response.status_code}, Response: {response.text}")
                 
     except Exception as e:
         logger.error(f"Error posting submission to backend: {str(e)}")
@@ -664,6 +769,7 @@ async def post_submission(task_id: str, agent_id: str, findings_count: int):
 @app.post("/process_findings")
 async def process_findings(
     input_data: FindingInput,
+    background_tasks: BackgroundTasks,
     x_api_key: str = Header(..., alias="X-API-Key")
 ):
     """
@@ -679,107 +785,102 @@ async def process_findings(
     Returns:
         Processing confirmation
     """
+    # 1. Verify API key and get agent_id from database; the task lookup for step 3
+    #    is independent, so both reads share one round-trip
+    agent_result, task_result = await asyncio.gather(
+        mongodb.get_agent_id(x_api_key),
+        mongodb.get_task(input_data.task_id),
+        return_exceptions=True
+    )
+    if isinstance(agent_result, ValueError):
+        logger.warning(f"Agent authentication failed: {str(agent_result)}")
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    if isinstance(agent_result, BaseException):
+        raise agent_result
+    agent_id = agent_result
+
+    # 2. Submission size validation
+    if len(input_data.findings) > config.max_findings_per_submission:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Submission contains too many findings. Maximum allowed: {config.max_findings_per_submission} findings per submission."
+        )
+        
+    # 3. Check if we're within the submission timeframe
     try:
-        # 1. Verify API key and get agent_id from database
-        try:
-            agent_id = await mongodb.get_agent_id(x_api_key)
-        except ValueError as ve:
-            logger.warning(f"Agent authentication failed: {str(ve)}")
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        # 2. Submission size validation
-        if len(input_data.findings) > config.max_findings_per_submission:
+        if isinstance(task_result, BaseException):
+            raise task_result
+        task = task_result
+        if not task:
             raise HTTPException(
-                status_code=400, 
-                detail=f"Submission contains too many findings. Maximum allowed: {config.max_findings_per_submission} findings per submission."
+                status_code=404,
+                detail=f"Task {input_data.task_id} not found"
             )
             
-        # 3. Check if we're within the submission timeframe
-        try:
-            task = await mongodb.get_task(input_data.task_id)
-            if not task:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Task {input_data.task_id} not found"
-                )
-                
-            # Parse timestamps
-            start_time = datetime.fromtimestamp(float(task.startTime), tz=timezone.utc)
-            deadline = datetime.fromtimestamp(float(task.deadline), tz=timezone.utc)
-            
-        except HTTPException as he:
-            raise he
-        except (ValueError, TypeError) as te:
-            logger.error(f"Invalid timestamp format for task {input_data.task_id}: startTime={getattr(task, 'startTime', None)}, deadline={getattr(task, 'deadline', None)} - {str(te)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Invalid task configuration for {input_data.task_id}"
-            )
-        except Exception as e:
-            logger.error(f"Error fetching task {input_data.task_id}: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error validating task {input_data.task_id}"
-            )
+        # Parse timestamps; kept as epoch seconds, datetimes are only built for error messages
+        start_ts = float(task.startTime)
+        deadline_ts = float(task.deadline)
         
-        # Check if submission is allowed
-        current_time = datetime.now(timezone.utc)
-        
-        if current_time < start_time:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Submission period has not started yet. Starts at: {start_time.isoformat()}"
-            )
-        
-        if current_time > deadline:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Submission period has ended. Deadline was: {deadline.isoformat()}"
-            )
-            
-        logger.info(f"Accepting findings submission for task_id: {input_data.task_id}, agent_id: {agent_id}")
+    except HTTPException as he:
+        raise he
+    except (ValueError, TypeError) as te:
+        logger.error(f"Invalid timestamp format for task {input_data.task_id}: startTime={getattr(task, 'startTime', None)}, deadline={getattr(task, 'deadline', None)} - {str(te)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Invalid task configuration for {input_data.task_id}"
+        )
+    except Exception as e:
+        logger.error(f"Error fetching task {input_data.task_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error validating task {input_data.task_id}"
+        )
+    
+    # Check if submission is allowed
+    current_ts = time.time()
+    
+    if current_ts < start_ts:
+        start_time = datetime.fromtimestamp(start_ts, tz=timezone.utc)
+        raise HTTPException(
+            status_code=403,
+            detail=f"Submission period has not started yet. Starts at: {start_time.isoformat()}"
+        )
+    
+    if current_ts > deadline_ts:
+        deadline = datetime.fromtimestamp(deadline_ts, tz=timezone.utc)
+        raise HTTPException(
+            status_code=403,
+            detail=f"Submission period has ended. Deadline was: {deadline.isoformat()}"
+        )
         
-        # 4-6. Critical section: Must be atomic per agent to prevent race conditions
-        submission_key = (input_data.task_id, agent_id)
-        lock = agent_submission_locks[submission_key]
+    logger.info(f"Accepting findings submission for task_id: {input_data.task_id}, agent_id: {agent_id}")
+    
+    # 4-5. Critical section: Must be atomic per agent to prevent race conditions
+    submission_key = (input_data.task_id, agent_id)
+    lock = agent_submission_locks[submission_key]
+    
+    async with lock:
+        # 4. Delete any existing findings for this agent to allow only one submission
+        deleted_count = await mongodb.delete_agent_findings(input_data.task_id, agent_id)
+        if deleted_count > 0:
+            logger.info(f"Deleted {deleted_count} existing findings for task_id: {input_data.task_id}, agent_id: {agent_id} (overriding previous submission)")
+
+        # 5. Store findings as pending processing in a single batch insert
+        await mongodb.create_findings_batch(agent_id, input_data)
+        invalidate_task_findings_cache(input_data.task_id)
         
-        async with lock:
-            # 4. Delete any existing findings for this agent to allow only one submission
-            deleted_count = await mongodb.delete_agent_findings(input_data.task_id, agent_id)
-            if deleted_count > 0:
-                logger.info(f"Deleted {deleted_count} existing findings for task_id: {input_data.task_id}, agent_id: {agent_id} (overriding previous submission)")
-
-            # 5. Store findings as pending processing
-            for finding in input_data.findings:
-                await mongodb.create_finding(
-                    task_id=input_data.task_id,
-                    agent_id=agent_id,
-                    finding=finding,
-                    status=Status.PENDING
-                )
-            
-            logger.info(f"Stored {len(input_data.findings)} findings for task_id: {input_data.task_id}, agent_id: {agent_id} - awaiting task end for processing")    
+        logger.info(f"Stored {len(input_data.findings)} findings for task_id: {input_data.task_id}, agent_id: {agent_id} - awaiting task end for processing")    
 
-            # 6. Post submission count to backend
-            await post_submission(input_data.task_id, agent_id, len(input_data.findings))
+    # 6. Post submission count to backend after the response is sent
+    background_tasks.add_task(post_submission, input_data.task_id, agent_id, len(input_data.findings))
+
+    # 7. Return submission summary
+    return {
+        "task_id": input_data.task_id,
+        "agent_id": agent_id,
+        "total_findings": len(input_data.findings)
+    }
 
-        # 7. Return submission summary
-        return {
-            "task_id": input_data.task_id,
-            "agent_id": agent_id,
-            "total_findings": len(input_data.findings)
-        }
-        
-    except Exception as e:
-        error_trace = traceback.format_exc()
-        logger.error(f"Error processing findings: {str(e)}")
-        logger.error(f"Traceback: {error_trace}")
-        
-        # Check if this is already an HTTPException so we preserve the status code
-        if isinstance(e, HTTPException):
-            raise e
-        # Otherwise, wrap it in a 500 error
-        raise HTTPException(status_code=500, detail=f"Error processing findings: {str(e)}")
 
 @app.post("/test/process_findings")
 async def test_process_findings(
@@ -808,22 +909,17 @@ async def test_process_findings(
             logger.warning(f"Agent authentication failed: {str(ve)}")
             raise HTTPException(status_code=401, detail="Invalid API key")
 
-        # 3-4. Critical section: Must be atomic per agent to prevent race conditions  
+        # 3. Critical section: Must be atomic per agent to prevent race conditions  
         submission_key = (input_data.task_id, agent_id)
         lock = agent_submission_locks[submission_key]
         
         async with lock:
-            # 3. Store findings as pending
-            for finding in input_data.findings:
-                await mongodb.create_finding(
-                    task_id=input_data.task_id,
-                    agent_id=agent_id,
-                    finding=finding,
-                    status=Status.PENDING
-                )
+            # 3. Store findings as pending in a single batch insert
+            await mongodb.create_findings_batch(agent_id, input_data)
+            invalidate_task_findings_cache(input_data.task_id)
 
-            # 4. Post submission count to backend
-            await post_submission(input_data.task_id, agent_id, len(input_data.findings))
+        # 4. Post submission count to backend after the response is sent
+        background_tasks.add_task(post_submission, input_data.task_id, agent_id, len(input_data.findings))
 
         # 5. Queue processing in background for only this agent (do not await)
         logger.info(
@@ -847,7 +943,7 @@ async def test_process_findings(
             raise e
         raise HTTPException(status_code=500, detail=f"Error in test processing: {str(e)}")
 
-@app.get("/tasks/{task_id}/findings", response_model=List[Dict[str, Any]])
+@app.get("/tasks/{task_id}/findings")
 async def get_task_findings(task_id: str, x_api_key: str = Header(..., alias="X-API-Key")):
     """
     Get all findings for a task.
@@ -859,15 +955,23 @@ async def get_task_findings(task_id: str, x_api_key: str = Header(..., alias="X-
         List of findings for the task
     """
     try:
-        if x_api_key != config.backend_api_key:
+        if not is_backend_api_key(x_api_key):
             raise HTTPException(status_code=401, detail="Invalid API key")
 
+        # Serve repeated polls from memory; writes to the task's findings invalidate the entry
+        cached = task_findings_cache.get(task_id)
+        if cached and time.monotonic() - cached[0] < TASK_FINDINGS_CACHE_TTL_SECONDS:
+            return Response(content=cached[1], media_type="application/json")
+
+        # Serialize straight to JSON with pydantic instead of dumping dicts for FastAPI to re-encode
         findings = await mongodb.get_findings(task_id)
-        return [finding.model_dump() for finding in findings]
+        body = "[" + ",".join(finding.model_dump_json() for finding in findings) + "]"
+        task_findings_cache[task_id] = (time.monotonic(), body)
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error retrieving findings: {str(e)}")
+        logger.error("Error retrieving findings for task %s: %s", task_id, e)
         raise HTTPException(status_code=500, detail=f"Error retrieving findings: {str(e)}")
 
 @app.post("/tasks/{task_id}/process")
@@ -886,65 +990,54 @@ async def trigger_task_processing(
     Returns:
         Processing status and summary
     """
-    try:
-        if x_api_key != config.backend_api_key:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-        
-        # Check if this task has already been processed
-        processed_key = f"task_{task_id}"
-        processed_metadata = await mongodb.get_metadata(processed_key)
-        
-        if processed_metadata:
-            logger.info(f"Task {task_id} was already processed at {processed_metadata.get('processed_at')}")
-            return {
-                "task_id": task_id,
-                "status": "already_processed",
-                "message": f"Task was already processed at {processed_metadata.get('processed_at')}",
-                "processed_at": processed_metadata.get('processed_at'),
-                "scheduled_processing": processed_metadata.get('scheduled_processing', False)
-            }
-        
-        # Check if there are any pending findings
-        pending_findings = await mongodb.get_findings(task_id=task_id, status=Status.PENDING)
-        
-        if not pending_findings:
-            return {
-                "task_id": task_id,
-                "status": "no_pending_findings",
-                "message": "No pending findings found for this task",
-                "total_findings": 0
-            }
-        
-        logger.info(f"Manual task processing triggered for task: {task_id} with {len(pending_findings)} pending findings")
-        
-        # Process the task findings
-        await process_task(task_id)
-        
-        # Mark this task as processed
-        current_time = datetime.now(timezone.utc)
-        await mongodb.set_metadata(processed_key, {
-            "processed_at": current_time,
-            "scheduled_processing": False
-        })
-        
-        logger.info(f"Manual task processing completed for task: {task_id}")
-        
+    if not is_backend_api_key(x_api_key):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    # Check if this task has already been processed
+    processed_key = f"task_{task_id}"
+    processed_metadata = await mongodb.get_metadata(processed_key)
+    
+    if processed_metadata:
+        logger.info(f"Task {task_id} was already processed at {processed_metadata.get('processed_at')}")
         return {
             "task_id": task_id,
-            "status": "processed",
-            "message": "Task processing completed successfully",
-            "processed_at": current_time.isoformat(),
-            "total_pending_findings": len(pending_findings),
-            "manual_trigger": True
+            "status": "already_processed",
+            "message": f"Task was already processed at {processed_metadata.get('processed_at')}",
+            "processed_at": processed_metadata.get('processed_at'),
+            "scheduled_processing": processed_metadata.get('scheduled_processing', False)
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        error_trace = traceback.format_exc()
-        logger.error(f"Error during manual task processing for task {task_id}: {str(e)}")
-        logger.error(f"Traceback: {error_trace}")
-        raise HTTPException(status_code=500, detail=f"Error processing task: {str(e)}")
+    
+    # Check if there are any pending findings; only their count is needed, so fetch IDs only
+    pending_findings = await mongodb.get_findings(task_id=task_id, status=Status.PENDING, projection={"_id": 1})
+    
+    if not pending_findings:
+        return {
+            "task_id": task_id,
+            "status": "no_pending_findings",
+            "message": "No pending findings found for this task",
+            "total_findings": 0
+        }
+    
+    logger.info(f"Manual task processing triggered for task: {task_id} with {len(pending_findings)} pending findings")
+    
+    current_time = await process_task_once(task_id, scheduled_processing=False)
+    if current_time is None:
+        return {
+            "task_id": task_id,
+            "status": "already_processing",
+            "message": "Task is already being processed"
+        }
+    
+    logger.info(f"Manual task processing completed for task: {task_id}")
+    
+    return {
+        "task_id": task_id,
+        "status": "processed",
+        "message": "Task processing completed successfully",
+        "processed_at": current_time,
+        "total_pending_findings": len(pending_findings),
+        "manual_trigger": True
+    }
 
 @app.post("/schedule-task/{task_id}")
 async def schedule_task(
@@ -962,7 +1055,7 @@ async def schedule_task(
         Scheduling status and details
     """
     try:
-        if x_api_key != config.backend_api_key:
+        if not is_backend_api_key(x_api_key):
             raise HTTPException(status_code=401, detail="Invalid API key")
         
         # Validate task_id
@@ -996,9 +1089,9 @@ async def schedule_task(
             "task_id": task_id,
             "status": "scheduled",
             "message": f"Task {task_id} scheduled for processing",
-            "start_time": start_time.isoformat(),
-            "deadline": deadline.isoformat(),
-            "scheduled_at": datetime.now(timezone.utc).isoformat()
+            "start_time": start_time,
+            "deadline": deadline,
+            "scheduled_at": datetime.now(timezone.utc)
         }
         
     except HTTPException:
@@ -1026,7 +1119,7 @@ async def post_task_findings(
         Posting status and summary
     """
     try:
-        if x_api_key != config.backend_api_key:
+        if not is_backend_api_key(x_api_key):
             raise HTTPException(status_code=401, detail="Invalid API key")
         
         # Check if backend endpoint is configured
@@ -1036,18 +1129,17 @@ async def post_task_findings(
                 detail="Backend findings endpoint not configured"
             )
         
-        # Get all findings for this task
-        all_findings = await mongodb.get_findings(task_id=task_id)
+        # Stream all findings for this task, formatting each as it arrives so the
+        # FindingDB objects are never all held in memory at once
+        formatted_findings = [format_finding(finding) async for finding in mongodb.iter_findings(task_id=task_id)]
         
-        if not all_findings:
+        if not formatted_findings:
             return {
                 "task_id": task_id,
                 "status": "no_findings",
                 "message": "No findings found for this task",
                 "total_findings": 0
             }
-        
-        formatted_findings = [format_finding(finding) for finding in all_findings]
 
         # Prepare batched payload for backend endpoint
         payload = {
@@ -1057,14 +1149,13 @@ async def post_task_findings(
         
         try:
             # Post all findings to the backend endpoint
-            async with httpx.AsyncClient() as client:
-                headers = {"X-API-Key": config.backend_api_key}
-                response = await client.post(config.backend_findings_endpoint, json=payload, headers=headers)
+            client = get_http_client()
+            response = await client.post(config.backend_findings_endpoint, content=orjson.dumps(payload), headers=backend_headers())
                 
-                if response.status_code == 200:
-                    logger.info(f"Successfully posted {len(all_findings)} findings for task {task_id}")
-                else:
-                    logger.error(f"Failed to post findings for task {task_id}. Status code: {response.status_code}, Response: {response.text}")
+            if response.status_code == 200:
+                logger.info(f"Successfully posted {len(formatted_findings)} findings for task {task_id}")
+            else:
+                logger.error(f"Failed to post findings for task {task_id}. Status code: {response.status_code}, Response: {response.text}")
                     
         except Exception as batch_error:
             logger.error(f"Error posting findings batch: {str(batch_error)}")
@@ -1073,7 +1164,7 @@ async def post_task_findings(
         return {
             "task_id": task_id,
             "status": "completed",
-            "message": f"Posted {len(all_findings)} findings to backend database",
+            "message": f"Posted {len(formatted_findings)} findings to backend database",
         }
         
     except HTTPException:
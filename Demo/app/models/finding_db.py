@@ -1,5 +1,5 @@
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_serializer
 from datetime import datetime, timezone
 from enum import Enum
 from bson import ObjectId
@@ -40,6 +40,11 @@ class FindingDB(Finding):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
+    @field_serializer("id", when_used="json")
+    def serialize_id(self, id: Optional[ObjectId]) -> Optional[str]:
+        """Serialize the ObjectId as its hex string in JSON output."""
+        return str(id) if id is not None else None
+    
     @property
     def str_id(self) -> str:
         """
@@ -55,21 +60,15 @@ class FindingDB(Finding):
         Returns:
             Dictionary containing only title, description, severity, file_paths, and duplicateOf
         """
-
-        if self.duplicateOf:
-            return {
-                "id": str(self.id),
-                "title": self.title,
-                "description": self.description,
-                "severity": self.severity,
-                "file_paths": self.file_paths,
-                "duplicateOf": self.duplicateOf
-            }
-        
-        return {
+        dumped = {
             "id": str(self.id),
             "title": self.title,
             "description": self.description,
             "severity": self.severity,
             "file_paths": self.file_paths
         }
+
+        if self.duplicateOf:
+            dumped["duplicateOf"] = self.duplicateOf
+
+        return dumped
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List
 from pydantic import BaseModel
 from enum import Enum
 
@@ -15,6 +15,22 @@ class Finding(BaseModel):
     severity: Severity
     file_paths: List[str]
 
+    def to_db_dict(self, system_fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the MongoDB document for this finding.
+        The finding is already validated, so it is dumped once and extended in place
+        instead of being round-tripped through FindingDB.
+        
+        Args:
+            system_fields: System-managed fields to add (agent_id, status, timestamps)
+            
+        Returns:
+            Document ready to insert
+        """
+        doc = self.model_dump()
+        doc.update(system_fields)
+        return doc
+
 class FindingInput(BaseModel):
     """Model representing an input security finding submission"""
     task_id: str
@@ -1,6 +1,7 @@
-import httpx
 from app.config import Settings
+from app.http_client import get_http_client
 import os
+from pathlib import Path
 import tempfile
 import zipfile
 import logging
@@ -34,36 +35,37 @@ async def download_repository(repo_url: str, config: Settings) -> tuple[str, str
             zip_path = os.path.join(temp_dir, "repo.zip")
             
             # Download the ZIP file
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                response = await client.get(
-                    repo_url,
-                    headers={"X-API-Key": config.backend_api_key}
-                )
-                response.raise_for_status()
+            client = get_http_client()
+            response = await client.get(
+                repo_url,
+                headers={"X-API-Key": config.backend_api_key},
+                timeout=20.0
+            )
+            response.raise_for_status()
                 
-                # Save ZIP file
-                with open(zip_path, "wb") as f:
-                    f.write(response.content)
+            # Save ZIP file
+            with open(zip_path, "wb") as f:
+                f.write(response.content)
                 
-                # Extract ZIP file
-                extract_dir = os.path.join(temp_dir, "extracted")
-                os.makedirs(extract_dir, exist_ok=True)
+            # Extract ZIP file
+            extract_dir = os.path.join(temp_dir, "extracted")
+            os.makedirs(extract_dir, exist_ok=True)
                 
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(extract_dir)
                 
-                # Find the actual repository root directory
-                # Most repositories have a single root directory inside the ZIP
-                contents = os.listdir(extract_dir)
-                if len(contents) == 1 and os.path.isdir(os.path.join(extract_dir, contents[0])):
-                    # If there's only one item and it's a directory, that's our repo root
-                    repo_root = os.path.join(extract_dir, contents[0])
-                    logger.info(f"Successfully downloaded repository on attempt {attempt + 1}")
-                    return repo_root, temp_dir
-                else:
-                    # If there are multiple items, use the extract_dir as the root
-                    logger.info(f"Successfully downloaded repository on attempt {attempt + 1}")
-                    return extract_dir, temp_dir
+            # Find the actual repository root directory
+            # Most repositories have a single root directory inside the ZIP
+            contents = os.listdir(extract_dir)
+            if len(contents) == 1 and os.path.isdir(os.path.join(extract_dir, contents[0])):
+                # If there's only one item and it's a directory, that's our repo root
+                repo_root = os.path.join(extract_dir, contents[0])
+                logger.info(f"Successfully downloaded repository on attempt {attempt + 1}")
+                return repo_root, temp_dir
+            else:
+                # If there are multiple items, use the extract_dir as the root
+                logger.info(f"Successfully downloaded repository on attempt {attempt + 1}")
+                return extract_dir, temp_dir
                     
         except Exception as e:
             last_exception = e
@@ -93,26 +95,30 @@ def read_and_concatenate_files(repo_dir: str, selected_files: list) -> str:
     Returns:
         String with all files concatenated with headers
     """
-    concatenated = ""
+    parts = []
+    repo_root = Path(repo_dir)
     
     try:
         for file_path in selected_files:
-            full_path = os.path.join(repo_dir, file_path)
+            full_path = repo_root / file_path
             logger.info(f"Reading file: {full_path}")
-            if os.path.isfile(full_path):
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                        concatenated += f"// {file_path}\n{file_content}\n\n"
-                except UnicodeDecodeError:
-                    # Try with different encoding if utf-8 fails
-                    with open(full_path, 'r', encoding='latin-1') as f:
-                        file_content = f.read()
-                        concatenated += f"// {file_path}\n{file_content}\n\n"
-            else:
+            try:
+                # Read once as bytes: no separate isfile() stat, no re-read on decode failure
+                raw = full_path.read_bytes()
+            except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
                 logger.warning(f"Selected file not found: {file_path}")
+                continue
+
+            try:
+                file_content = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Try with different encoding if utf-8 fails
+                file_content = raw.decode('latin-1')
+            # Match text-mode reads: universal newlines
+            file_content = file_content.replace('\r\n', '\n').replace('\r', '\n')
+            parts.append(f"// {file_path}\n{file_content}\n\n")
         
-        return concatenated
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error reading and concatenating files: {str(e)}", exc_info=True)
-        return ""
\ No newline at end of file
+        return ""
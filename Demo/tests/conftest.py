@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures.
 """
 import pytest
 import asyncio
+import json
 from datetime import datetime, timezone
 from typing import List
 from unittest.mock import Mock, AsyncMock, patch
@@ -20,6 +21,22 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_gemini_model_cache():
+    """Reset the shared Gemini client cache so patched model classes take effect."""
+    from app.core.gemini_model import _cached_gemini_model
+    _cached_gemini_model.cache_clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_task_findings_cache():
+    """Reset the GET findings response cache so each test reads its own mocks."""
+    from app.main import task_findings_cache
+    task_findings_cache.clear()
+    yield
+
+
 def create_sample_task(
     task_id: str = "test-task-123",
     title: str = "Test Task", 
@@ -99,6 +116,14 @@ def sample_findings() -> List[Mock]:
             "created_at": finding.created_at.isoformat(),
             "updated_at": finding.updated_at.isoformat()
         }
+        finding.model_dump_json = lambda: json.dumps(finding.model_dump())
+        finding.dump = lambda: {
+            "id": finding.str_id,
+            "title": finding.title,
+            "description": finding.description,
+            "severity": finding.severity,
+            "file_paths": finding.file_paths
+        }
         return finding
     
     # Create mock findings with different data
@@ -129,6 +154,12 @@ def sample_findings() -> List[Mock]:
     return findings
 
 
+async def async_iter(items):
+    """Yield items as an async iterator, mimicking a streamed MongoDB cursor."""
+    for item in items:
+        yield item
+
+
 @pytest.fixture
 def mock_mongodb():
     """Mock MongoDB handler."""
@@ -137,10 +168,14 @@ def mock_mongodb():
     mock.close = AsyncMock()
     mock.create_finding = AsyncMock()
     mock.get_findings = AsyncMock()
+    mock.iter_findings = Mock(side_effect=lambda *args, **kwargs: async_iter([]))
     mock.update_finding = AsyncMock()
+    mock.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
     mock.delete_agent_findings = AsyncMock(return_value=0)
     mock.get_metadata = AsyncMock(return_value=None)
     mock.set_metadata = AsyncMock()
+    mock.claim_metadata = AsyncMock(return_value=True)
+    mock.release_metadata_claim = AsyncMock()
     return mock
 
 
@@ -2,10 +2,12 @@
 Integration tests for all API endpoints.
 Comprehensive testing including success scenarios, error handling, and edge cases.
 """
-from unittest.mock import AsyncMock, patch
+import orjson
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime, timezone
 
 from app.models.finding_input import FindingInput, Finding
+from tests.conftest import async_iter
 
 
 class TestProcessFindingsEndpoint:
@@ -16,7 +18,7 @@ class TestProcessFindingsEndpoint:
         """Test successful findings submission."""
         # Setup mocks
         client.mock_db.delete_agent_findings = AsyncMock(return_value=0)
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
         mock_post_sub.return_value = AsyncMock()
         
         findings_data = FindingInput(
@@ -34,7 +36,7 @@ class TestProcessFindingsEndpoint:
         client.mock_db.get_agent_id = AsyncMock(return_value="test-agent")
         client.mock_db.get_task = AsyncMock(return_value=sample_task)
         client.mock_db.delete_agent_findings = AsyncMock(return_value=0)
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
 
         response = client.post(
             "/process_findings",
@@ -48,12 +50,19 @@ class TestProcessFindingsEndpoint:
         assert result["task_id"] == "test-task-123"
         assert result["agent_id"] == "test-agent"
         assert result["total_findings"] == 1
+        
+        # All findings are stored with one batch insert
+        client.mock_db.create_findings_batch.assert_awaited_once()
+        assert client.mock_db.create_findings_batch.call_args[0][0] == "test-agent"
+        
+        # The submission count is posted to the backend as a background task
+        mock_post_sub.assert_called_once_with("test-task-123", "test-agent", 1)
     
     @patch('app.main.post_submission')
     def test_process_findings_multiple_submissions(self, mock_post_sub, sample_task, client):
         """Test that multiple submissions overwrite previous ones."""
         # Setup mocks
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
         mock_post_sub.return_value = AsyncMock()
         
         # First submission
@@ -72,7 +81,7 @@ class TestProcessFindingsEndpoint:
         client.mock_db.get_agent_id = AsyncMock(return_value="test-agent")
         client.mock_db.get_task = AsyncMock(return_value=sample_task)
         client.mock_db.delete_agent_findings = AsyncMock(return_value=0)
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
             
         response1 = client.post(
             "/process_findings",
@@ -188,6 +197,8 @@ class TestProcessFindingsEndpoint:
         )
         
         client.mock_db.get_agent_id = AsyncMock(side_effect=ValueError("Invalid API key"))
+        # The task is fetched concurrently; its failure must not mask the auth error
+        client.mock_db.get_task = AsyncMock(side_effect=ValueError("Task test-task not found"))
         
         response = client.post(
             "/process_findings",
@@ -297,7 +308,7 @@ class TestProcessFindingsEndpoint:
         """Test process_findings when database operations fail."""
         # Setup mocks
         client.mock_db.delete_agent_findings = AsyncMock(return_value=0)
-        client.mock_db.create_finding = AsyncMock(side_effect=Exception("Database error"))
+        client.mock_db.create_findings_batch = AsyncMock(side_effect=Exception("Database error"))
         mock_post_sub.return_value = AsyncMock()
         
         findings_data = FindingInput(
@@ -315,16 +326,22 @@ class TestProcessFindingsEndpoint:
         client.mock_db.get_agent_id = AsyncMock(return_value="test-agent")
         client.mock_db.get_task = AsyncMock(return_value=sample_task)
         client.mock_db.delete_agent_findings = AsyncMock(return_value=0)
-        client.mock_db.create_finding = AsyncMock(side_effect=Exception("Database error"))
+        client.mock_db.create_findings_batch = AsyncMock(side_effect=Exception("Database error"))
+        
+        # Unhandled errors are turned into a 500 by the app's exception handler instead of being raised to the client
+        from fastapi.testclient import TestClient
+        from app.main import app
+        error_client = TestClient(app, base_url="http://testserver", raise_server_exceptions=False)
             
-        response = client.post(
+        response = error_client.post(
             "/process_findings",
             headers={"X-API-Key": "test-key"},
             json=findings_data.model_dump()
         )
         
         assert response.status_code == 500
-        assert "Error processing findings" in response.text
+        assert response.json() == {"detail": "Internal server error"}
+        assert "Database error" not in response.text
     
     def test_process_findings_missing_api_key(self, client):
         """Test findings submission without API key."""
@@ -352,7 +369,7 @@ class TestProcessFindingsEndpoint:
         """Test that empty submission clears previous findings."""
         # Setup mocks
         client.mock_db.delete_agent_findings = AsyncMock(return_value=2)  # Shows previous findings were deleted
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
         mock_post_sub.return_value = AsyncMock()
         
         # Submit empty findings list
@@ -364,7 +381,7 @@ class TestProcessFindingsEndpoint:
         client.mock_db.get_agent_id = AsyncMock(return_value="test-agent")
         client.mock_db.get_task = AsyncMock(return_value=sample_task)
         client.mock_db.delete_agent_findings = AsyncMock(return_value=2)
-        client.mock_db.create_finding = AsyncMock()
+        client.mock_db.create_findings_batch = AsyncMock()
         
         response = client.post(
             "/process_findings",
@@ -384,7 +401,8 @@ class TestProcessFindingsEndpoint:
         client.mock_db.delete_agent_findings.assert_called_with("test-task-123", "test-agent")
         
         # Verify no new findings were created (since list was empty)
-        client.mock_db.create_finding.assert_not_called()
+        stored_input = client.mock_db.create_findings_batch.call_args[0][1]
+        assert stored_input.findings == []
 
 
 class TestBackgroundProcessingEndpoint:
@@ -425,8 +443,9 @@ class TestBackgroundProcessingEndpoint:
         assert result["total_findings"] == 1
         assert result["queued"] == True  # Key difference - should indicate background processing
         
-        # Verify finding was stored
-        client.mock_db.create_finding.assert_called()
+        # Verify findings were stored in one batch
+        client.mock_db.create_findings_batch.assert_awaited_once()
+        client.mock_db.create_finding.assert_not_called()
     
     def test_background_processing_invalid_task_id(self, client):
         """Test that background processing endpoint rejects invalid task IDs."""
@@ -530,7 +549,7 @@ class TestBackgroundProcessingEndpoint:
         
         client.mock_db.get_agent_id = AsyncMock(return_value="test-agent")
         # Setup mongodb mock to raise exception
-        client.mock_db.create_finding = AsyncMock(side_effect=Exception("Database error"))
+        client.mock_db.create_findings_batch = AsyncMock(side_effect=Exception("Database error"))
             
         response = client.post(
             "/test/process_findings",
@@ -561,6 +580,49 @@ class TestTaskFindingsEndpoint:
         # Check first finding has expected title
         assert result[0]["title"] == "Reentrancy vulnerability in withdraw function"
     
+    @patch('app.main.config')
+    def test_get_task_findings_serializes_stored_findings(self, mock_config, client):
+        """Test that stored findings, including their ObjectId, are returned as JSON."""
+        from bson import ObjectId
+        from app.models.finding_db import FindingDB
+
+        mock_config.backend_api_key = "test-key"
+        finding = FindingDB(
+            _id=ObjectId(),
+            title="Reentrancy",
+            description="External call before state update",
+            severity="High",
+            file_paths=["contracts/Vault.sol"],
+            agent_id="agent_alice"
+        )
+        client.mock_db.get_findings = AsyncMock(return_value=[finding])
+
+        response = client.get("/tasks/test-task-123/findings", headers={"X-API-Key": "test-key"})
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result[0]["id"] == finding.str_id
+        assert result[0]["severity"] == "High"
+        assert result[0]["status"] == "pending"
+
+    @patch('app.main.config')
+    def test_get_task_findings_cached(self, mock_config, client, sample_findings):
+        """Test that repeated requests are served from the cache until it is invalidated."""
+        from app.main import invalidate_task_findings_cache
+
+        mock_config.backend_api_key = "test-key"
+        client.mock_db.get_findings = AsyncMock(return_value=sample_findings)
+
+        first = client.get("/tasks/test-task-123/findings", headers={"X-API-Key": "test-key"})
+        second = client.get("/tasks/test-task-123/findings", headers={"X-API-Key": "test-key"})
+
+        assert first.json() == second.json()
+        assert client.mock_db.get_findings.await_count == 1
+
+        invalidate_task_findings_cache("test-task-123")
+        client.get("/tasks/test-task-123/findings", headers={"X-API-Key": "test-key"})
+        assert client.mock_db.get_findings.await_count == 2
+
     @patch('app.main.config')
     def test_get_task_findings_empty(self, mock_config, client):
         """Test retrieval of task findings when none exist."""
@@ -587,8 +649,9 @@ class TestTaskFindingsEndpoint:
         assert response.status_code == 401
         assert "Invalid API key" in response.text
     
+    @patch('app.main.logger')
     @patch('app.main.config')
-    def test_get_task_findings_database_error(self, mock_config, client):
+    def test_get_task_findings_database_error(self, mock_config, mock_logger, client):
         """Test getting task findings when database error occurs."""
         mock_config.backend_api_key = "test-key"
         client.mock_db.get_findings = AsyncMock(side_effect=Exception("Database connection failed"))
@@ -600,6 +663,8 @@ class TestTaskFindingsEndpoint:
         
         assert response.status_code == 500
         assert "Error retrieving findings" in response.text
+        mock_logger.error.assert_called_once()
+        assert mock_logger.error.call_args.args[1:] == ("test-task", client.mock_db.get_findings.side_effect)
 
 
 class TestTriggerTaskProcessingEndpoint:
@@ -663,6 +728,33 @@ class TestTriggerTaskProcessingEndpoint:
         assert result["task_id"] == "test-task"
         assert result["total_findings"] == 0
 
+    @patch('app.main.process_task', new_callable=AsyncMock)
+    @patch('app.main.mongodb') 
+    @patch('app.main.config')
+    def test_trigger_task_processing_success(self, mock_config, mock_mongodb, mock_process_task, client):
+        """Test that a manual trigger counts pending findings by ID and processes the task."""
+        mock_config.backend_api_key = "test-key"
+        mock_mongodb.get_metadata = AsyncMock(return_value=None)
+        mock_mongodb.get_findings = AsyncMock(return_value=[{"_id": "a"}, {"_id": "b"}])
+        mock_mongodb.claim_metadata = AsyncMock(return_value=True)
+        mock_mongodb.set_metadata = AsyncMock()
+        
+        response = client.post(
+            "/tasks/test-task/process", 
+            headers={"X-API-Key": "test-key"}
+        )
+        
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "processed"
+        assert result["total_pending_findings"] == 2
+        assert mock_mongodb.get_findings.call_args.kwargs["projection"] == {"_id": 1}
+        mock_process_task.assert_awaited_once_with("test-task")
+        assert mock_mongodb.set_metadata.call_args.args[1]["scheduled_processing"] is False
+        # The processed marker's datetime is encoded as an ISO 8601 string in the response
+        processed_at = mock_mongodb.set_metadata.call_args.args[1]["processed_at"]
+        assert datetime.fromisoformat(result["processed_at"]) == processed_at
+
 
 class TestPostTaskFindingsEndpoint:
     """Test the /tasks/{task_id}/post endpoint."""
@@ -699,7 +791,7 @@ class TestPostTaskFindingsEndpoint:
         """Test posting findings when no findings exist for task."""
         mock_config.backend_api_key = "test-key"
         mock_config.backend_findings_endpoint = "http://test.com/findings"
-        client.mock_db.get_findings = AsyncMock(return_value=[])
+        client.mock_db.iter_findings = Mock(side_effect=lambda *args, **kwargs: async_iter([]))
         
         response = client.post(
             "/tasks/test-task/post",
@@ -711,3 +803,25 @@ class TestPostTaskFindingsEndpoint:
         assert result["status"] == "no_findings"
         assert result["task_id"] == "test-task"
         assert result["total_findings"] == 0
+
+    @patch('app.main.get_http_client')
+    @patch('app.main.config')
+    def test_post_task_findings_streams_findings(self, mock_config, mock_get_client, sample_findings, client):
+        """Test that streamed findings are formatted and posted in one batch."""
+        mock_config.backend_api_key = "test-key"
+        mock_config.backend_findings_endpoint = "http://test.com/findings"
+        client.mock_db.iter_findings = Mock(side_effect=lambda *args, **kwargs: async_iter(sample_findings))
+        mock_http = AsyncMock()
+        mock_http.post.return_value = Mock(status_code=200)
+        mock_get_client.return_value = mock_http
+
+        with patch('app.main.format_finding', side_effect=lambda finding: {"id": finding.str_id}):
+            response = client.post(
+                "/tasks/test-task/post",
+                headers={"X-API-Key": "test-key"}
+            )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        payload = orjson.loads(mock_http.post.call_args.kwargs["content"])
+        assert [f["id"] for f in payload["findings"]] == [f.str_id for f in sample_findings]
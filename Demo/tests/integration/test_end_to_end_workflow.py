@@ -92,7 +92,7 @@ class TestCompleteWorkflow:
         # Step 3: Run deduplication
         with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
             mock_find_duplicates.return_value = expected_duplicates
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             deduplicator = FindingDeduplication(mongodb_client=mock_mongodb)
             dedup_result = await deduplicator.process_findings(
@@ -144,7 +144,7 @@ class TestCompleteWorkflow:
         
         with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
             mock_find_duplicates.return_value = DeduplicationResult(results=duplicate_relationships)
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             # Run deduplication
             deduplicator = FindingDeduplication(mongodb_client=mock_mongodb)
@@ -194,7 +194,7 @@ class TestCompleteWorkflow:
         # Mock no duplicates found
         with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
             mock_find_duplicates.return_value = DeduplicationResult(results=[])
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             # Run deduplication
             deduplicator = FindingDeduplication(mongodb_client=mock_mongodb)
@@ -238,7 +238,7 @@ class TestCompleteWorkflow:
              patch('app.core.deduplication.logger') as mock_logger:
             
             mock_find_duplicates.side_effect = Exception("Deduplication API error")
-            mock_mongodb.update_finding = AsyncMock(return_value=True)
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             deduplicator = FindingDeduplication(mongodb_client=mock_mongodb)
             
@@ -256,7 +256,7 @@ class TestCompleteWorkflow:
             assert result["summary"]["originals_found"] == len(workflow_findings)
             
             # All findings should be updated with UNIQUE_VALID status in the fallback
-            assert mock_mongodb.update_finding.call_count == len(workflow_findings)
+            assert len(mock_mongodb.update_findings_bulk.call_args.args[1]) == len(workflow_findings)
     
     @pytest.mark.asyncio
     async def test_workflow_error_handling_evaluation_failure(self, workflow_findings, sample_task_cache, mock_mongodb):
@@ -265,7 +265,7 @@ class TestCompleteWorkflow:
         # Deduplication succeeds
         with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
             mock_find_duplicates.return_value = DeduplicationResult(results=[])
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             deduplicator = FindingDeduplication(mongodb_client=mock_mongodb)
             dedup_result = await deduplicator.process_findings(
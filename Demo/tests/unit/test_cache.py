@@ -146,3 +146,6 @@ class TestFetchTaskData:
             
             # Verify download was called (cache miss)
             mock_download.assert_called_once()
+
+            # The downloaded repository is moved into the data directory
+            assert os.path.exists(os.path.join(temp_data_dir, "repo_TESTTASK", "contracts", "Vault.sol"))
@@ -0,0 +1,35 @@
+"""
+Unit tests for Claude evaluation prompts.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.claude_model import EvaluationResult, _build_evaluation_prompt, evaluate_findings_structured
+
+
+class TestBuildEvaluationPrompt:
+    """Test the shared evaluation prompt template."""
+
+    @pytest.mark.parametrize("style,marker", [
+        ("related", "RELATED findings"),
+        ("individual", "INDIVIDUAL findings"),
+    ])
+    def test_styles_render_complete_prompt(self, sample_findings, sample_task_cache, style, marker):
+        """Test that each style renders its own sections around the shared body."""
+        prompt = _build_evaluation_prompt(sample_findings, sample_task_cache, style)
+
+        assert marker in prompt
+        assert sample_findings[0].str_id in prompt
+        assert sample_task_cache.selectedFilesContent in prompt
+        assert '"finding_id": "Finding ID"' in prompt
+        assert "{scope}" not in prompt
+
+    @pytest.mark.asyncio
+    async def test_related_flag_selects_style(self, sample_findings, sample_task_cache):
+        """Test that evaluate_findings_structured picks the prompt from related_findings."""
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value=EvaluationResult(results=[]))
+
+        await evaluate_findings_structured(model, sample_findings, sample_task_cache, related_findings=True)
+
+        assert "RELATED findings" in model.ainvoke.await_args.args[0]
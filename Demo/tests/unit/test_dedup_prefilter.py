@@ -0,0 +1,51 @@
+"""
+Unit tests for the deduplication prefilter.
+"""
+from unittest.mock import Mock
+
+from app.core.dedup_prefilter import find_candidate_groups, jaccard, shingles
+
+
+def _finding(finding_id: str, title: str, description: str, file_paths):
+    """Create a minimal mock finding."""
+    return Mock(str_id=finding_id, title=title, description=description, file_paths=file_paths)
+
+
+class TestShingles:
+    """Test shingling and similarity helpers."""
+
+    def test_shingles_are_case_and_punctuation_insensitive(self):
+        """Test that shingles ignore case and punctuation."""
+        assert shingles("Reentrancy in withdraw()!") == shingles("reentrancy IN withdraw")
+
+    def test_short_text_is_a_single_shingle(self):
+        """Test that texts shorter than a shingle are kept whole."""
+        assert shingles("Dos") == frozenset({"dos"})
+        assert shingles("!!") == frozenset()
+
+    def test_jaccard(self):
+        """Test Jaccard similarity, including empty sets."""
+        assert jaccard(frozenset({"a", "b"}), frozenset({"b", "c"})) == 1 / 3
+        assert jaccard(frozenset(), frozenset({"a"})) == 0.0
+
+
+class TestFindCandidateGroups:
+    """Test find_candidate_groups function."""
+
+    def test_similar_findings_are_grouped_and_unique_ones_dropped(self):
+        """Test that only similar findings on the same file become candidates."""
+        a = _finding("a", "Reentrancy in withdraw", "External call before balance update in withdraw", ["Vault.sol"])
+        b = _finding("b", "Reentrancy in withdraw", "External call before balance update allows reentrancy", ["Vault.sol"])
+        c = _finding("c", "Missing access control", "Admin function lacks authorization", ["Vault.sol"])
+        d = _finding("d", "Reentrancy in withdraw", "External call before balance update in withdraw", ["Other.sol"])
+
+        groups = find_candidate_groups([a, b, c, d], threshold=0.3)
+
+        assert [[f.str_id for f in group] for group in groups] == [["a", "b"]]
+
+    def test_threshold_zero_keeps_same_file_findings_together(self):
+        """Test that a zero threshold only partitions by file."""
+        a = _finding("a", "x", "y", ["Vault.sol"])
+        b = _finding("b", "z", "w", ["Vault.sol"])
+
+        assert len(find_candidate_groups([a, b], threshold=0.0)) == 1
@@ -2,11 +2,37 @@
 Unit tests for deduplication logic.
 """
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 from tests.conftest import mock_mongodb
 from app.core.gemini_model import DeduplicationResult, DuplicateFinding
-from app.core.deduplication import FindingDeduplication
+from app.core.deduplication import FindingDeduplication, partition_findings
+
+def _finding(finding_id: str, file_paths):
+    """Create a minimal mock finding for partitioning tests."""
+    return Mock(str_id=finding_id, file_paths=file_paths)
+
+
+class TestPartitionFindings:
+    """Test partition_findings function."""
+
+    def test_groups_by_shared_file_paths(self):
+        """Test that findings sharing any file end up in the same group, transitively."""
+        a = _finding("a", ["A.sol"])
+        b = _finding("b", ["B.sol"])
+        c = _finding("c", ["A.sol", "C.sol"])
+        d = _finding("d", ["C.sol"])
+
+        groups = partition_findings([a, b, c, d])
+
+        assert [[f.str_id for f in group] for group in groups] == [["a", "c", "d"], ["b"]]
+
+    def test_findings_without_paths_are_grouped_together(self):
+        """Test that findings without file paths are compared with each other."""
+        groups = partition_findings([_finding("a", []), _finding("b", ["B.sol"]), _finding("c", None)])
+
+        assert [[f.str_id for f in group] for group in groups] == [["a", "c"], ["b"]]
+
 
 class TestFindingDeduplication:
     """Test FindingDeduplication class."""
@@ -41,7 +67,7 @@ class TestFindingDeduplication:
         with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
             
             mock_find_duplicates.return_value = DeduplicationResult(results=[])
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             # Use only the first finding to avoid duplicates
             single_finding = [sample_findings[0]]
@@ -52,8 +78,9 @@ class TestFindingDeduplication:
             assert result["summary"]["duplicates_found"] == 0
             assert len(result["deduplication"]["duplicate_relationships"]) == 0
 
-            # The update_finding method should be called when setting the finding as unique
-            mock_mongodb.update_finding.assert_called_once()
+            # The finding is saved as unique in a single bulk update
+            mock_mongodb.update_findings_bulk.assert_called_once()
+            assert len(mock_mongodb.update_findings_bulk.call_args.args[1]) == 1
     
     @pytest.mark.asyncio 
     async def test_process_findings_with_duplicates(self, deduplicator, sample_findings, sample_task_cache):
@@ -69,7 +96,7 @@ class TestFindingDeduplication:
                 )]
             )
             mock_find_duplicates.return_value = mock_duplicates
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             result = await deduplicator.process_findings("test-task", sample_findings, sample_task_cache)
             
@@ -81,4 +108,142 @@ class TestFindingDeduplication:
             assert dup_rel.findingId == sample_findings[1].str_id
             assert dup_rel.duplicateOf == sample_findings[0].str_id
 
-            mock_mongodb.update_finding.assert_called()
+            # Only the deduplication fields are written back
+            updates = dict(mock_mongodb.update_findings_bulk.call_args.args[1])
+            assert updates[sample_findings[1].str_id]["duplicateOf"] == sample_findings[0].str_id
+            assert all(
+                set(fields) == {"status", "duplicateOf", "deduplication_comment"}
+                for fields in updates.values()
+            )
+
+    @pytest.mark.asyncio
+    async def test_deduplicate_single_finding_skips_model(self, deduplicator, sample_findings, sample_task_cache):
+        """Test that a single finding never reaches the Gemini model."""
+        with patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates:
+            result = await deduplicator.deduplicate_findings([sample_findings[0]], sample_task_cache)
+
+            mock_find_duplicates.assert_not_called()
+            assert result["total"] == 1
+            assert result["duplicate_relationships"] == []
+
+    @pytest.mark.asyncio
+    async def test_deduplicate_uses_batch_mode_when_not_latency_sensitive(self, deduplicator, sample_findings, sample_task_cache):
+        """Test that Batch Mode is used for non-interactive deduplication when enabled."""
+        with patch('app.core.deduplication.config.gemini_batch_mode', True), \
+             patch('app.core.deduplication.find_duplicates_structured') as mock_find_duplicates, \
+             patch('app.core.deduplication.run_dedup_batch', new_callable=AsyncMock) as mock_batch:
+            mock_batch.return_value = [DeduplicationResult(results=[])]
+
+            await deduplicator.deduplicate_findings(sample_findings, sample_task_cache, latency_sensitive=False)
+
+            mock_batch.assert_awaited_once()
+            mock_find_duplicates.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_mode_sends_file_groups_and_map_reduces_oversized(self, deduplicator, sample_task_cache):
+        """Test that Batch Mode gets one request per file group and oversized groups go map-reduce."""
+        vault = [_finding(f"v{i}", ["Vault.sol"]) for i in range(4)]
+        other = [_finding("o1", ["Other.sol"]), _finding("o2", ["Other.sol"])]
+        lonely = [_finding("lonely", ["Lonely.sol"])]
+
+        with patch('app.core.deduplication.config.gemini_batch_mode', True), \
+             patch('app.core.deduplication.config.dedup_max_bucket_size', 3), \
+             patch('app.core.deduplication.run_dedup_batch', new_callable=AsyncMock) as mock_batch, \
+             patch.object(deduplicator, '_map_reduce_deduplication', new_callable=AsyncMock) as mock_map_reduce:
+            mock_batch.return_value = [DeduplicationResult(results=[DuplicateFinding(findingId="o2", duplicateOf="o1", explanation="o")])]
+            mock_map_reduce.return_value = DeduplicationResult(results=[DuplicateFinding(findingId="v1", duplicateOf="v0", explanation="v")])
+
+            result = await deduplicator._run_deduplication_model(vault + other + lonely, sample_task_cache, latency_sensitive=False)
+
+        assert mock_batch.await_args.args[0] == [other]
+        assert mock_map_reduce.await_args.args[0] == vault
+        assert {(rel.findingId, rel.duplicateOf) for rel in result.results} == {("o2", "o1"), ("v1", "v0")}
+
+    @pytest.mark.asyncio
+    async def test_deduplicate_batch_failure_falls_back(self, deduplicator, sample_findings, sample_task_cache):
+        """Test that a failed batch job falls back to the interactive call."""
+        with patch('app.core.deduplication.config.gemini_batch_mode', True), \
+             patch('app.core.deduplication.find_duplicates_structured', new_callable=AsyncMock) as mock_find_duplicates, \
+             patch('app.core.deduplication.run_dedup_batch', new_callable=AsyncMock) as mock_batch:
+            mock_batch.side_effect = ValueError("job failed")
+            mock_find_duplicates.return_value = DeduplicationResult(results=[])
+
+            result = await deduplicator.deduplicate_findings(sample_findings, sample_task_cache, latency_sensitive=False)
+
+            mock_find_duplicates.assert_awaited_once()
+            assert "error" not in result
+
+    @pytest.mark.asyncio
+    async def test_deduplicate_latency_sensitive_skips_batch_mode(self, deduplicator, sample_findings, sample_task_cache):
+        """Test that interactive callers never wait on a batch job."""
+        with patch('app.core.deduplication.config.gemini_batch_mode', True), \
+             patch('app.core.deduplication.find_duplicates_structured', new_callable=AsyncMock) as mock_find_duplicates, \
+             patch('app.core.deduplication.run_dedup_batch', new_callable=AsyncMock) as mock_batch:
+            mock_find_duplicates.return_value = DeduplicationResult(results=[])
+
+            await deduplicator.deduplicate_findings(sample_findings, sample_task_cache)
+
+            mock_batch.assert_not_called()
+            mock_find_duplicates.assert_awaited_once()
+
+
+    @pytest.mark.asyncio
+    async def test_large_sets_are_deduplicated_map_reduce(self, deduplicator, sample_task_cache):
+        """Test that oversized file groups are split, reduced and merged without chains."""
+        findings = [_finding(str(i), ["Vault.sol"]) for i in range(4)] + [_finding("lonely", ["Other.sol"])]
+        map_results = [
+            DeduplicationResult(results=[DuplicateFinding(findingId="1", duplicateOf="0", explanation="m")]),
+            DeduplicationResult(results=[DuplicateFinding(findingId="3", duplicateOf="2", explanation="m")]),
+        ]
+        reduce_results = [
+            DeduplicationResult(results=[DuplicateFinding(findingId="2", duplicateOf="0", explanation="r")]),
+        ]
+
+        with patch('app.core.deduplication.config.dedup_max_bucket_size', 2), \
+             patch('app.core.deduplication.find_duplicates_many', new_callable=AsyncMock) as mock_many:
+            mock_many.side_effect = [map_results, reduce_results]
+
+            result = await deduplicator._run_deduplication_model(findings, sample_task_cache, latency_sensitive=True)
+
+        map_buckets = mock_many.await_args_list[0].args[1]
+        reduce_groups = mock_many.await_args_list[1].args[1]
+        assert [[f.str_id for f in bucket] for bucket in map_buckets] == [["0", "1"], ["2", "3"]]
+        assert [[f.str_id for f in group] for group in reduce_groups] == [["0", "2"]]
+        assert {(rel.findingId, rel.duplicateOf) for rel in result.results} == {("1", "0"), ("3", "0"), ("2", "0")}
+
+    @pytest.mark.asyncio
+    async def test_prefilter_only_sends_candidate_groups(self, deduplicator, sample_findings, sample_task_cache):
+        """Test that findings without similar peers never reach Gemini when the prefilter is enabled."""
+        with patch('app.core.deduplication.config.dedup_prefilter_threshold', 0.2), \
+             patch('app.core.deduplication.find_duplicates_structured', new_callable=AsyncMock) as mock_find:
+            mock_find.return_value = DeduplicationResult(results=[])
+
+            await deduplicator._run_deduplication_model(sample_findings, sample_task_cache, latency_sensitive=True)
+
+        sent = mock_find.await_args.args[1]
+        assert mock_find.await_count == 1
+        assert [f.str_id for f in sent] == [sample_findings[0].str_id, sample_findings[1].str_id]
+
+    @pytest.mark.asyncio
+    async def test_prefilter_packs_small_candidate_groups(self, deduplicator, sample_task_cache):
+        """Test that small candidate groups share packed calls while large ones get their own."""
+        small = [[_finding("a1", ["A.sol"]), _finding("a2", ["A.sol"])], [_finding("b1", ["B.sol"]), _finding("b2", ["B.sol"])]]
+        large = [_finding(f"c{i}", ["C.sol"]) for i in range(6)]
+
+        with patch('app.core.deduplication.config.dedup_prefilter_threshold', 0.2), \
+             patch('app.core.deduplication.config.dedup_max_bucket_size', 10), \
+             patch('app.core.deduplication.config.gemini_dedup_groups_per_call', 2), \
+             patch('app.core.deduplication.find_candidate_groups', return_value=small + [large]), \
+             patch('app.core.deduplication.find_duplicates_structured', new_callable=AsyncMock) as mock_find, \
+             patch('app.core.deduplication.find_duplicates_batched', new_callable=AsyncMock) as mock_batched:
+            mock_find.return_value = DeduplicationResult(results=[DuplicateFinding(findingId="c1", duplicateOf="c0", explanation="c")])
+            mock_batched.return_value = [
+                DeduplicationResult(results=[DuplicateFinding(findingId="a2", duplicateOf="a1", explanation="a")]),
+                DeduplicationResult(results=[]),
+            ]
+
+            result = await deduplicator._run_deduplication_model(small[0] + small[1] + large, sample_task_cache, latency_sensitive=True)
+
+        assert mock_batched.await_args.args[1] == small
+        assert mock_find.await_args.args[1] == large
+        assert {(rel.findingId, rel.duplicateOf) for rel in result.results} == {("c1", "c0"), ("a2", "a1")}
@@ -24,6 +24,14 @@ class TestFindingEvaluator:
         """Test evaluator initializes with correct batch size."""
         assert evaluator.batch_size == 5
     
+    def test_normalize_severity(self, evaluator):
+        """Test severity labels are normalized case-insensitively with a LOW fallback."""
+        assert evaluator._normalize_severity(" High ") == Severity.HIGH
+        assert evaluator._normalize_severity("CRITICAL") == Severity.HIGH
+        assert evaluator._normalize_severity("medium") == Severity.MEDIUM
+        assert evaluator._normalize_severity("Info") == Severity.INFO
+        assert evaluator._normalize_severity("unknown") == Severity.LOW
+    
     def test_group_findings_for_evaluation_no_duplicates(self, evaluator, sample_findings):
         """Test grouping findings when there are no duplicates."""
         duplicate_relationships = []
@@ -91,7 +99,7 @@ class TestFindingEvaluator:
                     comment="Valid security issue"
                 )
             ]
-            mock_mongodb.update_finding = AsyncMock()
+            mock_mongodb.update_findings_bulk = AsyncMock(side_effect=lambda task_id, updates: [finding_id for finding_id, _ in updates])
             
             result = await evaluator.evaluate_all_findings(
                 "test-task",
@@ -105,4 +113,22 @@ class TestFindingEvaluator:
             assert result["application_results"]["failed_count"] == 0
             
             # Verify database update was called
-            mock_mongodb.update_finding.assert_called()
+            mock_mongodb.update_findings_bulk.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_apply_evaluation_results_counts_each_finding_once(self, evaluator, sample_findings):
+        """Test that an evaluation whose finding was not updated is counted as failed only."""
+        evaluations = [
+            FindingEvaluation(finding_id=sample_findings[0].str_id, is_valid=True, severity=Severity.HIGH, comment="Valid"),
+            FindingEvaluation(finding_id=sample_findings[1].str_id, is_valid=False, severity=Severity.LOW, comment="Invalid"),
+            FindingEvaluation(finding_id=sample_findings[2].str_id, is_valid=True, severity=Severity.MEDIUM, comment="Valid"),
+        ]
+        # Only the first finding still exists to be updated
+        mock_mongodb.update_findings_bulk = AsyncMock(return_value=[sample_findings[0].str_id])
+
+        result = await evaluator.apply_evaluation_results("test-task", evaluations)
+
+        assert result["valid_count"] == 1
+        assert result["disputed_count"] == 0
+        assert result["failed_count"] == 2
+        assert result["valid_count"] + result["disputed_count"] + result["failed_count"] == result["total_evaluations"]
@@ -0,0 +1,58 @@
+"""
+Unit tests for the FindingDB model.
+"""
+from bson import ObjectId
+
+from app.models.finding_db import FindingDB, Severity
+
+
+def create_finding_db(**overrides) -> FindingDB:
+    """Create a FindingDB with sensible defaults for testing."""
+    fields = {
+        "_id": ObjectId(),
+        "title": "Reentrancy in withdraw",
+        "description": "External call before balance update",
+        "severity": Severity.HIGH,
+        "file_paths": ["contracts/Vault.sol"],
+        "agent_id": "agent_alice",
+    }
+    fields.update(overrides)
+    return FindingDB(**fields)
+
+
+class TestFindingDBDump:
+    """Test the FindingDB.dump method."""
+
+    def test_dump_without_duplicate_of(self):
+        """Test that duplicateOf is omitted when the finding is not a duplicate."""
+        finding = create_finding_db()
+
+        assert finding.dump() == {
+            "id": finding.str_id,
+            "title": "Reentrancy in withdraw",
+            "description": "External call before balance update",
+            "severity": Severity.HIGH,
+            "file_paths": ["contracts/Vault.sol"],
+        }
+
+    def test_dump_with_duplicate_of(self):
+        """Test that duplicateOf is included when the finding is a duplicate."""
+        original_id = str(ObjectId())
+        finding = create_finding_db(duplicateOf=original_id)
+
+        dumped = finding.dump()
+
+        assert dumped["duplicateOf"] == original_id
+        assert dumped["id"] == finding.str_id
+        assert set(dumped) == {"id", "title", "description", "severity", "file_paths", "duplicateOf"}
+
+
+class TestFindingDBSerialization:
+    """Test JSON serialization of FindingDB."""
+
+    def test_model_dump_json_serializes_object_id(self):
+        """Test that the ObjectId is emitted as a string in JSON but kept in Python dumps."""
+        finding = create_finding_db()
+
+        assert f'"id":"{finding.str_id}"' in finding.model_dump_json()
+        assert isinstance(finding.model_dump()["id"], ObjectId)
@@ -0,0 +1,115 @@
+"""
+Unit tests for the file-based Gemini batch runner.
+"""
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from google.genai import types as genai_types
+
+from app.core.gemini_batch import _build_batch_jsonl, collect_dedup_batch, run_dedup_batch, submit_dedup_batch
+from app.core.gemini_model import DeduplicationResult
+
+
+def _output_line(key: str, text: str) -> str:
+    """Build one line of batch output JSONL."""
+    return json.dumps({
+        "key": key,
+        "response": {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+    })
+
+
+class TestBuildBatchJsonl:
+    """Test the JSONL batch input."""
+
+    def test_one_keyed_request_per_group(self, sample_findings, sample_task_cache):
+        """Test that each group becomes one keyed request with the dedup schema."""
+        lines = _build_batch_jsonl([sample_findings[:2], sample_findings[2:]], sample_task_cache).decode().splitlines()
+
+        requests = [json.loads(line) for line in lines]
+        assert [r["key"] for r in requests] == ["group-0", "group-1"]
+        assert sample_findings[2].str_id in requests[1]["request"]["contents"][0]["parts"][0]["text"]
+        assert "results" in requests[0]["request"]["generation_config"]["response_json_schema"]["properties"]
+
+
+class TestSubmitAndCollect:
+    """Test submitting and collecting file-based batch jobs."""
+
+    @pytest.mark.asyncio
+    async def test_submit_uploads_file_and_creates_job(self, sample_findings, sample_task_cache):
+        """Test that the uploaded file is used as the batch source."""
+        client = MagicMock()
+        client.aio.files.upload = AsyncMock(return_value=SimpleNamespace(name="files/abc"))
+        client.aio.batches.create = AsyncMock(return_value=SimpleNamespace(name="batches/1"))
+
+        with patch('app.core.gemini_batch.get_genai_client', return_value=client):
+            job_name = await submit_dedup_batch(b'{"key": "group-0"}', sample_task_cache)
+
+        assert job_name == "batches/1"
+        assert client.aio.files.upload.call_args.kwargs["file"].getvalue() == b'{"key": "group-0"}'
+        assert client.aio.batches.create.call_args.kwargs["src"] == "files/abc"
+
+    @pytest.mark.asyncio
+    async def test_collect_orders_results_by_key(self):
+        """Test that output lines are parsed and returned in submission order."""
+        output = "\n".join([
+            _output_line("group-1", '{"results": [{"findingId": "b", "duplicateOf": "a", "explanation": "same"}]}'),
+            _output_line("group-0", '{"results": []}'),
+        ]).encode()
+        job = SimpleNamespace(name="batches/1", state=genai_types.JobState.JOB_STATE_SUCCEEDED,
+                              dest=SimpleNamespace(file_name="files/out"), error=None)
+        client = MagicMock()
+        client.aio.batches.get = AsyncMock(return_value=job)
+        client.aio.files.download = AsyncMock(return_value=output)
+
+        with patch('app.core.gemini_batch.get_genai_client', return_value=client):
+            results = await collect_dedup_batch("batches/1", poll_interval=0)
+
+        assert results[0] == DeduplicationResult(results=[])
+        assert results[1].results[0].findingId == "b"
+
+    @pytest.mark.asyncio
+    async def test_collect_raises_on_failed_request(self):
+        """Test that a failed request line fails the whole collection."""
+        output = json.dumps({"key": "group-0", "error": {"code": 400}}).encode()
+        job = SimpleNamespace(name="batches/1", state=genai_types.JobState.JOB_STATE_SUCCEEDED,
+                              dest=SimpleNamespace(file_name="files/out"), error=None)
+        client = MagicMock()
+        client.aio.batches.get = AsyncMock(return_value=job)
+        client.aio.files.download = AsyncMock(return_value=output)
+
+        with patch('app.core.gemini_batch.get_genai_client', return_value=client):
+            with pytest.raises(ValueError):
+                await collect_dedup_batch("batches/1", poll_interval=0)
+
+
+class TestRunDedupBatch:
+    """Test selection between inline and file-based batches."""
+
+    @pytest.mark.asyncio
+    async def test_small_batches_are_sent_inline(self, sample_findings, sample_task_cache):
+        """Test that small request sets use inline batch requests."""
+        with patch('app.core.gemini_batch.find_duplicates_structured_batch', new_callable=AsyncMock) as mock_inline, \
+             patch('app.core.gemini_batch.submit_dedup_batch', new_callable=AsyncMock) as mock_submit:
+            mock_inline.return_value = [DeduplicationResult(results=[])]
+
+            await run_dedup_batch([sample_findings], sample_task_cache)
+
+        mock_inline.assert_awaited_once()
+        mock_submit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_large_batches_use_a_file(self, sample_findings, sample_task_cache):
+        """Test that request sets above the inline limit are uploaded as a file."""
+        with patch('app.core.gemini_batch._INLINE_BATCH_MAX_BYTES', 10), \
+             patch('app.core.gemini_batch.submit_dedup_batch', new_callable=AsyncMock) as mock_submit, \
+             patch('app.core.gemini_batch.collect_dedup_batch', new_callable=AsyncMock) as mock_collect:
+            mock_submit.return_value = "batches/1"
+            mock_collect.return_value = [DeduplicationResult(results=[])]
+
+            results = await run_dedup_batch([sample_findings], sample_task_cache)
+
+        assert mock_submit.await_args.args[0] == _build_batch_jsonl([sample_findings], sample_task_cache)
+        mock_collect.assert_awaited_once_with("batches/1")
+        assert len(results) == 1
@@ -0,0 +1,234 @@
+"""
+Unit tests for Gemini deduplication helpers.
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pydantic import ValidationError
+from google.genai import types as genai_types
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core.gemini_model import (
+    BatchedDeduplicationResult,
+    DeduplicationResult,
+    DuplicateFinding,
+    find_duplicates_batched,
+    find_duplicates_many,
+    find_duplicates_structured,
+    find_duplicates_structured_batch,
+    _build_dedup_messages,
+    create_gemini_model,
+    get_genai_client,
+)
+from app.core.llm_cache import LLMResponseCache
+
+
+def _mock_batch_client(jobs):
+    """Create a mocked genai client whose batch job goes through the given states."""
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(return_value=jobs[0])
+    client.aio.batches.get = AsyncMock(side_effect=jobs[1:])
+    return client
+
+
+class TestFindDuplicatesStructuredBatch:
+    """Test Gemini Batch Mode deduplication."""
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_results_in_order(self, sample_findings, sample_task_cache):
+        """Test that a succeeded batch job is polled and parsed per group."""
+        responses = [
+            SimpleNamespace(error=None, response=SimpleNamespace(text='{"results": []}')),
+            SimpleNamespace(error=None, response=SimpleNamespace(text='{"results": [{"findingId": "b", "duplicateOf": "a", "explanation": "same"}]}')),
+        ]
+        pending = SimpleNamespace(name="batches/1", state=genai_types.JobState.JOB_STATE_RUNNING)
+        done = SimpleNamespace(name="batches/1", state=genai_types.JobState.JOB_STATE_SUCCEEDED,
+                               dest=SimpleNamespace(inlined_responses=responses), error=None)
+        client = _mock_batch_client([pending, done])
+
+        with patch('app.core.gemini_model.get_genai_client', return_value=client):
+            results = await find_duplicates_structured_batch(
+                [sample_findings[:2], sample_findings[2:]], sample_task_cache, poll_interval=0
+            )
+
+        assert len(client.aio.batches.create.call_args.kwargs["src"]) == 2
+        assert results[0] == DeduplicationResult(results=[])
+        assert results[1].results[0].duplicateOf == "a"
+
+    @pytest.mark.asyncio
+    async def test_batch_failed_job_raises(self, sample_findings, sample_task_cache):
+        """Test that a failed batch job raises so callers can fall back."""
+        failed = SimpleNamespace(name="batches/1", state=genai_types.JobState.JOB_STATE_FAILED, dest=None, error="quota")
+        client = _mock_batch_client([failed])
+
+        with patch('app.core.gemini_model.get_genai_client', return_value=client):
+            with pytest.raises(ValueError):
+                await find_duplicates_structured_batch([sample_findings], sample_task_cache, poll_interval=0)
+
+
+class TestGetGenaiClient:
+    """Test the shared Gemini SDK client."""
+
+    def test_client_is_created_once(self):
+        """Test that repeated calls reuse one client."""
+        with patch('app.core.gemini_model._genai_client', None), \
+             patch('app.core.gemini_model.genai.Client') as mock_client:
+            first = get_genai_client()
+            second = get_genai_client()
+
+        mock_client.assert_called_once()
+        assert first is second
+
+
+class TestFindDuplicatesMany:
+    """Test concurrent deduplication of several groups."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_order_and_capture_errors(self, sample_findings, sample_task_cache):
+        """Test that results are returned per group and a failing group does not fail the rest."""
+        ok = DeduplicationResult(results=[])
+        with patch('app.core.gemini_model.find_duplicates_structured', new_callable=AsyncMock) as mock_find:
+            mock_find.side_effect = [ok, ValueError("bad response")]
+
+            results = await find_duplicates_many(
+                MagicMock(), [sample_findings[:2], sample_findings[2:]], sample_task_cache, max_concurrency=1
+            )
+
+        assert results[0] is ok
+        assert isinstance(results[1], ValueError)
+
+
+class TestFindDuplicatesStructuredCache:
+    """Test response caching of interactive deduplication calls."""
+
+    @staticmethod
+    def _structured_model(model_name: str, temperature: float):
+        """Create a structured-output Gemini model without going through the shared model cache."""
+        return ChatGoogleGenerativeAI(model=model_name, temperature=temperature, api_key="test-key").with_structured_output(
+            DeduplicationResult, include_raw=True
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_is_served_from_cache(self, sample_findings, sample_task_cache):
+        """Test that the same request only reaches Gemini once."""
+        parsed = DeduplicationResult(results=[])
+        model = self._structured_model("gemini-2.5-pro", 0.0)
+
+        with patch('app.core.gemini_model.dedup_response_cache', LLMResponseCache(ttl_seconds=60, max_entries=10)), \
+             patch('app.core.gemini_model.ainvoke_with_limits', new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = {"raw": None, "parsed": parsed, "parsing_error": None}
+            first = await find_duplicates_structured(model, sample_findings, sample_task_cache)
+            second = await find_duplicates_structured(model, sample_findings, sample_task_cache)
+
+        mock_invoke.assert_awaited_once()
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_cache_is_keyed_on_the_invoked_model(self, sample_findings, sample_task_cache):
+        """Test that models with different settings never share cached responses."""
+        parsed = DeduplicationResult(results=[])
+        models = [
+            self._structured_model("gemini-2.5-pro", 0.0),
+            self._structured_model("gemini-2.5-pro", 0.7),
+            self._structured_model("gemini-2.5-flash", 0.0),
+        ]
+
+        with patch('app.core.gemini_model.dedup_response_cache', LLMResponseCache(ttl_seconds=60, max_entries=10)), \
+             patch('app.core.gemini_model.ainvoke_with_limits', new_callable=AsyncMock) as mock_invoke:
+            mock_invoke.return_value = {"raw": None, "parsed": parsed, "parsing_error": None}
+            for model in models:
+                await find_duplicates_structured(model, sample_findings, sample_task_cache)
+
+        assert mock_invoke.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unidentified_model_is_not_cached(self, sample_findings, sample_task_cache):
+        """Test that responses of a runnable without a Gemini model are not cached."""
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value={"raw": None, "parsed": DeduplicationResult(results=[]), "parsing_error": None})
+
+        with patch('app.core.gemini_model.dedup_response_cache', LLMResponseCache(ttl_seconds=60, max_entries=10)):
+            await find_duplicates_structured(model, sample_findings, sample_task_cache)
+            await find_duplicates_structured(model, sample_findings, sample_task_cache)
+
+        assert model.ainvoke.await_count == 2
+
+
+class TestFindDuplicatesBatched:
+    """Test packing several finding groups into one Gemini call."""
+
+    @pytest.mark.asyncio
+    async def test_groups_are_packed_per_call(self, sample_findings, sample_task_cache):
+        """Test that groups are sent in chunks and results flattened in order."""
+        groups = [[finding] for finding in sample_findings[:3]]
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=lambda prompt: {
+            "parsed": BatchedDeduplicationResult(groups=[DeduplicationResult(results=[])] * prompt[1][1].count("### GROUP")),
+            "parsing_error": None
+        })
+
+        results = await find_duplicates_batched(model, groups, sample_task_cache, groups_per_call=2)
+
+        prompts = [call.args[0] for call in model.ainvoke.await_args_list]
+        assert len(prompts) == 2
+        assert any("### GROUP 1" in prompt[1][1] for prompt in prompts)
+        assert len(results) == 3
+
+    @pytest.mark.asyncio
+    async def test_group_count_mismatch_raises(self, sample_findings, sample_task_cache):
+        """Test that a response with a missing group is rejected."""
+        model = MagicMock()
+        model.ainvoke = AsyncMock(return_value={
+            "parsed": BatchedDeduplicationResult(groups=[DeduplicationResult(results=[])]),
+            "parsing_error": None
+        })
+
+        with pytest.raises(ValueError):
+            await find_duplicates_batched(model, [sample_findings[:1], sample_findings[1:2]], sample_task_cache)
+
+
+class TestBuildDedupPrompt:
+    """Test deduplication prompt rendering."""
+
+    def test_placeholder_text_in_context_is_not_substituted(self, sample_findings, sample_task_cache):
+        """Test that placeholder-like text in contract code stays literal."""
+        sample_task_cache.selectedFilesContent = "// {findings_json} {return_format}"
+
+        (_, system_prompt), (_, user_prompt) = _build_dedup_messages(sample_findings, sample_task_cache)
+
+        assert "// {findings_json} {return_format}" in user_prompt
+        assert sample_findings[0].str_id in user_prompt
+        assert '"results"' in system_prompt
+
+    def test_findings_and_context_stay_out_of_system_prompt(self, sample_findings, sample_task_cache):
+        """Test that the system message only carries the static instructions."""
+        messages = _build_dedup_messages(sample_findings, sample_task_cache)
+
+        assert [role for role, _ in messages] == ["system", "human"]
+        assert sample_task_cache.selectedFilesContent not in messages[0][1]
+        assert sample_findings[0].str_id not in messages[0][1]
+
+
+class TestCreateGeminiModel:
+    """Test Gemini model creation."""
+
+    def test_same_configuration_reuses_client(self):
+        """Test that identical configurations share one model instance."""
+        assert create_gemini_model() is create_gemini_model()
+
+    def test_different_configuration_creates_new_client(self):
+        """Test that overrides produce a separate model instance."""
+        assert create_gemini_model(max_tokens=1024) is not create_gemini_model()
+
+
+class TestDeduplicationModels:
+    """Test the structured output models."""
+
+    def test_results_are_immutable_and_hashable(self):
+        """Test that parsed relationships cannot be modified after validation."""
+        relationship = DuplicateFinding(findingId="b", duplicateOf="a", explanation="same issue")
+
+        with pytest.raises(ValidationError):
+            relationship.duplicateOf = "c"
+        assert hash(relationship) == hash(DuplicateFinding(findingId="b", duplicateOf="a", explanation="same issue"))
@@ -0,0 +1,23 @@
+"""
+Unit tests for the shared backend HTTP client.
+"""
+import pytest
+
+from app.http_client import close_http_client, get_http_client
+
+
+class TestSharedHttpClient:
+    """Test get_http_client and close_http_client."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_until_closed(self):
+        """Test that callers share one client and a new one is created after closing."""
+        client = get_http_client()
+        assert get_http_client() is client
+
+        await close_http_client()
+        assert client.is_closed
+
+        new_client = get_http_client()
+        assert new_client is not client
+        await close_http_client()
@@ -0,0 +1,46 @@
+"""
+Unit tests for the LLM response cache.
+"""
+from unittest.mock import patch
+
+from app.core.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    """Test LLMResponseCache class."""
+
+    def test_hit_and_miss_counts(self):
+        """Test that lookups are counted and stored values returned."""
+        cache = LLMResponseCache(ttl_seconds=60, max_entries=10)
+        key = cache.make_key("model", "prompt")
+
+        assert cache.get(key) is None
+        cache.set(key, "value")
+        assert cache.get(key) == "value"
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_key_depends_on_all_parts(self):
+        """Test that different models or prompts produce different keys."""
+        assert LLMResponseCache.make_key("a", "bc") != LLMResponseCache.make_key("ab", "c")
+        assert LLMResponseCache.make_key("a", "b") == LLMResponseCache.make_key("a", "b")
+
+    def test_expired_entries_are_dropped(self):
+        """Test that entries past their TTL are treated as misses."""
+        cache = LLMResponseCache(ttl_seconds=10, max_entries=10)
+        with patch('app.core.llm_cache.time.monotonic', return_value=100.0):
+            cache.set("k", "v")
+        with patch('app.core.llm_cache.time.monotonic', return_value=111.0):
+            assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache never grows past max_entries."""
+        cache = LLMResponseCache(ttl_seconds=60, max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
@@ -1,6 +1,7 @@
 """
 Unit tests for main.py essential utility functions.
 """
+import orjson
 import pytest
 from unittest.mock import AsyncMock, patch, Mock
 from datetime import datetime, timezone
@@ -16,13 +17,57 @@ class TestRootEndpoint:
         assert response.json() == {"message": "Welcome to the ArbiterAgent API!"}
 
 
+class TestIsBackendApiKey:
+    """Test the backend API key check."""
+
+    @patch('app.main.config')
+    def test_backend_api_key_comparison(self, mock_config):
+        """Test that only the exact backend key is accepted, including non-ASCII input."""
+        from app.main import is_backend_api_key
+
+        mock_config.backend_api_key = "test-key"
+
+        assert is_backend_api_key("test-key")
+        assert not is_backend_api_key("test-kez")
+        assert not is_backend_api_key("")
+        assert not is_backend_api_key("tëst-key")
+
+
+class TestFormatFinding:
+    """Test the backend payload formatting of findings."""
+
+    def test_formatted_finding_encodes_with_orjson(self):
+        """Test that a formatted finding encodes to the same JSON the backend received before."""
+        from app.main import format_finding
+        from app.models.finding_db import FindingDB, Status
+        from bson import ObjectId
+
+        finding = FindingDB(
+            _id=ObjectId(),
+            agent_id="test-agent",
+            title="Reentrancy",
+            description="Reentrancy in withdraw",
+            severity="High",
+            file_paths=["Vault.sol"],
+            status=Status.UNIQUE_VALID,
+            created_at=datetime(2025, 1, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)
+        )
+
+        encoded = orjson.loads(orjson.dumps(format_finding(finding)))
+
+        assert encoded["id"] == finding.str_id
+        assert encoded["status"] == "unique_valid"
+        assert encoded["severity"] == "High"
+        assert encoded["created_at"] == finding.created_at.isoformat()
+
+
 class TestPostSubmission:
     """Test the post_submission utility function."""
     
     @pytest.mark.asyncio
     @patch('app.main.config')
-    @patch('httpx.AsyncClient')
-    async def test_post_submission_success(self, mock_client_class, mock_config):
+    @patch('app.main.get_http_client')
+    async def test_post_submission_success(self, mock_get_client, mock_config):
         """Test successful submission posting to backend."""
         from app.main import post_submission
         
@@ -30,12 +75,12 @@ class TestPostSubmission:
         mock_config.backend_submissions_endpoint = "http://test.com/submissions"
         mock_config.backend_api_key = "test-key"
         
-        # Setup httpx client mock
+        # Setup shared httpx client mock
         mock_response = Mock()
         mock_response.status_code = 200
         mock_client = AsyncMock()
         mock_client.post.return_value = mock_response
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Call function
         await post_submission("test-task", "test-agent", 5)
@@ -43,12 +88,12 @@ class TestPostSubmission:
         # Verify call was made
         mock_client.post.assert_called_once_with(
             "http://test.com/submissions",
-            json={
+            content=orjson.dumps({
                 "task_id": "test-task",
                 "agent_id": "test-agent", 
                 "findings_count": 5
-            },
-            headers={"X-API-Key": "test-key"}
+            }),
+            headers={"X-API-Key": "test-key", "Content-Type": "application/json"}
         )
     
     @pytest.mark.asyncio
@@ -65,8 +110,8 @@ class TestPostSubmission:
     
     @pytest.mark.asyncio
     @patch('app.main.config')  
-    @patch('httpx.AsyncClient')
-    async def test_post_submission_error_response(self, mock_client_class, mock_config):
+    @patch('app.main.get_http_client')
+    async def test_post_submission_error_response(self, mock_get_client, mock_config):
         """Test submission posting with error response."""
         from app.main import post_submission
         
@@ -74,21 +119,21 @@ class TestPostSubmission:
         mock_config.backend_submissions_endpoint = "http://test.com/submissions"
         mock_config.backend_api_key = "test-key"
         
-        # Setup httpx client mock with error response
+        # Setup shared httpx client mock with error response
         mock_response = Mock()
         mock_response.status_code = 500
         mock_response.text = "Server Error"
         mock_client = AsyncMock()
         mock_client.post.return_value = mock_response
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Should not raise exception, just log error
         await post_submission("test-task", "test-agent", 5)
     
     @pytest.mark.asyncio
     @patch('app.main.config')
-    @patch('httpx.AsyncClient')
-    async def test_post_submission_network_error(self, mock_client_class, mock_config):
+    @patch('app.main.get_http_client')
+    async def test_post_submission_network_error(self, mock_get_client, mock_config):
         """Test submission posting with network error."""
         from app.main import post_submission
         
@@ -96,15 +141,66 @@ class TestPostSubmission:
         mock_config.backend_submissions_endpoint = "http://test.com/submissions"
         mock_config.backend_api_key = "test-key"
         
-        # Setup httpx client mock to raise exception
+        # Setup shared httpx client mock to raise exception
         mock_client = AsyncMock()
         mock_client.post.side_effect = Exception("Network error")
-        mock_client_class.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Should not raise exception, just log error
         await post_submission("test-task", "test-agent", 5)
 
 
+class TestPostAgentFindings:
+    """Test the post_agent_findings utility function."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code, records_sync", [(200, True), (500, False)])
+    @patch('app.main.mongodb')
+    @patch('app.main.config')
+    @patch('app.main.get_http_client')
+    async def test_sync_recorded_only_on_success(self, mock_get_client, mock_config, mock_mongodb,
+                                                 status_code, records_sync):
+        """Test that the last sync time is written only when the backend accepts the findings."""
+        from app.main import post_agent_findings
+
+        mock_config.backend_findings_endpoint = "http://test.com/findings"
+        mock_config.backend_api_key = "test-key"
+        mock_mongodb.set_metadata = AsyncMock()
+        mock_client = AsyncMock()
+        mock_client.post.return_value = Mock(status_code=status_code, text="")
+        mock_get_client.return_value = mock_client
+        sync_time = datetime.now(timezone.utc)
+
+        await post_agent_findings("TESTTASK", "agent-1", {"task_id": "TESTTASK", "findings": []}, sync_time)
+
+        if records_sync:
+            mock_mongodb.set_metadata.assert_awaited_once_with("last_sync_TESTTASK_agent-1", {"timestamp": sync_time})
+        else:
+            mock_mongodb.set_metadata.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('app.main.mongodb')
+    @patch('app.main.config')
+    @patch('app.main.get_http_client')
+    async def test_response_body_is_not_parsed(self, mock_get_client, mock_config, mock_mongodb):
+        """Test that a non-JSON success body does not fail the sync, since only the status code is used."""
+        from app.main import post_agent_findings
+
+        mock_config.backend_findings_endpoint = "http://test.com/findings"
+        mock_config.backend_api_key = "test-key"
+        mock_mongodb.set_metadata = AsyncMock()
+        mock_response = Mock(status_code=200, text="OK")
+        mock_response.json.side_effect = ValueError("Expecting value")
+        mock_client = AsyncMock()
+        mock_client.post.return_value = mock_response
+        mock_get_client.return_value = mock_client
+
+        await post_agent_findings("TESTTASK", "agent-1", {"task_id": "TESTTASK", "findings": []}, datetime.now(timezone.utc))
+
+        mock_response.json.assert_not_called()
+        mock_mongodb.set_metadata.assert_awaited_once()
+
+
 class TestGetLatestFindings:
     """Test the get_latest_findings utility function."""
     
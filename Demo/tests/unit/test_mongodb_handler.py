@@ -0,0 +1,626 @@
+"""
+Unit tests for MongoDBHandler helpers that do not need a live database.
+"""
+import asyncio
+import time
+from datetime import timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.config import config
+from app.database.mongodb_handler import (
+    AGENT_AUTH_PROJECTION,
+    AGENT_CACHE_TTL_SECONDS,
+    AGENT_CREATED_AT_INDEX,
+    CREATED_AT_INDEX,
+    FINDINGS_BATCH_SIZE,
+    FINDINGS_INDEXES,
+    FINDINGS_STREAM_BATCH_SIZE,
+    STATUS_INDEX,
+    TASK_PROJECTION,
+    MongoDBHandler,
+)
+from app.models.finding_db import FindingDB, Status
+from app.models.finding_input import Finding, FindingInput, Severity
+
+
+class TestCollectionHelpers:
+    """Test collection handle helpers."""
+
+    def test_get_findings_collection(self):
+        """Test the findings collection is resolved from the task-specific name."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+
+        collection = handler.get_findings_collection("task-1")
+
+        handler.findings_db.__getitem__.assert_called_once_with("findings_task-1")
+        assert collection is handler.findings_db.__getitem__.return_value
+
+    def test_get_findings_collection_is_cached(self):
+        """Test the collection handle is built once per task and reused."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+
+        first = handler.get_findings_collection("task-1")
+        second = handler.get_findings_collection("task-1")
+
+        assert first is second
+        handler.findings_db.__getitem__.assert_called_once_with("findings_task-1")
+
+    @pytest.mark.asyncio
+    async def test_close_drops_cached_collections(self):
+        """Test that no collection handle bound to a closed client survives close()."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.client = MagicMock()
+        handler.findings_db = MagicMock()
+        handler.get_findings_collection("task-1")
+
+        await handler.close()
+
+        assert handler._findings_collections == {}
+
+    def test_get_metadata_collection(self):
+        """Test the metadata collection is resolved from the configured name."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+
+        handler.get_metadata_collection()
+
+        handler.findings_db.__getitem__.assert_called_once_with("metadata")
+
+
+class TestConnect:
+    """Test client creation."""
+
+    @pytest.mark.asyncio
+    async def test_connect_sizes_connection_pool(self):
+        """Test that the client is created with the configured pool limits."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+
+        with patch("app.database.mongodb_handler.motor.motor_asyncio.AsyncIOMotorClient") as mock_client:
+            mock_client.return_value.__getitem__.return_value.__getitem__.return_value.create_index = AsyncMock()
+            mock_client.return_value.admin.command = AsyncMock()
+            await handler.connect()
+
+        kwargs = mock_client.call_args.kwargs
+        assert mock_client.call_args.args == ("mongodb://test",)
+        assert kwargs["maxPoolSize"] == config.mongodb_max_pool_size
+        assert kwargs["minPoolSize"] == config.mongodb_min_pool_size
+        assert kwargs["compressors"] == config.mongodb_compressors
+        assert kwargs["zlibCompressionLevel"] == config.mongodb_zlib_compression_level
+        assert handler.client is mock_client.return_value
+
+    @pytest.mark.asyncio
+    async def test_connect_is_idempotent(self):
+        """Test that concurrent connects share one client and close allows reconnecting."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+
+        with patch("app.database.mongodb_handler.motor.motor_asyncio.AsyncIOMotorClient") as mock_client:
+            mock_client.return_value.__getitem__.return_value.__getitem__.return_value.create_index = AsyncMock()
+            mock_client.return_value.admin.command = AsyncMock()
+            await asyncio.gather(handler.connect(), handler.connect(), handler.connect())
+            assert mock_client.call_count == 1
+
+            await handler.close()
+            await handler.connect()
+            assert mock_client.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_connect_creates_unique_metadata_index(self):
+        """Test that the metadata key index is created at connect and a failed build aborts startup."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+
+        with patch("app.database.mongodb_handler.motor.motor_asyncio.AsyncIOMotorClient") as mock_client:
+            create_index = AsyncMock(side_effect=Exception("duplicate key"))
+            mock_client.return_value.__getitem__.return_value.__getitem__.return_value.create_index = create_index
+            mock_client.return_value.admin.command = AsyncMock()
+            with pytest.raises(Exception, match="duplicate key"):
+                await handler.connect()
+
+        create_index.assert_awaited_once_with("key", unique=True)
+        mock_client.return_value.close.assert_called_once()
+        assert handler.client is None
+
+    @pytest.mark.asyncio
+    async def test_connect_pings_server(self):
+        """Test that connect pings the server and leaves no client behind when it is unreachable."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+
+        with patch("app.database.mongodb_handler.motor.motor_asyncio.AsyncIOMotorClient") as mock_client:
+            mock_client.return_value.admin.command = AsyncMock(side_effect=Exception("unreachable"))
+            with pytest.raises(Exception, match="unreachable"):
+                await handler.connect()
+
+        mock_client.return_value.admin.command.assert_awaited_once_with("ping")
+        mock_client.return_value.close.assert_called_once()
+        assert handler.client is None
+
+
+class TestFindingsIndexes:
+    """Test lazy creation of the findings indexes."""
+
+    @pytest.mark.asyncio
+    async def test_indexes_created_once_per_task(self):
+        """Test that indexes are created on first use of a task collection only."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.create_indexes = AsyncMock()
+
+        await handler.ensure_findings_indexes("task-1")
+        await handler.ensure_findings_indexes("task-1")
+
+        collection.create_indexes.assert_awaited_once_with(FINDINGS_INDEXES)
+
+
+class TestGetFindings:
+    """Test get_findings cursor handling."""
+
+    @pytest.mark.asyncio
+    async def test_reads_cursor_in_one_batch(self):
+        """Test that findings are read with to_list and validated into FindingDB objects."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        doc = {
+            "_id": ObjectId(),
+            "title": "Reentrancy",
+            "description": "desc",
+            "severity": "High",
+            "file_paths": ["Vault.sol"],
+            "agent_id": "agent-1",
+            "status": "pending",
+        }
+        collection.find.return_value.to_list = AsyncMock(return_value=[doc])
+
+        findings = await handler.get_findings("task-1", agent_id="agent-1")
+
+        collection.find.assert_called_once_with(
+            {"agent_id": "agent-1"}, projection=None, hint=AGENT_CREATED_AT_INDEX, batch_size=FINDINGS_BATCH_SIZE
+        )
+        assert len(findings) == 1
+        assert findings[0].id == doc["_id"]
+        assert findings[0].title == "Reentrancy"
+        # Stored strings are coerced to the enum members the rest of the code compares against
+        assert findings[0].status is Status.PENDING
+        assert findings[0].severity is Severity.HIGH
+
+    @pytest.mark.asyncio
+    async def test_read_findings_serialize_without_warnings(self):
+        """Test that findings read from stored documents serialize to JSON without pydantic serializer warnings."""
+        import json
+        import warnings
+
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        doc = {
+            "_id": ObjectId(),
+            "title": "Reentrancy",
+            "description": "desc",
+            "severity": "High",
+            "file_paths": ["Vault.sol"],
+            "agent_id": "agent-1",
+            "status": "unique_valid",
+            "evaluated_severity": "Medium",
+        }
+        collection.find.return_value.to_list = AsyncMock(return_value=[doc])
+
+        findings = await handler.get_findings("task-1")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            encoded = json.loads(findings[0].model_dump_json())
+
+        assert encoded["id"] == str(doc["_id"])
+        assert encoded["status"] == "unique_valid"
+        assert encoded["evaluated_severity"] == "Medium"
+
+    @pytest.mark.asyncio
+    async def test_malformed_documents_are_rejected(self):
+        """Test that a stored finding with an invalid enum value fails validation instead of passing through."""
+        from pydantic import ValidationError
+
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        doc = {
+            "_id": ObjectId(),
+            "title": "Reentrancy",
+            "description": "desc",
+            "severity": "Critical",
+            "file_paths": ["Vault.sol"],
+            "agent_id": "agent-1",
+            "status": "pending",
+        }
+        collection.find.return_value.to_list = AsyncMock(return_value=[doc])
+
+        with pytest.raises(ValidationError):
+            await handler.get_findings("task-1")
+
+    @pytest.mark.asyncio
+    async def test_iter_findings_streams_cursor(self):
+        """Test that iter_findings yields findings straight from the cursor."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        docs = [
+            {"_id": ObjectId(), "title": f"Finding {i}", "description": "desc", "severity": "Low",
+             "file_paths": [], "agent_id": "agent-1", "status": "pending"}
+            for i in range(3)
+        ]
+
+        async def cursor():
+            for doc in docs:
+                yield doc
+
+        collection.find.return_value = cursor()
+
+        findings = [finding async for finding in handler.iter_findings("task-1", status=Status.PENDING)]
+
+        assert [f.title for f in findings] == ["Finding 0", "Finding 1", "Finding 2"]
+        assert all(f.status is Status.PENDING and f.severity is Severity.LOW for f in findings)
+        assert collection.find.call_args.kwargs["batch_size"] == FINDINGS_STREAM_BATCH_SIZE
+        assert collection.find.call_args.kwargs["hint"] == STATUS_INDEX
+
+    def test_index_hint_follows_query_shape(self):
+        """Test that each query shape is hinted to the index that serves it."""
+        hint = MongoDBHandler._findings_index_hint
+
+        assert hint({"agent_id": "a", "status": "pending"}) == AGENT_CREATED_AT_INDEX
+        assert hint({"status": "pending"}) == STATUS_INDEX
+        assert hint({"created_at": {"$gt": 0}}) == CREATED_AT_INDEX
+        assert hint({}) is None
+
+    @pytest.mark.asyncio
+    async def test_projection_returns_raw_documents(self):
+        """Test that projected reads skip FindingDB construction."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        doc = {"_id": ObjectId()}
+        collection.find.return_value.to_list = AsyncMock(return_value=[doc])
+
+        findings = await handler.get_findings("task-1", projection={"_id": 1})
+
+        assert findings == [doc]
+        assert collection.find.call_args.kwargs["projection"] == {"_id": 1}
+
+
+class TestCreateFindingsBatch:
+    """Test batch inserts."""
+
+    @pytest.mark.asyncio
+    async def test_inserts_unordered_chunks(self):
+        """Test that large batches are split into unordered insert_many calls."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        collection.insert_many = AsyncMock()
+        findings = [
+            Finding(title=f"Finding {i}", description="desc", severity=Severity.LOW, file_paths=[])
+            for i in range(5)
+        ]
+
+        with patch("app.database.mongodb_handler.INSERT_CHUNK_SIZE", 2):
+            titles = await handler.create_findings_batch("agent-1", FindingInput(task_id="task-1", findings=findings))
+
+        assert titles == [f"Finding {i}" for i in range(5)]
+        chunks = [c.args[0] for c in collection.insert_many.await_args_list]
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert all(c.kwargs == {"ordered": False} for c in collection.insert_many.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_batch_documents_are_complete(self):
+        """Test that batch documents carry the system fields, including the pending status."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        collection.insert_many = AsyncMock()
+        finding = Finding(title="Reentrancy", description="desc", severity=Severity.HIGH, file_paths=["Vault.sol"])
+
+        await handler.create_findings_batch("agent-1", FindingInput(task_id="task-1", findings=[finding]))
+
+        doc = collection.insert_many.await_args.args[0][0]
+        assert doc["title"] == "Reentrancy"
+        assert doc["agent_id"] == "agent-1"
+        assert doc["status"] == Status.PENDING
+        assert doc["created_at"] == doc["updated_at"]
+        assert "_id" not in doc
+
+
+class TestCreateFinding:
+    """Test single finding inserts."""
+
+    @pytest.mark.asyncio
+    async def test_returns_finding_with_inserted_id(self):
+        """Test that the returned finding carries the id assigned on insert."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        handler._indexed_tasks.add("task-1")
+        collection = handler.findings_db.__getitem__.return_value
+        inserted_id = ObjectId()
+
+        async def insert_one(doc):
+            doc["_id"] = inserted_id
+
+        collection.insert_one = AsyncMock(side_effect=insert_one)
+        finding = Finding(title="Reentrancy", description="desc", severity=Severity.HIGH, file_paths=["Vault.sol"])
+
+        finding_db = await handler.create_finding("task-1", "agent-1", finding, status=Status.DISPUTED)
+
+        assert finding_db.id == inserted_id
+        assert finding_db.agent_id == "agent-1"
+        assert finding_db.status == Status.DISPUTED
+        assert finding_db.title == "Reentrancy"
+
+
+class TestUpdateFindingsBulk:
+    """Test bulk finding updates."""
+
+    @pytest.mark.asyncio
+    async def test_single_bulk_write(self):
+        """Test that all valid updates go out in one unordered bulk write."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=2))
+        first, second = ObjectId(), ObjectId()
+
+        updated = await handler.update_findings_bulk("task-1", [
+            (str(first), {"status": Status.DISPUTED}),
+            ("not-an-id", {"status": Status.DISPUTED}),
+            (str(second), {"evaluation_comment": "ok"}),
+        ])
+
+        assert updated == [str(first), str(second)]
+        collection.find.assert_not_called()
+        operations = collection.bulk_write.await_args.args[0]
+        assert collection.bulk_write.await_args.kwargs == {"ordered": False}
+        assert [op._filter for op in operations] == [{"_id": first}, {"_id": second}]
+        assert operations[0]._doc["$set"]["status"] == Status.DISPUTED
+        assert "updated_at" in operations[1]._doc["$set"]
+
+    @pytest.mark.asyncio
+    async def test_finding_updates_never_set_id(self):
+        """Test that a FindingDB update sets its fields but not the immutable _id."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=1))
+        finding_id = ObjectId()
+        finding = FindingDB.model_construct(
+            _id=finding_id, title="Reentrancy", description="desc", severity=Severity.HIGH,
+            file_paths=[], agent_id="agent-1", status=Status.UNIQUE_VALID
+        )
+
+        await handler.update_findings_bulk("task-1", [(str(finding_id), finding)])
+
+        fields = collection.bulk_write.await_args.args[0][0]._doc["$set"]
+        assert "_id" not in fields
+        assert fields["status"] == Status.UNIQUE_VALID
+
+    @pytest.mark.asyncio
+    async def test_no_valid_updates_skips_write(self):
+        """Test that nothing is sent when there are no valid updates."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.bulk_write = AsyncMock()
+
+        assert await handler.update_findings_bulk("task-1", [("bad", {"status": Status.DISPUTED})]) == []
+        collection.bulk_write.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_partial_match_reports_updated_ids(self):
+        """Test that when some updates match nothing, only the IDs of existing findings are returned."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=1))
+        existing, missing = ObjectId(), ObjectId()
+        collection.find.return_value.to_list = AsyncMock(return_value=[{"_id": existing}])
+
+        updated = await handler.update_findings_bulk("task-1", [
+            (str(missing), {"status": Status.DISPUTED}),
+            (str(existing), {"status": Status.DISPUTED}),
+        ])
+
+        assert updated == [str(existing)]
+        collection.find.assert_called_once_with({"_id": {"$in": [missing, existing]}}, projection={"_id": 1})
+
+
+class TestMetadata:
+    """Test metadata reads and upserts."""
+
+    @pytest.mark.asyncio
+    async def test_set_metadata_stamps_aware_timestamp(self):
+        """Test that metadata is upserted with a UTC timestamp and the caller's dict is left untouched."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.update_one = AsyncMock(return_value=MagicMock(acknowledged=True))
+        value = {"processed_at": "now"}
+
+        assert await handler.set_metadata("task_1", value) is True
+
+        filter_doc, update = collection.update_one.await_args.args
+        assert filter_doc == {"key": "task_1"}
+        assert update["$set"]["key"] == "task_1"
+        assert update["$set"]["updated_at"].tzinfo is timezone.utc
+        assert value == {"processed_at": "now"}
+
+    @pytest.mark.asyncio
+    async def test_metadata_reads_are_cached(self):
+        """Test that metadata is read once within the TTL and written through on set."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.find_one = AsyncMock(return_value=None)
+        collection.update_one = AsyncMock(return_value=MagicMock(acknowledged=True))
+
+        assert await handler.get_metadata("task_1") is None
+        assert await handler.get_metadata("task_1") is None
+        await handler.set_metadata("task_1", {"processed_at": "now"})
+        cached = await handler.get_metadata("task_1")
+
+        collection.find_one.assert_awaited_once_with({"key": "task_1"})
+        assert cached["processed_at"] == "now"
+
+    @pytest.mark.asyncio
+    async def test_claim_metadata(self):
+        """Test that a claim is one upsert and a duplicate key means someone else holds it."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.update_one = AsyncMock()
+
+        assert await handler.claim_metadata("processing_task-1", ttl_seconds=60) is True
+        filter_doc = collection.update_one.await_args.args[0]
+        assert filter_doc["key"] == "processing_task-1"
+        # A released (unset) or expired claim can be taken over
+        assert {"claimed_at": {"$exists": False}} in filter_doc["$or"]
+        assert any("$lt" in condition["claimed_at"] for condition in filter_doc["$or"])
+        assert collection.update_one.await_args.kwargs == {"upsert": True}
+
+        collection.update_one.side_effect = DuplicateKeyError("E11000 duplicate key")
+        assert await handler.claim_metadata("processing_task-1", ttl_seconds=60) is False
+
+    @pytest.mark.asyncio
+    async def test_release_metadata_claim(self):
+        """Test that releasing a claim unsets its claim time."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.update_one = AsyncMock()
+
+        await handler.release_metadata_claim("processing_task-1")
+
+        filter_doc, update_doc = collection.update_one.await_args.args
+        assert filter_doc == {"key": "processing_task-1"}
+        assert update_doc["$unset"] == {"claimed_at": ""}
+
+    @pytest.mark.asyncio
+    async def test_metadata_cache_expires(self):
+        """Test that expired entries are read from the database again."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.find_one = AsyncMock(return_value={"key": "task_1"})
+
+        with patch("app.database.mongodb_handler.METADATA_CACHE_TTL_SECONDS", 0):
+            await handler.get_metadata("task_1")
+            await handler.get_metadata("task_1")
+
+        assert collection.find_one.await_count == 2
+
+
+class TestDeleteAgentFindings:
+    """Test deletion of an agent's previous submission."""
+
+    @pytest.mark.asyncio
+    async def test_delete_uses_agent_index(self):
+        """Test that deleting an agent's findings hints the agent index."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.create_indexes = AsyncMock()
+        collection.delete_many = AsyncMock(return_value=MagicMock(deleted_count=3))
+
+        deleted = await handler.delete_agent_findings("task-1", "agent-1")
+
+        assert deleted == 3
+        collection.delete_many.assert_awaited_once_with({"agent_id": "agent-1"}, hint=AGENT_CREATED_AT_INDEX)
+
+
+class TestUpdateFinding:
+    """Test single finding updates."""
+
+    @pytest.mark.asyncio
+    async def test_invalid_id_skips_database(self):
+        """Test that a malformed ID is rejected without a database call."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.findings_db = MagicMock()
+        collection = handler.findings_db.__getitem__.return_value
+        collection.update_one = AsyncMock()
+
+        assert await handler.update_finding("task-1", "not-an-id", {"status": Status.DISPUTED}) is False
+        collection.update_one.assert_not_called()
+
+
+class TestGetAgentId:
+    """Test agent lookup by API key."""
+
+    @pytest.mark.asyncio
+    async def test_get_agent_id_fetches_auth_fields_only(self):
+        """Test that only the fields needed to authenticate are read from the users collection."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.agent_arena_db = MagicMock()
+        users = handler.agent_arena_db.__getitem__.return_value
+        user_id = ObjectId()
+        users.find_one = AsyncMock(return_value={"_id": user_id, "role": "AgentBuilder", "status": "active"})
+
+        agent_id = await handler.get_agent_id("key")
+
+        assert agent_id == str(user_id)
+        users.find_one.assert_awaited_once_with({"api_key": "key"}, projection=AGENT_AUTH_PROJECTION)
+
+    @pytest.mark.asyncio
+    async def test_get_agent_id_caches_valid_keys(self):
+        """Test that a valid key is served from memory until the cache entry expires."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.agent_arena_db = MagicMock()
+        users = handler.agent_arena_db.__getitem__.return_value
+        user_id = ObjectId()
+        users.find_one = AsyncMock(return_value={"_id": user_id, "role": "Admin", "status": "active"})
+
+        assert await handler.get_agent_id("key") == str(user_id)
+        assert await handler.get_agent_id("key") == str(user_id)
+        assert users.find_one.await_count == 1
+
+        with patch("app.database.mongodb_handler.time.monotonic", return_value=time.monotonic() + AGENT_CACHE_TTL_SECONDS + 1):
+            await handler.get_agent_id("key")
+        assert users.find_one.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_agent_id_rejects_inactive_user(self):
+        """Test that inactive users are rejected."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.agent_arena_db = MagicMock()
+        users = handler.agent_arena_db.__getitem__.return_value
+        users.find_one = AsyncMock(return_value={"_id": ObjectId(), "role": "AgentBuilder", "status": "banned"})
+
+        with pytest.raises(ValueError):
+            await handler.get_agent_id("key")
+        with pytest.raises(ValueError):
+            await handler.get_agent_id("key")
+        assert users.find_one.await_count == 2
+
+
+class TestGetTask:
+    """Test task lookups in the agent_arena database."""
+
+    @pytest.mark.asyncio
+    async def test_get_task_fetches_task_fields_only(self, sample_task):
+        """Test that get_task projects the query to the fields declared on Task."""
+        handler = MongoDBHandler(connection_string="mongodb://test")
+        handler.agent_arena_db = MagicMock()
+        tasks = handler.agent_arena_db.__getitem__.return_value
+        tasks.find_one = AsyncMock(return_value=sample_task.model_dump())
+
+        task = await handler.get_task(sample_task.taskId)
+
+        assert task == sample_task
+        tasks.find_one.assert_awaited_once_with({"taskId": sample_task.taskId}, projection=TASK_PROJECTION)
+        assert TASK_PROJECTION["_id"] == 0
+        assert set(TASK_PROJECTION) - {"_id"} == set(type(sample_task).model_fields)
@@ -1,9 +1,13 @@
 """
 Unit tests for prompt_utils module.
 """
+import json
 from datetime import datetime, timezone
 
-from app.core.prompt_utils import build_context_section
+from bson import ObjectId
+
+from app.core.prompt_utils import build_context_section, fill_prompt_template, serialize_findings, _build_context_section_cached
+from app.models.finding_db import FindingDB, Severity
 from app.types import TaskCache, QAPair
 
 
@@ -152,3 +156,73 @@ class TestBuildContextSection:
         
         assert "### ADDITIONAL RESOURCES:" in result
         assert "- https://single-link.com" in result
+
+
+class TestSerializeFindings:
+    """Test the serialize_findings function."""
+
+    def test_serializes_findings_as_json_array(self):
+        """Test that findings are emitted as valid JSON with the prompt subset of fields."""
+        finding = FindingDB(
+            _id=ObjectId(),
+            title="Reentrancy",
+            description="External call before state update",
+            severity=Severity.HIGH,
+            file_paths=["contracts/Vault.sol"],
+            agent_id="agent_alice"
+        )
+
+        result = json.loads(serialize_findings([finding, finding]))
+
+        assert len(result) == 2
+        assert result[0] == {
+            "id": finding.str_id,
+            "title": "Reentrancy",
+            "description": "External call before state update",
+            "severity": "High",
+            "file_paths": ["contracts/Vault.sol"]
+        }
+
+    def test_serializes_empty_list(self):
+        """Test that no findings produce an empty JSON array."""
+        assert serialize_findings([]) == "[]"
+
+
+class TestBuildContextSectionCache:
+    """Test caching of the context section."""
+
+    def test_same_context_is_built_once(self):
+        """Test that repeated calls for the same task context hit the cache."""
+        task_cache = TaskCache(taskId="cached-task", selectedFilesContent="contract Cached {}")
+
+        first = build_context_section(task_cache)
+        hits_before = _build_context_section_cached.cache_info().hits
+        second = build_context_section(task_cache)
+
+        assert first == second
+        assert _build_context_section_cached.cache_info().hits == hits_before + 1
+
+    def test_changed_context_is_rebuilt(self):
+        """Test that a changed task context never returns a stale section."""
+        task_cache = TaskCache(taskId="cached-task", selectedFilesContent="contract Before {}")
+        build_context_section(task_cache)
+
+        task_cache.selectedFilesContent = "contract After {}"
+
+        assert "contract After {}" in build_context_section(task_cache)
+
+
+class TestFillPromptTemplate:
+    """Test the fill_prompt_template function."""
+
+    def test_fills_sections_in_a_single_pass(self):
+        """Test that substituted text is never re-scanned for placeholders."""
+        result = fill_prompt_template("{a} and {b}", {"a": "{b}", "b": "x"})
+
+        assert result == "{b} and x"
+
+    def test_leaves_json_and_unknown_placeholders_untouched(self):
+        """Test that JSON examples and unknown names survive rendering."""
+        template = '{"results": [{"id": "{unknown}"}]} {known}'
+
+        assert fill_prompt_template(template, {"known": "ok"}) == '{"results": [{"id": "{unknown}"}]} ok'
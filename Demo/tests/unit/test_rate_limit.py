@@ -0,0 +1,151 @@
+"""
+Unit tests for LLM rate limiting.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.rate_limit import AdaptiveSemaphore, TokenBucket, ainvoke_with_limits, is_rate_limit_error
+
+
+class _RateLimited(Exception):
+    """Exception carrying an HTTP 429 status code."""
+    code = 429
+
+
+class TestTokenBucket:
+    """Test TokenBucket class."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_not_throttled(self):
+        """Test that requests within the burst never wait."""
+        bucket = TokenBucket(rate=1.0, burst=3)
+
+        waits = [await bucket.acquire() for _ in range(3)]
+
+        assert waits == [0.0, 0.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_empty_bucket_waits_for_refill(self):
+        """Test that a request beyond the burst waits for the next token."""
+        bucket = TokenBucket(rate=100.0, burst=1)
+        await bucket.acquire()
+
+        with patch('app.core.rate_limit.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            waited = await bucket.acquire()
+
+        assert waited > 0
+        mock_sleep.assert_awaited_once()
+
+
+class TestIsRateLimitError:
+    """Test is_rate_limit_error function."""
+
+    def test_detects_status_code_and_wrapped_errors(self):
+        """Test that 429s are detected directly and through exception chaining."""
+        try:
+            try:
+                raise _RateLimited("quota")
+            except _RateLimited as inner:
+                raise RuntimeError("wrapped") from inner
+        except RuntimeError as outer:
+            assert is_rate_limit_error(outer)
+
+        assert is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED"))
+        assert not is_rate_limit_error(ValueError("bad request"))
+
+
+class TestAinvokeWithLimits:
+    """Test ainvoke_with_limits function."""
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_errors(self):
+        """Test that rate-limit errors are retried until the call succeeds."""
+        runnable = MagicMock()
+        runnable.ainvoke = AsyncMock(side_effect=[_RateLimited("quota"), "ok"])
+
+        with patch('app.core.rate_limit.asyncio.sleep', new_callable=AsyncMock):
+            result = await ainvoke_with_limits(runnable, "prompt", limiter=TokenBucket(rate=10.0, burst=10))
+
+        assert result == "ok"
+        assert runnable.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self):
+        """Test that non rate-limit errors propagate immediately."""
+        runnable = MagicMock()
+        runnable.ainvoke = AsyncMock(side_effect=ValueError("bad request"))
+
+        with pytest.raises(ValueError):
+            await ainvoke_with_limits(runnable, "prompt", limiter=TokenBucket(rate=10.0, burst=10))
+
+        runnable.ainvoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test that persistent rate limiting eventually raises."""
+        runnable = MagicMock()
+        runnable.ainvoke = AsyncMock(side_effect=_RateLimited("quota"))
+
+        with patch('app.core.rate_limit.asyncio.sleep', new_callable=AsyncMock):
+            with pytest.raises(_RateLimited):
+                await ainvoke_with_limits(runnable, "prompt", limiter=TokenBucket(rate=10.0, burst=10), max_retries=2)
+
+        assert runnable.ainvoke.await_count == 3
+
+
+class TestAdaptiveSemaphore:
+    """Test AdaptiveSemaphore class."""
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_after_successes(self):
+        """Test that consecutive successes add permits up to the maximum."""
+        semaphore = AdaptiveSemaphore(initial=1, maximum=2, increase_every=2)
+
+        for _ in range(6):
+            async with semaphore:
+                pass
+
+        assert semaphore.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_limit_halves_on_rate_limit(self):
+        """Test that a rate-limited call halves the limit, never below the minimum."""
+        semaphore = AdaptiveSemaphore(initial=4, maximum=8)
+
+        for _ in range(3):
+            with pytest.raises(_RateLimited):
+                async with semaphore:
+                    raise _RateLimited("quota")
+
+        assert semaphore.limit == 1
+
+    @pytest.mark.asyncio
+    async def test_other_errors_do_not_change_limit(self):
+        """Test that non rate-limit failures neither grow nor shrink the limit."""
+        semaphore = AdaptiveSemaphore(initial=2, maximum=8, increase_every=1)
+
+        with pytest.raises(ValueError):
+            async with semaphore:
+                raise ValueError("bad request")
+
+        assert semaphore.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_waits_for_free_permit(self):
+        """Test that no more than `limit` calls run at once."""
+        semaphore = AdaptiveSemaphore(initial=2, maximum=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with semaphore:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0)
+                running -= 1
+
+        await asyncio.gather(*[call() for _ in range(6)])
+
+        assert peak == 2
@@ -21,14 +21,13 @@ class TestScheduleTaskProcessing:
         deadline = datetime(2025, 1, 2, 0, 0, 0, tzinfo=timezone.utc)
         
         # Mock scheduler methods
-        mock_scheduler.get_job.return_value = None  # No existing job
         mock_scheduler.add_job.return_value = None
         
         await schedule_task_processing(task_id, start_time, deadline)
         
         # Verify scheduler was called correctly
-        mock_scheduler.get_job.assert_called_once_with("task_test-task-123")
         mock_scheduler.add_job.assert_called_once()
+        assert mock_scheduler.add_job.call_args.kwargs["id"] == "task_test-task-123"
     
     @patch('app.main.scheduler')
     @patch('app.main.logger')
@@ -49,24 +48,23 @@ class TestScheduleTaskProcessing:
         mock_scheduler.add_job.assert_not_called()
     
     @patch('app.main.scheduler')
-    async def test_schedule_task_processing_removes_existing_job(self, mock_scheduler):
-        """Test scheduling removes existing job first."""
+    async def test_schedule_task_processing_replaces_existing_job(self, mock_scheduler):
+        """Test scheduling replaces an existing job for the task."""
         from app.main import schedule_task_processing
         
         task_id = "test-task-existing"
         start_time = datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
         deadline = datetime(2025, 1, 2, 0, 0, 0, tzinfo=timezone.utc)
         
-        # Mock existing job
-        mock_existing_job = Mock()
-        mock_scheduler.get_job.return_value = mock_existing_job
-        mock_scheduler.remove_job.return_value = None
         mock_scheduler.add_job.return_value = None
         
         await schedule_task_processing(task_id, start_time, deadline)
         
-        # Should remove existing job
-        mock_scheduler.remove_job.assert_called_once_with("task_test-task-existing")
+        # Should replace the existing job without a separate lookup and removal
+        kwargs = mock_scheduler.add_job.call_args.kwargs
+        assert kwargs["id"] == "task_test-task-existing"
+        assert kwargs["replace_existing"] is True
+        mock_scheduler.remove_job.assert_not_called()
     
     @patch('app.main.scheduler')
     @patch('app.main.logger')
@@ -79,7 +77,7 @@ class TestScheduleTaskProcessing:
         deadline = datetime(2025, 1, 2, 0, 0, 0, tzinfo=timezone.utc)
         
         # Mock scheduler to raise exception
-        mock_scheduler.get_job.side_effect = Exception("Scheduler error")
+        mock_scheduler.add_job.side_effect = Exception("Scheduler error")
         
         await schedule_task_processing(task_id, start_time, deadline)
         
@@ -102,6 +100,7 @@ class TestProcessTaskScheduled:
         # Mock async database methods properly
         mock_mongodb.get_metadata = AsyncMock(return_value=None)
         mock_mongodb.set_metadata = AsyncMock(return_value=True)
+        mock_mongodb.claim_metadata = AsyncMock(return_value=True)
         mock_process_task.return_value = None
         
         await process_task_scheduled(task_id)
@@ -142,6 +141,23 @@ class TestProcessTaskScheduled:
         mock_process_task.assert_not_called()
         mock_mongodb.set_metadata.assert_not_called()
     
+    @patch('app.main.process_task')
+    @patch('app.main.mongodb')
+    async def test_process_task_scheduled_claimed_elsewhere(self, mock_mongodb, mock_process_task):
+        """Test scheduled processing skips a task another run has already claimed."""
+        from app.main import process_task_scheduled
+        
+        mock_mongodb.get_metadata = AsyncMock(return_value=None)
+        mock_mongodb.claim_metadata = AsyncMock(return_value=False)
+        mock_mongodb.set_metadata = AsyncMock()
+        
+        await process_task_scheduled("test-claimed-task")
+        
+        mock_mongodb.claim_metadata.assert_awaited_once()
+        assert mock_mongodb.claim_metadata.call_args[0][0] == "processing_test-claimed-task"
+        mock_process_task.assert_not_called()
+        mock_mongodb.set_metadata.assert_not_called()
+    
     @patch('app.main.process_task')
     @patch('app.main.mongodb')
     @patch('app.main.logger')
@@ -153,9 +169,159 @@ class TestProcessTaskScheduled:
         
         # Mock async database methods and set process_task to raise exception
         mock_mongodb.get_metadata = AsyncMock(return_value=None)
+        mock_mongodb.claim_metadata = AsyncMock(return_value=True)
         mock_process_task.side_effect = Exception("Processing error")
         
         await process_task_scheduled(task_id)
         
         # Should log error
         mock_logger.error.assert_called_once()
+
+
+@pytest.mark.asyncio
+class TestProcessTask:
+    """Test the process_task function."""
+
+    @patch('app.main.get_http_client')
+    @patch('app.main.config')
+    @patch('app.main.evaluator')
+    @patch('app.main.deduplicator')
+    @patch('app.main.fetch_task_data', new_callable=AsyncMock)
+    @patch('app.main.mongodb')
+    async def test_backend_sync_streams_findings(self, mock_mongodb, mock_fetch_task_data, mock_deduplicator,
+                                                 mock_evaluator, mock_config, mock_get_client, sample_findings):
+        """Test that the backend sync formats findings from a stream instead of a third list read."""
+        import orjson
+        from app.main import process_task
+        from tests.conftest import async_iter
+
+        mock_config.backend_findings_endpoint = "http://test.com/findings"
+        mock_config.backend_api_key = "test-key"
+        mock_mongodb.get_findings = AsyncMock(return_value=sample_findings)
+        mock_mongodb.iter_findings = Mock(side_effect=lambda *args, **kwargs: async_iter(sample_findings))
+        mock_deduplicator.process_findings = AsyncMock(return_value={
+            "deduplication": {"duplicate_relationships": {}},
+            "summary": {"originals_found": len(sample_findings), "duplicates_found": 0}
+        })
+        mock_evaluator.evaluate_all_findings = AsyncMock(return_value={
+            "application_results": {"valid_count": len(sample_findings), "disputed_count": 0, "failed_count": 0}
+        })
+        mock_http = AsyncMock()
+        mock_http.post.return_value = Mock(status_code=200)
+        mock_get_client.return_value = mock_http
+
+        with patch('app.main.format_finding', side_effect=lambda finding: {"id": finding.str_id}):
+            await process_task("test-task")
+
+        # Pending read and post-deduplication re-read only; the sync streams
+        assert mock_mongodb.get_findings.await_count == 2
+        mock_mongodb.iter_findings.assert_called_once_with(task_id="test-task")
+        payload = orjson.loads(mock_http.post.call_args.kwargs["content"])
+        assert [f["id"] for f in payload["findings"]] == [f.str_id for f in sample_findings]
+
+
+@pytest.mark.asyncio
+class TestProcessTaskForAgent:
+    """Test the process_task_for_agent function."""
+
+    @patch('app.main.deduplicator')
+    @patch('app.main.fetch_task_data', new_callable=AsyncMock)
+    @patch('app.main.mongodb')
+    async def test_reads_findings_and_task_data_concurrently(self, mock_mongodb, mock_fetch_task_data, mock_deduplicator):
+        """Test that task data is fetched alongside the pending findings read."""
+        from app.main import process_task_for_agent
+
+        mock_mongodb.get_findings = AsyncMock(return_value=[])
+        mock_fetch_task_data.return_value = None
+
+        await process_task_for_agent("TESTTASK", "agent-1")
+
+        mock_mongodb.get_findings.assert_awaited_once()
+        mock_fetch_task_data.assert_awaited_once_with("TESTTASK")
+        mock_deduplicator.process_findings.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestRefreshTaskScheduling:
+    """Test the periodic refresh job."""
+
+    @patch('app.main.schedule_approved_tasks', new_callable=AsyncMock)
+    @patch('app.main.logger')
+    async def test_refresh_logs_errors(self, mock_logger, mock_schedule_approved_tasks):
+        """Test that a failed refresh is logged instead of failing the scheduler job."""
+        from app.main import refresh_task_scheduling
+
+        mock_schedule_approved_tasks.side_effect = Exception("Database unavailable")
+
+        await refresh_task_scheduling()
+
+        mock_schedule_approved_tasks.assert_awaited_once()
+        mock_logger.error.assert_called_once()
+
+    @patch('app.main.close_http_client', new_callable=AsyncMock)
+    @patch('app.main.schedule_approved_tasks', new_callable=AsyncMock)
+    @patch('app.main.scheduler')
+    @patch('app.main.mongodb')
+    async def test_startup_schedules_tasks_in_background(self, mock_mongodb, mock_scheduler, mock_schedule_approved_tasks, mock_close_http_client):
+        """Test that startup hands the initial scheduling to the refresh job instead of awaiting it."""
+        from app.main import app, lifespan, REFRESH_JOB_ID
+
+        mock_mongodb.connect = AsyncMock()
+        mock_mongodb.close = AsyncMock()
+
+        async with lifespan(app):
+            mock_schedule_approved_tasks.assert_not_awaited()
+            kwargs = mock_scheduler.add_job.call_args.kwargs
+            assert kwargs["id"] == REFRESH_JOB_ID
+            assert kwargs["next_run_time"] is not None
+
+
+@pytest.mark.asyncio
+class TestProcessTaskOnce:
+    """Test the process_task_once helper."""
+
+    @patch('app.main.mongodb')
+    async def test_task_processing_is_bounded(self, mock_mongodb):
+        """Test that tasks beyond the concurrency limit wait for a free slot."""
+        import asyncio
+        from app import main as app_main
+
+        mock_mongodb.claim_metadata = AsyncMock(return_value=True)
+        mock_mongodb.set_metadata = AsyncMock()
+        running = 0
+        max_running = 0
+
+        async def fake_process_task(task_id):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        with patch('app.main.process_task', side_effect=fake_process_task), \
+             patch('app.main.task_processing_semaphore', asyncio.Semaphore(1)):
+            results = await asyncio.gather(
+                app_main.process_task_once("task-1", scheduled_processing=True),
+                app_main.process_task_once("task-2", scheduled_processing=True)
+            )
+
+        assert all(results)
+        assert max_running == 1
+        assert mock_mongodb.set_metadata.await_count == 2
+
+    @patch('app.main.process_task', new_callable=AsyncMock)
+    @patch('app.main.mongodb')
+    async def test_claim_released_when_processing_fails(self, mock_mongodb, mock_process_task):
+        """Test that a failed run releases its claim and does not mark the task as processed."""
+        from app.main import process_task_once
+
+        mock_mongodb.claim_metadata = AsyncMock(return_value=True)
+        mock_mongodb.release_metadata_claim = AsyncMock()
+        mock_mongodb.set_metadata = AsyncMock()
+        mock_process_task.side_effect = Exception("Gemini unavailable")
+
+        with pytest.raises(Exception, match="Gemini unavailable"):
+            await process_task_once("task-1", scheduled_processing=True)
+
+        mock_mongodb.release_metadata_claim.assert_awaited_once_with("processing_task-1")
+        mock_mongodb.set_metadata.assert_not_called()
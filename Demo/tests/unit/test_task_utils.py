@@ -0,0 +1,43 @@
+"""
+Unit tests for task_utils module.
+"""
+from app.task_utils import read_and_concatenate_files
+
+
+class TestReadAndConcatenateFiles:
+    """Test the read_and_concatenate_files function."""
+
+    def test_concatenates_files_with_headers(self, tmp_path):
+        """Test that files are concatenated in order with path headers."""
+        (tmp_path / "contracts").mkdir()
+        (tmp_path / "contracts" / "A.sol").write_text("contract A {}", encoding="utf-8")
+        (tmp_path / "B.sol").write_text("contract B {}", encoding="utf-8")
+
+        result = read_and_concatenate_files(str(tmp_path), ["contracts/A.sol", "B.sol"])
+
+        assert result == "// contracts/A.sol\ncontract A {}\n\n// B.sol\ncontract B {}\n\n"
+
+    def test_skips_missing_files_and_directories(self, tmp_path):
+        """Test that missing paths and directories are skipped."""
+        (tmp_path / "contracts").mkdir()
+        (tmp_path / "A.sol").write_text("contract A {}", encoding="utf-8")
+
+        result = read_and_concatenate_files(str(tmp_path), ["missing.sol", "contracts", "A.sol"])
+
+        assert result == "// A.sol\ncontract A {}\n\n"
+
+    def test_falls_back_to_latin1(self, tmp_path):
+        """Test that non-UTF-8 files are decoded as latin-1."""
+        (tmp_path / "A.sol").write_bytes("// café".encode("latin-1"))
+
+        result = read_and_concatenate_files(str(tmp_path), ["A.sol"])
+
+        assert "// café" in result
+
+    def test_normalizes_line_endings(self, tmp_path):
+        """Test that CRLF and CR line endings are translated like a text-mode read."""
+        (tmp_path / "A.sol").write_bytes(b"contract A {\r\n}\rend")
+
+        result = read_and_concatenate_files(str(tmp_path), ["A.sol"])
+
+        assert result == "// A.sol\ncontract A {\n}\nend\n\n"